@@ -18,12 +18,22 @@ class Assembler(object):
     of the network to be simulated on host.
     """
     object_builders = dict()  # Map of classes to functions
+    object_packers = dict()  # Map of classes to functions
     connection_builders = dict()  # Map of (pre_obj, post_obj) tuples to functions
 
     @classmethod
     def register_object_builder(cls, func, nengo_class):
         cls.object_builders[nengo_class] = func
 
+    @classmethod
+    def register_object_packer(cls, func, nengo_class):
+        """Register a function which builds all the objects of a class at
+        once, packing them into shared vertices.  The function is given the
+        list of objects and the assembler and returns a dictionary mapping
+        each object to its vertex.
+        """
+        cls.object_packers[nengo_class] = func
+
     @classmethod
     def register_connection_builder(cls, func, pre_obj=None, post_obj=None):
         cls.connection_builders[(pre_obj, post_obj)] = func
@@ -54,7 +64,8 @@ class Assembler(object):
                             (connection.pre_obj.__class__.__name__,
                              connection.post_obj.__class__.__name__))
 
-    def __call__(self, objs, conns, time_in_seconds, dt, config=None):
+    def __call__(self, objs, conns, time_in_seconds, dt, config=None,
+                 recording_buffer=None):
         """Construct PACMAN vertices and edges, and a reduced version of the
         model for simulation on host.
 
@@ -64,6 +75,10 @@ class Assembler(object):
                                 infinite).
         :param dt: The time step of the simulation.
         :param config: Configuration options for the simulation.
+        :param recording_buffer: Length of time (in seconds) for which
+                                 recording regions buffer data, or None to
+                                 buffer the whole run.  Required if the run
+                                 time is None.
         """
         # Store the config
         self.config = config
@@ -76,13 +91,34 @@ class Assembler(object):
         self.n_ticks = (int(time_in_seconds / dt) if
                         time_in_seconds is not None else 0)
 
+        # Recording regions are circular buffers which need not hold the
+        # whole run if they are read during it.
+        self.n_recording_ticks = self.n_ticks
+        if recording_buffer is not None:
+            n_buffer_ticks = int(recording_buffer / dt)
+            if time_in_seconds is None or n_buffer_ticks < self.n_ticks:
+                self.n_recording_ticks = n_buffer_ticks
+
         # Store for querying
         self.connections = conns
 
-        # Construct each object in turn to produce vertices
-        self.object_vertices = dict([(o, self.build_object(o)) for o in objs])
-        self.vertices = [v for v in self.object_vertices.values() if
-                         v is not None]
+        # Pack objects which may share vertices
+        self.object_vertices = dict()
+        for (obj_type, packer) in self.object_packers.items():
+            packed = [o for o in objs if isinstance(o, obj_type)]
+            if len(packed) > 0:
+                self.object_vertices.update(packer(packed, self))
+
+        # Construct each remaining object in turn to produce vertices
+        for o in objs:
+            if o not in self.object_vertices:
+                self.object_vertices[o] = self.build_object(o)
+
+        # Each vertex is listed once, however many objects it represents
+        self.vertices = list(set(v for v in self.object_vertices.values()
+                                 if v is not None))
+        for v in self.vertices:
+            v.runtime = self.time_in_seconds
 
         # Construct each connection in turn to produce edges
         self.edges = filter(lambda x: x is not None, [self.build_connection(c)
@@ -108,8 +144,7 @@ Assembler.register_object_builder(node.FilterVertex.assemble_from_intermediate,
                                   node.IntermediateFilter)
 Assembler.register_object_builder(node.FilterVertex.assemble,
                                   node.FilterVertex)
-Assembler.register_object_builder(probe.DecodedValueProbe.assemble,
-                                  probe.IntermediateProbe)
+Assembler.register_object_packer(probe.pack_probes, probe.IntermediateProbe)
 
 
 def vertex_builder(vertex, assembler):
@@ -2,11 +2,13 @@
 converted into PACMAN problem specifications.
 """
 
+import inspect
 import math
 import numpy as np
 
 import nengo.utils.builder
 
+from .config import Config
 import connection
 import ensemble
 import pes
@@ -29,10 +31,13 @@ class Builder(object):
         cls.post_rpn_transforms.append(func)
 
     @classmethod
-    def build(cls, network, dt, seed):
+    def build(cls, network, dt, seed, config=None):
         """Build an intermediate representation of a Nengo model which can be
         assembled to form a PACMAN problem graph.
         """
+        if config is None:
+            config = Config()
+
         # Flatten the network
         (objs, conns) = nengo.utils.builder.objs_and_connections(network)
 
@@ -40,9 +45,14 @@ class Builder(object):
         rng = np.random.RandomState(seed)
 
         # Apply all network transforms which modify connectivity, they should
-        # occur before removing pass through nodes
+        # occur before removing pass through nodes.  Only transforms which
+        # accept a `config` argument are provided with it.
         for transform in cls.pre_rpn_transforms:
-            (objs, conns) = transform(objs, conns, network.probes)
+            if 'config' in inspect.getargspec(transform).args:
+                (objs, conns) = transform(objs, conns, network.probes,
+                                          config=config)
+            else:
+                (objs, conns) = transform(objs, conns, network.probes)
 
         # Remove pass through nodes
         (objs, conns) = nengo.utils.builder.remove_passthrough_nodes(
@@ -124,8 +134,13 @@ def _get_outgoing_ids(connections):
     connection_ids = dict()
 
     # Iterate through the connections building connection blocks where
-    # necessary.
+    # necessary.  Connections from packed Ensembles were indexed when the
+    # Ensembles were packed.
     for c in connections:
+        if c in getattr(c.pre_obj, 'connection_indices', dict()):
+            connection_ids[c] = c.pre_obj.connection_indices[c]
+            continue
+
         if c.pre_obj not in output_blocks:
             output_blocks[c.pre_obj] =\
                 (utils.connections.Connections() if not
@@ -1,5 +1,6 @@
 import nengo
 import nengo.config
+import numpy as np
 
 
 class Config(nengo.config.Config):
@@ -10,3 +11,25 @@ class Config(nengo.config.Config):
                                    nengo.params.Parameter(False))
         self[nengo.Node].set_param('f_period',
                                    nengo.params.Parameter(None))
+        self[nengo.Node].set_param('period',
+                                   nengo.params.Parameter(None))
+        self[nengo.Node].set_param('output_period',
+                                   nengo.params.Parameter(None))
+        self[nengo.Node].set_param('output_threshold',
+                                   nengo.params.Parameter(None))
+        self[nengo.Node].set_param('separate_process',
+                                   nengo.params.Parameter(False))
+
+        self.configures(nengo.Probe)
+        self[nengo.Probe].set_param('spike_format',
+                                    nengo.params.Parameter('list'))
+        self[nengo.Probe].set_param('spike_recording',
+                                    nengo.params.Parameter(None))
+        self[nengo.Probe].set_param('dtype',
+                                    nengo.params.Parameter(np.float64))
+        self[nengo.Probe].set_param('npy_file',
+                                    nengo.params.Parameter(None))
+        self[nengo.Probe].set_param('average',
+                                    nengo.params.Parameter(False))
+        self[nengo.Probe].set_param('record_on_ensemble',
+                                    nengo.params.Parameter(False))
@@ -22,6 +22,14 @@ def build_ensembles(objects, connections, probes, dt, rng):
     (objects, connections) = process_global_inhibition_connections(
         objects, connections, probes)
 
+    # Small Ensembles are packed together to share a vertex, the input of each
+    # Ensemble is mapped onto its dimensions of the packed Ensemble before any
+    # decoders are solved for.
+    packs = [p for p in pack_ensembles(objects, connections) if len(p) > 1]
+    for pack in packs:
+        pad_input_transforms(pack, connections)
+    populations = dict()
+
     # Create an intermediate representation for each Ensemble
     for obj in objects:
         if not isinstance(obj, nengo.Ensemble):
@@ -31,11 +39,16 @@ def build_ensembles(objects, connections, probes, dt, rng):
         # Build the appropriate intermediate representation for the Ensemble
         if isinstance(obj.neuron_type, nengo.neurons.LIF):
             # Get the set of outgoing connections for this Ensemble so that
-            # decoders can be solved for.
+            # decoders can be solved for, the output of those to probes
+            # recorded on the Ensemble is recorded rather than transmitted.
             out_conns = [c for c in connections if c.pre_obj == obj]
-            new_obj = IntermediateEnsembleLIF.from_object(obj, out_conns,
-                                                          dt, rng)
+            recorded_conns = [c for c in out_conns if
+                              getattr(c.post_obj, 'record_on_ensemble', False)]
+            out_conns = [c for c in out_conns if c not in recorded_conns]
+            new_obj = IntermediateEnsembleLIF.from_object(
+                obj, out_conns, dt, rng, recorded_conns)
             new_objects.append(new_obj)
+            populations[obj] = new_obj
         else:
             raise NotImplementedError("nengo_spinnaker does not currently "
                                       "support '%s' neurons."
@@ -48,18 +61,35 @@ def build_ensembles(objects, connections, probes, dt, rng):
             if c.post_obj is obj:
                 c.post_obj = new_obj
 
-        # Mark the Ensemble as recording spikes/voltages if appropriate
+        # Mark the Ensemble as recording spikes/voltages if appropriate, only
+        # the neurons probed by some probe have their spikes recorded.
         for p in probes:
-            if p.target is obj:
-                if p.attr == 'spikes':
+            if p.attr == 'spikes':
+                (target, neurons) = utils.probes.get_probed_neurons(p)
+                if target is obj:
                     new_obj.record_spikes = True
+                    new_obj.recorded_neurons.update(neurons)
                     new_obj.probes.append(p)
-                elif p.attr == 'voltage':
+            elif p.target is obj:
+                if p.attr == 'voltage':
                     raise NotImplementedError("Voltage probing not currently "
                                               "supported.")
                     new_obj.record_voltage = True
                     new_obj.probes.append(p)
 
+    # Probes recorded on Ensembles require neither a vertex nor a connection
+    recorded_probes = [c.post_obj for c in connections if
+                       getattr(c.post_obj, 'record_on_ensemble', False)]
+    new_objects = [o for o in new_objects if o not in recorded_probes]
+    connections = [c for c in connections if c.post_obj not in recorded_probes]
+
+    # Combine the populations of each pack of Ensembles
+    for pack in packs:
+        pops = [populations[e] for e in pack]
+        packed = pack_populations(pops, connections)
+        new_objects = [packed if o is pops[0] else o for o in new_objects
+                       if o not in pops[1:]]
+
     # Add direct inputs
     for c in connections:
         if (isinstance(c.post_obj, IntermediateEnsemble) and
@@ -91,6 +121,206 @@ def process_global_inhibition_connections(objs, connections, probes):
     return objs, new_connections
 
 
+def pack_ensembles(objects, connections):
+    """Pack small Ensembles into groups which may share a vertex.
+
+    Ensembles are packed, in order, into the first group whose neurons share
+    their time constants and which has room for both their neurons and their
+    encoder and decoder weights.  Only Ensembles whose input is decoded by
+    other Ensembles (or is constant) and which neither learn nor are
+    inhibited are packed, as the input of each is padded to the dimensions
+    of its group.
+
+    :returns: A list of groups of Ensembles, every Ensemble is in one group.
+    """
+    ensembles = [o for o in objects if isinstance(o, nengo.Ensemble)]
+    packs = list()  # [(tau_rc, tau_ref), n_neurons, n_dimensions, ensembles]
+
+    for ens in ensembles:
+        in_conns = [c for c in connections if c.post_obj is ens or
+                    getattr(c.post_obj, 'ensemble', None) is ens]
+        out_conns = [c for c in connections if c.pre_obj is ens]
+
+        packable = (
+            isinstance(ens.neuron_type, nengo.neurons.LIF) and
+            ens.n_neurons < EnsembleLIF.MAX_ATOMS and
+            all(c.post_obj is ens and not c.modulatory and
+                not isinstance(c, IntermediateGlobalInhibitionConnection) and
+                (isinstance(c.pre_obj, nengo.Ensemble) or
+                 (isinstance(c.pre_obj, nengo.Node) and
+                  not callable(c.pre_obj.output))) and
+                len(utils.connections.get_learning_rules(c)) == 0
+                for c in in_conns) and
+            all(len(utils.connections.get_learning_rules(c)) == 0
+                for c in out_conns)
+        )
+        if not packable:
+            packs.append([None, ens.n_neurons, 0, [ens]])
+            continue
+
+        # Every neuron of a pack is encoded with every input dimension and
+        # decoded into every output dimension of the pack.  Output dimensions
+        # are the non-zero rows of each transform: the rows added when the
+        # input of a packed Ensemble is padded are zero, so their decoders
+        # are compressed away and never transmitted.
+        taus = (ens.neuron_type.tau_rc, ens.neuron_type.tau_ref)
+        n_dims = ens.dimensions + sum(get_n_output_dimensions(c)
+                                      for c in out_conns)
+        for pack in packs:
+            n = pack[1] + ens.n_neurons
+            d = pack[2] + n_dims
+            if (pack[0] == taus and n <= EnsembleLIF.MAX_ATOMS and
+                    n * d <= EnsembleLIF.MAX_PACKED_WEIGHTS):
+                pack[1] = n
+                pack[2] = d
+                pack[3].append(ens)
+                break
+        else:
+            packs.append([taus, ens.n_neurons, n_dims, [ens]])
+
+    return [p[3] for p in packs]
+
+
+def get_n_output_dimensions(connection):
+    """Get the number of dimensions decoded for a connection from an
+    Ensemble, those of the rows of its transform which are not all zero.
+    """
+    transform = np.asarray(connection.transform)
+    if transform.ndim < 2:
+        return transform.size
+    return int(np.sum(np.any(transform != 0., axis=1)))
+
+
+def pad_input_transforms(ensembles, connections):
+    """Pad the transforms of connections into a pack of Ensembles so that
+    they map onto the dimensions of that Ensemble in the pack.
+    """
+    size_in = sum(e.dimensions for e in ensembles)
+    offset = 0
+    for ens in ensembles:
+        for c in connections:
+            if c.post_obj is ens:
+                transform = np.zeros((size_in, c.transform.shape[1]))
+                transform[offset:offset + ens.dimensions] = c.transform
+                c.transform = transform
+        offset += ens.dimensions
+
+
+def pack_populations(populations, connections):
+    """Combine the intermediate representations of a pack of Ensembles into a
+    single intermediate Ensemble whose neurons and dimensions are those of
+    each population in turn.
+
+    Connections into or out of the populations are modified to refer to the
+    packed Ensemble.  The connections from each population are indexed in
+    turn, following those of the preceding populations, so connections from
+    different populations never share decoders or keys even if they are
+    otherwise equivalent.  These indices are recorded in the
+    `connection_indices` of the packed Ensemble.
+    """
+    pops = populations
+    n_neurons = sum(p.n_neurons for p in pops)
+    neuron_offsets = np.cumsum([0] + [p.n_neurons for p in pops])
+    dim_offsets = np.cumsum([0] + [p.n_dimensions for p in pops])
+
+    encoders = np.zeros((n_neurons, dim_offsets[-1]))
+    for (p, n, d) in zip(pops, neuron_offsets, dim_offsets):
+        encoders[n:n + p.n_neurons, d:d + p.n_dimensions] = p.encoders
+
+    packed = IntermediateEnsembleLIF(
+        n_neurons, np.hstack([p.gains for p in pops]),
+        np.hstack([p.bias for p in pops]), encoders, None, pops[0].tau_rc,
+        pops[0].tau_ref, None, list(), list())
+    packed.max_rates = np.hstack([p.max_rates for p in pops])
+
+    # Index the connections from each population, offset by the number of
+    # unique connections from the preceding populations.
+    pop_tfses = [utils.connections.OutgoingEnsembleConnections(
+        [c for c in connections if c.pre_obj is p]) for p in pops]
+    index_offsets = np.cumsum([0] + [len(t) for t in pop_tfses]).tolist()
+    for (p_tfses, i) in zip(pop_tfses, index_offsets):
+        for c in p_tfses:
+            packed.connection_indices[c] = i + p_tfses[c]
+
+    # Modify the connections
+    for c in connections:
+        if c.pre_obj in pops:
+            c.pre_obj = packed
+        if c.post_obj in pops:
+            c.post_obj = packed
+            c.width = packed.size_in
+
+    # Combine the decoders, each has a column for each (keyspace, index,
+    # dimension) header.
+    headers = list()
+    decoders = list()
+    for (p, i, n) in zip(pops, index_offsets, neuron_offsets):
+        headers.extend((h[0], i + h[1], h[2]) for h in p.decoder_headers)
+        decoder = np.zeros((n_neurons, len(p.decoder_headers)))
+        decoder[n:n + p.n_neurons] = p.decoders
+        decoders.append(decoder)
+    packed.decoder_headers = headers
+    packed.decoders = np.hstack(decoders)
+
+    # Combine recorded outputs and spikes
+    recorded_decoders = list()
+    for (p, n) in zip(pops, neuron_offsets):
+        decoders = np.zeros((n_neurons, p.recorded_decoders.shape[1]))
+        decoders[n:n + p.n_neurons] = p.recorded_decoders
+        recorded_decoders.append(decoders)
+        packed.recorded_connections.extend(p.recorded_connections)
+
+        packed.record_spikes |= p.record_spikes
+        packed.recorded_neurons.update(n + i for i in p.recorded_neurons)
+        packed.probes.extend(p.probes)
+        for (ens, offset) in p.population_offsets.items():
+            packed.population_offsets[ens] = n + offset
+    packed.recorded_decoders = np.hstack(recorded_decoders)
+
+    return packed
+
+
+def get_spike_recording_region(ens, formats, n_frames, frame_period,
+                               max_atoms):
+    """Get the region into which the spikes of an Ensemble are recorded.
+
+    :param formats: Recording format requested by each spike probe, either
+                    'bitfield', 'events' or None to use whichever is expected
+                    to be smaller given the maximum firing rates of the
+                    neurons.
+    :param n_frames: Number of frames to buffer.
+    :param frame_period: Period (in seconds) of each frame.
+    :param max_atoms: Largest number of neurons simulated by each core.
+    """
+    formats = set(f for f in formats if f is not None)
+    if not formats <= set(['bitfield', 'events']):
+        raise ValueError("Unknown spike recording format(s) %s." %
+                         list(formats - set(['bitfield', 'events'])))
+    if len(formats) > 1:
+        raise ValueError("Spike probes of the same Ensemble may not request "
+                         "different recording formats.")
+
+    # Neurons are assumed to fire at their maximum rates, or every frame if
+    # these are not known.
+    atoms = sorted(ens.recorded_neurons)
+    rates = (np.ones(ens.n_neurons) if ens.max_rates is None else
+             np.asarray(ens.max_rates) * frame_period)
+    bitfield = utils.vertices.BitfieldBasedRecordingRegion(n_frames, atoms)
+    events = utils.vertices.EventBasedRecordingRegion(n_frames, rates, atoms)
+
+    if formats:
+        return events if 'events' in formats else bitfield
+
+    # Compare the sizes of the regions assuming that the Ensemble is
+    # partitioned into subvertices of the largest size.
+    slices = [(lo, min(lo + max_atoms, ens.n_neurons) - 1) for lo in
+              range(0, ens.n_neurons, max_atoms)]
+    if (sum(events.sizeof(*s) for s in slices) <
+            sum(bitfield.sizeof(*s) for s in slices)):
+        return events
+    return bitfield
+
+
 class IntermediateEnsemble(object):
     def __init__(self, n_neurons, gains, bias, encoders, decoders,
                  eval_points, decoder_headers, learning_rules, label=None):
@@ -117,8 +347,21 @@ class IntermediateEnsemble(object):
         # Learning rules
         self.learning_rules = learning_rules
 
+        # Expected maximum firing rates, if known
+        self.max_rates = None
+
+        # Decoders and connections of outputs recorded rather than transmitted
+        self.recorded_decoders = np.zeros((n_neurons, 0))
+        self.recorded_connections = list()
+
+        # Index of the first neuron of each Ensemble represented, and the
+        # index of each outgoing connection if fixed when packing Ensembles
+        self.population_offsets = dict()
+        self.connection_indices = dict()
+
         # Recording parameters
         self.record_spikes = False
+        self.recorded_neurons = set()
         self.record_voltage = False
         self.probes = list()
 
@@ -143,7 +386,7 @@ class IntermediateEnsembleLIF(IntermediateEnsemble):
         self.tau_ref = tau_ref
 
     @classmethod
-    def from_object(cls, ens, out_conns, dt, rng):
+    def from_object(cls, ens, out_conns, dt, rng, recorded_conns=()):
         assert isinstance(ens.neuron_type, nengo.neurons.LIF)
         assert isinstance(ens, nengo.Ensemble)
 
@@ -245,9 +488,21 @@ class IntermediateEnsembleLIF(IntermediateEnsemble):
                 decoders, compress=decoders_to_compress)
         decoders /= dt
 
-        return cls(ens.n_neurons, gain, bias, encoders, decoders,
-                   ens.neuron_type.tau_rc, ens.neuron_type.tau_ref,
-                   eval_points, decoder_headers, learning_rules)
+        new_ens = cls(ens.n_neurons, gain, bias, encoders, decoders,
+                      ens.neuron_type.tau_rc, ens.neuron_type.tau_ref,
+                      eval_points, decoder_headers, learning_rules)
+        new_ens.max_rates = max_rates
+        new_ens.population_offsets[ens] = 0
+
+        # Build the decoders of recorded outputs, which are not compressed so
+        # that each connection has its own dimensions.
+        recorded_decoders = [decoder_builder.get_transformed_decoder(
+            c.function, c.transform, c.eval_points, c.solver)
+            for c in recorded_conns]
+        if len(recorded_decoders) > 0:
+            new_ens.recorded_decoders = np.hstack(recorded_decoders) / dt
+        new_ens.recorded_connections = list(recorded_conns)
+        return new_ens
 
 
 class IntermediateGlobalInhibitionConnection(
@@ -272,13 +527,17 @@ class IntermediateGlobalInhibitionConnection(
 class EnsembleLIF(utils.vertices.NengoVertex):
     MODEL_NAME = 'nengo_ensemble'
     MAX_ATOMS = 128
+    MAX_PACKED_WEIGHTS = 4096  # Most weights of Ensembles packed on a core
+    output_recording_region = 14
     spikes_recording_region = 15
+    spikes_sample_ticks = 1
 
     def __init__(self, n_neurons, system_region, bias_region, encoders_region,
                  decoders_region, output_keys_region, input_filter_region,
                  input_filter_routing, inhib_filter_region,
                  inhib_filter_routing, gain_region, modulatory_filter_region,
-                 modulatory_filter_routing, pes_region, spikes_region):
+                 modulatory_filter_routing, pes_region, output_region,
+                 spikes_region):
         super(EnsembleLIF, self).__init__(n_neurons)
 
         # Create regions
@@ -296,11 +555,30 @@ class EnsembleLIF(utils.vertices.NengoVertex):
         self.regions[10] = modulatory_filter_region
         self.regions[11] = modulatory_filter_routing
         self.regions[12] = pes_region
+        self.regions[13] = output_region
         self.regions[14] = spikes_region
+        self.n_neurons = n_neurons
         self.probes = list()
+        self.recorded_connections = list()
+        self.population_offsets = dict()
 
     @classmethod
     def assemble(cls, ens, assembler):
+        # Spikes are recorded every `sample_ticks` ticks, the most frequent
+        # of those requested by the spike probes.
+        sample_ticks = min([utils.probes.get_sample_ticks(p.sample_every,
+                                                          assembler.dt)
+                            for p in ens.probes if p.attr == 'spikes'] or [1])
+
+        # Spikes are recorded either as a bitfield or as a list of events
+        spikes_region = get_spike_recording_region(
+            ens, [assembler.config[p].spike_recording for p in ens.probes
+                  if p.attr == 'spikes'],
+            assembler.n_recording_ticks // sample_ticks,
+            assembler.dt * sample_ticks, cls.MAX_ATOMS)
+        record_events = isinstance(spikes_region,
+                                   utils.vertices.EventBasedRecordingRegion)
+
         # Prepare the system region
         system_items = [
             ens.n_dimensions,
@@ -310,7 +588,10 @@ class EnsembleLIF(utils.vertices.NengoVertex):
             int(ens.tau_ref / (assembler.timestep * 10**-6)),
             utils.fp.bitsk(assembler.dt / ens.tau_rc),
             0x1 if ens.record_spikes else 0x0,
-            1
+            1,
+            sample_ticks,
+            0x1 if record_events else 0x0,
+            ens.recorded_decoders.shape[1]
         ]
 
         # Prepare the input filtering regions
@@ -363,21 +644,29 @@ class EnsembleLIF(utils.vertices.NengoVertex):
             bias_with_di, formatter=utils.fp.bitsk)
         encoders_region = utils.vertices.MatrixRegionPartitionedByRows(
             encoders_with_gain, formatter=utils.fp.bitsk)
+        # Decoders of recorded outputs follow those of transmitted outputs
+        decoders = np.hstack((ens.decoders.reshape(ens.n_neurons, -1),
+                              ens.recorded_decoders))
         decoders_region = utils.vertices.MatrixRegionPartitionedByRows(
-            ens.decoders, formatter=utils.fp.bitsk)
+            decoders, formatter=utils.fp.bitsk)
         output_keys_region = utils.vertices.UnpartitionedKeysRegion(
             ens.output_keyspaces)
         gain_region = utils.vertices.MatrixRegionPartitionedByRows(
             ens.gains, formatter=utils.fp.bitsk)
         pes_region = utils.vertices.UnpartitionedListRegion(pes_items)
-        spikes_region = utils.vertices.BitfieldBasedRecordingRegion(
-            assembler.n_ticks)
+
+        # The partial sums of recorded outputs are recorded every tick
+        output_region = utils.vertices.FrameBasedRecordingRegion(
+            ens.recorded_decoders.shape[1], assembler.n_recording_ticks)
 
         vertex = cls(ens.n_neurons, system_region, bias_region,
                      encoders_region, decoders_region, output_keys_region,
                      input_filter_region, input_filter_routing,
                      inhib_filter_region, inhib_filter_routing, gain_region,
                      modul_filter_region, modul_filter_routing,
-                     pes_region, spikes_region)
+                     pes_region, output_region, spikes_region)
         vertex.probes = ens.probes
+        vertex.recorded_connections = ens.recorded_connections
+        vertex.population_offsets = ens.population_offsets
+        vertex.spikes_sample_ticks = sample_ticks
         return vertex
@@ -68,9 +68,11 @@ def replace_function_of_time_nodes(objs, conns, config, time_in_seconds, dt):
 
 
 class IntermediateFilter(object):
-    def __init__(self, size_in, transmission_period=10):
+    def __init__(self, size_in, transmission_period=10,
+                 output_threshold=None):
         self.size_in = size_in
         self.transmission_period = transmission_period
+        self.output_threshold = output_threshold
 
 
 class FilterVertex(utils.vertices.NengoVertex):
@@ -78,13 +80,16 @@ class FilterVertex(utils.vertices.NengoVertex):
     MAX_ATOMS = 1
 
     def __init__(self, size_in, in_connections, dt, output_period=100,
-                 interpacket_pause=1):
+                 interpacket_pause=1, output_threshold=None):
         super(FilterVertex, self).__init__(1)
         self.size_in = size_in
 
-        # Create the system region
+        # Create the system region, a threshold of None is represented by the
+        # maximum representable value.
+        threshold = utils.fp.bitsk(output_threshold if output_threshold is
+                                   not None else 2**16)
         system_region = utils.vertices.UnpartitionedListRegion([
-            size_in, None, 1000, output_period, interpacket_pause])
+            size_in, None, 1000, output_period, interpacket_pause, threshold])
 
         # Create the filter regions
         (in_filters, in_routing, _) = utils.vertices.make_filter_regions(
@@ -135,7 +140,8 @@ class FilterVertex(utils.vertices.NengoVertex):
             assembler.get_incoming_connections(fv))
 
         fv_ = cls(fv.size_in, in_conns, assembler.dt,
-                  output_period=fv.transmission_period)
+                  output_period=fv.transmission_period,
+                  output_threshold=fv.output_threshold)
         fv_.regions[1] = cls.get_output_keys_region(fv, assembler)
         fv_.regions[0].data[1], fv_.regions[4] =\
             cls.get_transform(fv, assembler)
@@ -1,11 +1,17 @@
 import numpy as np
 
+import nengo
+
 import utils
 
 
-def insert_decoded_output_probes(objs, connections, probes):
+def insert_decoded_output_probes(objs, connections, probes, config=None):
     """Creates a new object representing decoded output probes and provides
     appropriate connections.
+
+    Probes of Ensembles which are configured to `record_on_ensemble` are
+    marked as such if their output can be recorded by the Ensemble itself,
+    otherwise they are simulated by a separate value sink.
     """
     objs = list(objs)
     connections = list(connections)
@@ -14,6 +20,9 @@ def insert_decoded_output_probes(objs, connections, probes):
     for probe in probes:
         if probe.attr == 'decoded_output' or probe.attr == 'output':
             p = IntermediateProbe(probe.size_in, probe.sample_every, probe)
+            p.record_on_ensemble = (
+                config is not None and config[probe].record_on_ensemble and
+                can_record_on_ensemble(probe))
 
             # Create a new connection for this Node, if there is no transform
             # on the connection then we can create one on the assumption that
@@ -32,46 +41,127 @@ def insert_decoded_output_probes(objs, connections, probes):
     return objs, connections
 
 
+def can_record_on_ensemble(probe):
+    """Determine whether the decoded output of a probe may be recorded by the
+    Ensemble it probes, which is possible only if the output is filtered by a
+    first-order lowpass filter (or not at all).
+    """
+    synapse = probe.conn_args.get('synapse', None)
+    return (isinstance(probe.target, nengo.Ensemble) and
+            (synapse is None or isinstance(synapse, float) or
+             isinstance(synapse, nengo.synapses.Lowpass)))
+
+
 class IntermediateProbe(object):
     def __init__(self, size_in, sample_every, probe, label=None):
         self.size_in = size_in
         self.sample_every = sample_every
         self.probe = probe
         self.label = label
+        self.record_on_ensemble = False
+
+
+def pack_probes(probes, assembler):
+    """Pack decoded value probes into as few value sinks as possible.
+
+    Each probe becomes a channel of a value sink.  Probes are packed, largest
+    first, into the first value sink which has room for both their dimensions
+    and the packets they receive each tick.
+
+    :returns: A dictionary mapping each probe to its value sink vertex.
+    """
+    sinks = list()  # [n_dimensions, n_packets, probes]
+    for probe in sorted(probes, key=lambda p: p.size_in, reverse=True):
+        # Every incoming connection transmits each dimension every tick
+        n_packets = (probe.size_in *
+                     len(assembler.get_incoming_connections(probe)))
+        for sink in sinks:
+            if (sink[0] + probe.size_in <= DecodedValueProbe.MAX_DIMENSIONS and
+                    sink[1] + n_packets <= DecodedValueProbe.MAX_PACKETS):
+                sink[0] += probe.size_in
+                sink[1] += n_packets
+                sink[2].append(probe)
+                break
+        else:
+            sinks.append([probe.size_in, n_packets, [probe]])
+
+    vertices = dict()
+    for (_, _, sink_probes) in sinks:
+        vertex = DecodedValueProbe.assemble(sink_probes, assembler)
+        vertices.update((p, vertex) for p in sink_probes)
+    return vertices
 
 
 class DecodedValueProbe(utils.vertices.NengoVertex):
+    """A value sink which filters and records the values received by each of
+    several probes.
+
+    Each probe is a channel with its own filters and stripe of the recording
+    region.
+
+    :attr probes: The Nengo probe of each channel.
+    :attr widths: The number of dimensions of each channel.
+    :attr sample_ticks: The number of ticks between the samples of each
+                        channel.
+    """
     MODEL_NAME = 'nengo_value_sink'
     MAX_ATOMS = 1
+    MAX_DIMENSIONS = 64  # Most dimensions filtered and recorded by a core
+    MAX_PACKETS = 128  # Most packets received by a core each tick
     recording_region_index = 15
 
     def __init__(self, system_region, input_filter_region,
-                 input_filter_routing, recording_region, probe):
+                 input_filter_routing, recording_region, probes, widths,
+                 sample_ticks):
         super(DecodedValueProbe, self).__init__(1)
         self.regions = [None]*16
         self.regions[0] = system_region
         self.regions[1] = input_filter_region
         self.regions[2] = input_filter_routing
         self.regions[14] = recording_region
-        self.probe = probe
-        self.width = probe.size_in
+        self.probes = probes
+        self.widths = widths
+        self.sample_ticks = sample_ticks
 
     @classmethod
-    def assemble(cls, probe, assembler):
-        system_items = [assembler.timestep, probe.size_in]
-        system_region = utils.vertices.UnpartitionedListRegion(system_items)
-
-        if assembler.time_in_seconds is None:
-            return None
+    def assemble(cls, probes, assembler):
+        system_items = [assembler.timestep, len(probes)]
+        filter_items = list()
+        routing_items = list()
+        stripes = list()
+        sample_ticks = list()
+
+        for probe in probes:
+            # Values are recorded every `sample_ticks` ticks, optionally
+            # averaged over the ticks since the last sample.
+            ticks = utils.probes.get_sample_ticks(probe.sample_every,
+                                                  assembler.dt)
+            average = assembler.config[probe.probe].average
+            n_frames = assembler.n_recording_ticks // ticks
+            system_items.extend([probe.size_in, ticks,
+                                 0x1 if average else 0x0,
+                                 utils.fp.bitsk(1. / ticks), n_frames])
+            sample_ticks.append(ticks)
+
+            # Build the input filters, those of each channel follow those of
+            # the previous channel.
+            in_conns = assembler.get_incoming_connections(probe)
+            (filter_region, filter_routing, _) =\
+                utils.vertices.make_filter_regions(in_conns, assembler.dt)
+            filter_items.extend(filter_region.data)
+            routing_items.extend(filter_routing.data)
+
+            # Prepare the stripe of the recording region
+            stripes.append(utils.vertices.FrameBasedRecordingRegion(
+                probe.size_in, n_frames))
 
-        # Build the input filters
-        in_conns = assembler.get_incoming_connections(probe)
-        (input_filter_region, input_filter_routing, _) =\
-            utils.vertices.make_filter_regions(in_conns, assembler.dt)
-
-        # Prepare the recording region
-        recording_region = utils.vertices.FrameBasedRecordingRegion(
-            probe.size_in, assembler.n_ticks)
+        system_region = utils.vertices.UnpartitionedListRegion(system_items)
+        input_filter_region = utils.vertices.UnpartitionedListRegion(
+            filter_items)
+        input_filter_routing = utils.vertices.UnpartitionedListRegion(
+            routing_items)
+        recording_region = utils.vertices.StripedRecordingRegion(stripes)
 
         return cls(system_region, input_filter_region, input_filter_routing,
-                   recording_region, probe.probe)
+                   recording_region, [p.probe for p in probes],
+                   [p.size_in for p in probes], sample_ticks)
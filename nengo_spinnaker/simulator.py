@@ -44,13 +44,90 @@ class Simulator(object):
 
             plt.eventplot(sim.data[p], colors=[[0, 0, 1]])
 
+        For large populations or long runs a compact representation may be
+        requested instead, in which case the data is a
+        :py:class:`~nengo_spinnaker.utils.probes.SparseSpikes` of neuron
+        indices and spike ticks::
+
+            config = nengo_spinnaker.Config()
+            config[p].spike_format = 'sparse'
+
+        Only the spikes of probed neurons are recorded, so where only a few
+        neurons of a large population are of interest a slice of its neurons
+        may be probed instead.  Neurons are then numbered by their position
+        in the slice::
+
+            p = nengo.Probe(target.neurons[:100], 'spikes')
+
+        Spikes are recorded on the board either as a bitfield of the neurons
+        for every tick or, for sparsely firing populations, as a list of the
+        neurons which spiked.  Whichever is expected to use less memory
+        given the maximum firing rates of the neurons is used unless one is
+        requested::
+
+            config[p].spike_recording = 'events'  # or 'bitfield'
+
+    Decoded value probes
+        Values are returned as float64 arrays by default.  Long recordings may
+        instead be returned as float32 or written directly to a memory-mapped
+        `.npy` file::
+
+            config[p].dtype = np.float32
+            config[p].npy_file = "p.npy"
+
+        Probes with a `sample_every` are only recorded on the board once per
+        sampling period.  Values may be averaged over each period, rather than
+        sampled at its end::
+
+            p = nengo.Probe(target, sample_every=0.01)
+            config[p].average = True
+
+        Spikes of Ensembles probed with a `sample_every` are accumulated
+        over each sampling period and reported at its end.
+
+        The decoded output of an Ensemble is usually recorded by a separate
+        core which receives it as any other output.  It may instead be
+        recorded by the cores simulating the Ensemble, and filtered on the
+        host, so long as the probe has no synapse or a lowpass synapse::
+
+            p = nengo.Probe(target, synapse=0.01)
+            config[p].record_on_ensemble = True
+
+    Retrieval
+        The data of each probe is retrieved from the board and decoded when it
+        is first accessed, so probes whose data is never used cost nothing.
+        Data should be accessed before the machine is next used, or the
+        Simulator may be asked to retrieve all data in the background as soon
+        as the simulation is complete::
+
+            sim = nengo_spinnaker.Simulator(model, prefetch_probes=True)
+
+    Long and indefinite runs
+        Probed data is recorded on the board into circular buffers which hold
+        `recording_buffer` seconds of data.  If the run is longer than this,
+        or of unspecified length, then the buffers are read periodically
+        during the simulation and data is retrieved when the simulation is
+        stopped (e.g., with Ctrl+C).  Spikes recorded as events are always
+        read during the simulation.  :py:func:`trange` gives the time steps
+        which were recorded.
+
     Voltage probes
         Currently not supported.
 
     :attr data: A dictionary mapping Probes to the data they probed.
+    :attr latency: A :py:class:`~nengo_spinnaker.utils.timing.LinkLatency`
+        holding the latency of communication between host and board during
+        the last run, if the IO measures it.
+    :attr host_step_times: A
+        :py:class:`~nengo_spinnaker.utils.timing.LatencyRecorder` of the time
+        taken by each step of the Nodes simulated on the host.
+    :attr host_node_times: A dictionary mapping each Node simulated on the
+        host to a :py:class:`~nengo_spinnaker.utils.timing.LatencyRecorder` of
+        the time taken to evaluate it.
     """
     def __init__(self, model, machine_name=None, seed=None, io=None,
-                 config=None):
+                 config=None, host_threads=None, recording_buffer=10.,
+                 retrieval_connections=4, prefetch_probes=False):
         """Initialise the simulator with a model, machine and IO preferences.
 
         :param nengo.Network model: The model to simulate
@@ -65,11 +142,31 @@ class Simulator(object):
             to communicate with the SpiNNaker board. If None then an Ethernet
             connection is used by default.
         :param config: Configuration as required for components.
+        :param host_threads: Number of threads with which to evaluate
+            independent host Nodes concurrently, by default Nodes are
+            evaluated sequentially.
+        :param recording_buffer: Length of time (in seconds) for which data
+            recorded by probes is buffered on the board.  Data is read from
+            the board during the simulation if the run is longer than this or
+            of unspecified length.
+        :param retrieval_connections: Number of connections to the machine
+            with which probed data is read concurrently.
+        :param prefetch_probes: Retrieve the data of every probe in the
+            background once the simulation is complete, rather than only when
+            it is first accessed.
         """
         dt = 0.001
         self.dt = dt
         self.executed = False
+        self.latency = None
+        self.host_step_times = None
+        self.host_node_times = None
         self.config = config if config is not None else Config()
+        self.host_threads = host_threads
+        self.recording_buffer = recording_buffer
+        self.retrieval_connections = retrieval_connections
+        self.prefetch_probes = prefetch_probes
+        self.data = dict()
 
         # Get the hostname
         if machine_name is None:
@@ -94,7 +191,7 @@ class Simulator(object):
 
         # Build the model
         (self.objs, self.conns, self.keyspace) =\
-            builder.Builder.build(model, dt, seed)
+            builder.Builder.build(model, dt, seed, self.config)
 
     def run(self, time_in_seconds=None, clean=True):
         """Run the model for the specified amount of time.
@@ -151,28 +248,62 @@ class Simulator(object):
 
         # Prepare the network for IO
         (objs, conns) = self.io.prepare_network(objs, conns, self.dt,
-                                                self.keyspace)
+                                                self.keyspace, self.config)
 
         # Assemble the model for simulation
         asmblr = assembler.Assembler()
         vertices, edges = asmblr(
-            objs, conns, time_in_seconds, self.dt)
-
-        # Set up host simulator
-        host_sim = nengo.Simulator(host_network, dt=self.dt)
+            objs, conns, time_in_seconds, self.dt, self.config,
+            recording_buffer=self.recording_buffer)
+
+        # Set up host simulator, Nodes which require it are simulated in a
+        # separate process.
+        (host_network, worker_network) =\
+            utils.host_process.split_host_network(host_network, self.config)
+        host_sim = utils.host.HostExecutor(host_network, self.dt,
+                                           self.config, self.host_threads)
+        host_process = None
+        if len(worker_network.nodes) > 0:
+            host_process = utils.host_process.HostProcess(
+                worker_network, self.io, self.dt, self.config)
+            host_sim.workers.append(host_process)
 
         # Build the list of probes
         self.probes = list()
         for vertex in vertices:
             if isinstance(vertex, probe.DecodedValueProbe):
-                self.probes.append(
-                    utils.probes.DecodedValueProbe(vertex, vertex.probe))
+                for p in vertex.probes:
+                    self.probes.append(
+                        utils.probes.DecodedValueProbe(vertex, p))
             else:
                 if hasattr(vertex, 'probes'):
                     for p in vertex.probes:
                         if p.attr == 'spikes':
                             self.probes.append(
-                                utils.probes.SpikeProbe(vertex, p))
+                                utils.probes.SpikeProbe(
+                                    vertex, p, self.config[p].spike_format))
+                for c in getattr(vertex, 'recorded_connections', []):
+                    self.probes.append(utils.probes.EnsembleOutputProbe(
+                        vertex, c, self.dt,
+                        self.config[c.post_obj.probe].average))
+
+        # Probed data is read over connections which keep a window of SCP
+        # requests outstanding, and is read during the simulation if the
+        # recording regions cannot hold the whole run.  Spike events are
+        # always read during the simulation as their buffers are sized for
+        # the expected rates of the neurons, which may be exceeded.
+        # Connections are only opened when data is first read.
+        connect = lambda: utils.scp.SCPConnection(self.machine_name)
+        retriever = utils.probes.ProbeRetriever(
+            None, self.retrieval_connections, connect)
+        streamer = None
+        records_events = any(isinstance(p, utils.probes.SpikeProbe) and
+                             p.records_events for p in self.probes)
+        if asmblr.n_recording_ticks < asmblr.n_ticks or records_events or (
+                time_in_seconds is None and len(self.probes) > 0):
+            streamer = utils.probes.ProbeStreamer(
+                self.probes, retriever,
+                asmblr.n_recording_ticks * self.dt / 4.)
 
         # PACMANify!
         for vertex in vertices:
@@ -186,7 +317,9 @@ class Simulator(object):
         # simulation time, not pause in the TxRx.
         self.controller.dao.run_time = None
 
-        self.controller.set_tag_output(1, 17895)  # Only reqd. for Ethernet
+        # Register IP tags for IO which requires them
+        if hasattr(self.io, 'configure_tags'):
+            self.io.configure_tags(self.controller)
         self.controller.map_model()
         self.controller.generate_output()
 
@@ -196,8 +329,12 @@ class Simulator(object):
 
             # Start the IO and perform host computation
             with self.io as node_io:
+                if host_process is not None:
+                    host_process.start()
                 self.controller.run(self.controller.dao.app_id)
                 node_io.start()
+                if streamer is not None:
+                    streamer.start()
 
                 current_time = 0.
                 try:
@@ -259,15 +396,29 @@ class Simulator(object):
                                 time.sleep(10.)
                 except KeyboardInterrupt:
                     logger.debug("Stopping simulation.")
-
-            # Retrieve any probed values
-            logger.debug("Retrieving data from the board.")
-            self.data = dict()
-            if time_in_seconds is not None:
-                for p in self.probes:
-                    self.data[p.probe] = p.get_data(self.controller.txrx)
-
+                finally:
+                    host_sim.close()
+                    if host_process is not None:
+                        host_process.stop()
+                        logger.debug("Separate host process steps: %s" %
+                                     host_process.step_times)
+                    if streamer is not None:
+                        streamer.stop()
+
+            # Retain the latency of host<->board communication and the time
+            # taken by each step of the host simulation.
+            self.latency = getattr(self.io, 'latency', None)
+            self.host_step_times = host_sim.step_times
+            self.host_node_times = host_sim.node_times
+
+            # Probed values are retrieved when first accessed
+            self.data = utils.probes.ProbeData(self.probes, retriever,
+                                               self.config)
         finally:
+            # Close any connections opened to read probed data during the
+            # simulation, retrievals open their own.
+            retriever.close()
+
             # Stop the application from executing
             try:
                 logger.info("Stopping the application from executing.")
@@ -282,6 +433,10 @@ class Simulator(object):
             except Exception:
                 pass
 
+        # Prefetch only once the application has stopped recording
+        if self.prefetch_probes:
+            self.data.prefetch()
+
     def reset(self):
         """Reset the Simulator.
 
@@ -301,14 +456,13 @@ class Simulator(object):
         if self.time_in_seconds is not None:
             dt = self.dt if dt is None else dt
             return dt * np.arange(int(self.time_in_seconds/dt))
+
+        # Otherwise the run time is given by the number of ticks recorded by
+        # the probes.
+        n_ticks = getattr(self.data, 'n_ticks', None)
+        if n_ticks is not None:
+            dt = self.dt if dt is None else dt
+            return dt * np.arange(int(n_ticks * self.dt / dt))
         else:
-            # TODO: Allow some probing for unspecified run time... Will require
-            #       writing the final run time back somehow. (When we have
-            #       masses of bandwidth we could even probe on
-            #       on host)
-            #       The other option is to dynamically switch the model so that
-            #       we probe as best as we can on host when no run time is
-            #       specified.  This would require some rearranging of the
-            #       Builder.
             raise NotImplementedError('Cannot provide time steps for '
-                                      'indefinite run time.')
+                                      'indefinite run time without probes.')
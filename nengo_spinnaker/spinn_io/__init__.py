@@ -1,4 +1,7 @@
-from ethernet import Ethernet
+from capture import PacketRecorder, Replay
+from ethernet import Ethernet, EthernetLink, MultiEthernet
+from policies import FixedRate, OnChange, TokenBucket
+from standin import SCPStandIn, SDPStandIn
 
 try:
     from uart import UART, SpIOUARTProtocol, NSTSpiNNlinkProtocol
@@ -0,0 +1,245 @@
+"""Throughput and latency benchmarks for the Ethernet IO.
+
+A model of host Nodes feeding and reading from Ensembles is built and
+prepared for Ethernet IO as usual, but the Rx and Tx elements are bound to an
+:py:class:`~nengo_spinnaker.spinn_io.standin.SDPStandIn` rather than to cores
+on a SpiNNaker board.  The benchmark reports packets per second and latency
+percentiles in each direction, and the host CPU time used per packet.
+
+The stand-in runs within the same process, so the reported CPU time includes
+the (small) cost of the stand-in itself.
+
+Run as a script to print results, or to compare against a stored baseline::
+
+    python -m nengo_spinnaker.spinn_io.benchmark --save-baseline base.json
+    python -m nengo_spinnaker.spinn_io.benchmark --baseline base.json
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+
+import nengo
+import numpy as np
+
+from ..builder import Builder
+from ..utils import sdp
+from ..utils.timing import LatencyRecorder
+from .ethernet import Ethernet, EthernetLink
+from .policies import FixedRate
+from .standin import SDPStandIn
+
+
+# Metrics which regress when they fall and when they rise
+HIGHER_IS_BETTER = ['tx_rate', 'rx_rate']
+LOWER_IS_BETTER = ['tx_latency_p50', 'tx_latency_p99',
+                   'rx_latency_p50', 'rx_latency_p99', 'cpu_per_packet']
+
+
+class _BenchmarkEthernet(Ethernet):
+    """Ethernet IO which additionally records the latency of packets emitted
+    by the stand-in.
+    """
+    def __init__(self, standin, *args, **kwargs):
+        super(_BenchmarkEthernet, self).__init__(*args, **kwargs)
+        self.standin = standin
+        self.rx_latency = LatencyRecorder()
+
+    def sdp_receive(self, data):
+        now = time.time()
+        super(_BenchmarkEthernet, self).sdp_receive(data)
+
+        # Get the source of the packet and the sequence number held in the
+        # first value.
+        header = sdp.unpack_sdp(data[:sdp.SDP_HEADER.size])
+        (cmd_rc, ) = struct.unpack_from("<H", data, sdp.SDP_HEADER.size)
+        if cmd_rc == sdp.CMD_ACK:
+            return  # Acknowledgements carry no values
+        (seq, ) = struct.unpack_from(
+            "<I", data, sdp.SDP_HEADER.size + sdp.CMD_HEADER.size)
+        xyp = (header.src_x, header.src_y, header.src_cpu)
+
+        emitted = self.standin.emit_times[xyp].get(seq >> 15)
+        if emitted is not None:
+            self.rx_latency.record(now - emitted)
+
+
+def build_benchmark_model(n_nodes, n_dims, n_neurons=50):
+    """Create a model in which each of `n_nodes` host Nodes feeds an Ensemble
+    which in turn feeds another host Node.
+
+    :returns: (model, input Nodes)
+    """
+    model = nengo.Network("Ethernet IO benchmark")
+    in_nodes = list()
+    with model:
+        for i in range(n_nodes):
+            a = nengo.Node(lambda t: np.zeros(n_dims), size_out=n_dims)
+            b = nengo.Ensemble(n_neurons, n_dims)
+            c = nengo.Node(lambda t, x: None, size_in=n_dims)
+
+            nengo.Connection(a, b)
+            nengo.Connection(b, c)
+            in_nodes.append(a)
+
+    return model, in_nodes
+
+
+def run_benchmark(duration=5., n_nodes=4, n_dims=4, output_rate=1000.,
+                  input_rate=100., loss=0., jitter=0., tx_policy=None,
+                  port=17895, sdp_port=17893, dt=0.001, seed=None):
+    """Benchmark the Ethernet IO against a stand-in board.
+
+    :param duration: Length of the benchmark in seconds.
+    :param n_nodes: Number of host Nodes feeding and fed by the board.
+    :param n_dims: Dimensionality of each Node.
+    :param output_rate: Rate (per second) at which the output of each Node is
+                        set.
+    :param input_rate: Rate (per second) at which each Tx element emits input
+                       for its Node.
+    :param loss: Probability of packet loss in the stand-in.
+    :param jitter: Maximum delay introduced by the stand-in.
+    :param tx_policy: Transmission policy used by the IO.
+    :returns: Dictionary of results.
+    """
+    model, in_nodes = build_benchmark_model(n_nodes, n_dims)
+    (objs, conns, keyspace) = Builder.build(model, dt, seed)
+
+    # Prepare the network for IO via a single link to the stand-in
+    standin = SDPStandIn(sdp_port, "localhost", port, loss, jitter, seed)
+    link = EthernetLink("localhost", 0, 0, 1, port, sdp_port)
+    if tx_policy is None:
+        tx_policy = FixedRate(0.001)
+    io = _BenchmarkEthernet(standin, "localhost", port, tx_policy=tx_policy,
+                            links=[link])
+    io.prepare_network(objs, conns, dt, keyspace)
+
+    # Bind the Tx elements to sources in the stand-in and the Rx elements to
+    # cores which will receive packets.
+    node_xyps = dict()
+    for (i, (node, tx)) in enumerate(io.nodes_tx.items()):
+        node_xyps[node] = (0, 0, i + 1)
+        standin.add_source(0, 0, i + 1, node.size_in, input_rate, link.tag)
+
+    rx_xyps = dict()
+    for (i, rx) in enumerate(io.rx_elements):
+        rx_xyps[rx] = (1, 0, i + 1)
+
+    # Record the latency of host->board packets by sequence number
+    set_times = dict()
+    tx_latency = LatencyRecorder()
+
+    def receive(xyp, values, t):
+        sent = set_times.get(int(round(values[0])))
+        if sent is not None:
+            tx_latency.record(t - sent)
+
+    standin.add_receiver(receive)
+
+    with standin:
+        io.open(node_xyps, rx_xyps)
+        try:
+            io.start()
+
+            cpu_start = sum(os.times()[:2])
+            start = time.time()
+            n_outputs = 0
+            value = np.zeros(n_dims)
+            while time.time() - start < duration:
+                # Set the output of every Node, the first value holds a
+                # sequence number.
+                seq = n_outputs % (1 << 15)
+                value[0] = seq
+                set_times[seq] = time.time()
+                for node in in_nodes:
+                    io.set_node_output(node, value)
+                n_outputs += 1
+
+                # Wait until the next output should be set
+                wait = start + n_outputs / output_rate - time.time()
+                if wait > 0.:
+                    time.sleep(wait)
+
+            elapsed = time.time() - start
+            cpu = sum(os.times()[:2]) - cpu_start
+        finally:
+            io.stop()
+
+    n_tx = standin.n_consumed
+    n_rx = sum(r.count for r in io.rx_rates.values())
+    results = dict(duration=elapsed, n_nodes=n_nodes, n_dims=n_dims,
+                   loss=loss, jitter=jitter,
+                   tx_packets=n_tx, rx_packets=n_rx,
+                   tx_rate=n_tx / elapsed, rx_rate=n_rx / elapsed,
+                   cpu_per_packet=cpu / max(1, n_tx + n_rx))
+    for (name, recorder) in [('tx_latency', tx_latency),
+                             ('rx_latency', io.rx_latency)]:
+        for q in (50, 90, 99):
+            results['%s_p%d' % (name, q)] = recorder.percentile(q)
+
+    return results
+
+
+def check_regression(results, baseline, tolerance=0.2):
+    """Compare benchmark results against a baseline.
+
+    :param tolerance: Fractional change in any metric which is considered a
+                      regression.
+    :returns: A list of strings describing each regression.
+    """
+    regressions = list()
+    for metric in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+        new = results.get(metric)
+        old = baseline.get(metric)
+        if new is None or old is None:
+            continue
+
+        if metric in HIGHER_IS_BETTER and new < old * (1. - tolerance):
+            regressions.append("%s fell from %g to %g" % (metric, old, new))
+        elif metric in LOWER_IS_BETTER and new > old * (1. + tolerance):
+            regressions.append("%s rose from %g to %g" % (metric, old, new))
+
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Ethernet IO against a stand-in board.")
+    parser.add_argument("--duration", type=float, default=5.)
+    parser.add_argument("--nodes", type=int, default=4)
+    parser.add_argument("--dims", type=int, default=4)
+    parser.add_argument("--output-rate", type=float, default=1000.)
+    parser.add_argument("--input-rate", type=float, default=100.)
+    parser.add_argument("--loss", type=float, default=0.)
+    parser.add_argument("--jitter", type=float, default=0.)
+    parser.add_argument("--baseline", help="Compare against this baseline")
+    parser.add_argument("--save-baseline", help="Save results as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(args)
+
+    results = run_benchmark(args.duration, args.nodes, args.dims,
+                            args.output_rate, args.input_rate, args.loss,
+                            args.jitter)
+    for (k, v) in sorted(results.items()):
+        print("%-16s %s" % (k, v))
+
+    if args.save_baseline is not None:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            regressions = check_regression(results, json.load(f),
+                                           args.tolerance)
+        for r in regressions:
+            print("REGRESSION: %s" % r)
+        return 1 if len(regressions) > 0 else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
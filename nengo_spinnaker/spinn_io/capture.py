@@ -0,0 +1,286 @@
+"""Capture of host<->board packets and their deterministic replay.
+
+A :py:class:`PacketRecorder` may be attached to the Ethernet or UART IO to
+log every SDP datagram or multicast packet exchanged with the board::
+
+    io = nengo_spinnaker.io.Ethernet(machine_name)
+    io.recorder = nengo_spinnaker.io.PacketRecorder("run.cap")
+    sim = nengo_spinnaker.Simulator(model, io=io)
+    sim.run(10.)
+    io.recorder.close()
+
+A :py:class:`Replay` feeds the packets received from the board back through
+an IO object of the same type, without a board, so that the host side of a
+model may be run reproducibly (see :py:func:`replay_host`).
+
+Capture files start with a short header followed by records, each of which
+is a fixed size header (timestamp, kind, direction, length) followed by
+`length` bytes of data:
+
+* SDP records contain a complete datagram.
+* MC records contain little-endian (key, payload) word pairs.
+* MAP records contain the index of a Node amongst the Nodes of the model and
+  the (x, y, p) of the core communicating on its behalf, followed by the
+  label of the Node.
+"""
+
+import collections
+import struct
+import threading
+import time
+
+import nengo
+import numpy as np
+
+from .. import builder, node, utils
+from ..config import Config
+
+FILE_HEADER = struct.Struct("<4sH")
+MAGIC = "NSPC"
+VERSION = 1
+
+RECORD_HEADER = struct.Struct("<dBBH")
+MAP_RECORD = struct.Struct("<H3B")
+
+# Record kinds
+SDP = 0
+MC = 1
+MAP = 2
+
+# Directions
+TX = 0  # Host to board
+RX = 1  # Board to host
+
+Record = collections.namedtuple('Record',
+                                ['time', 'kind', 'direction', 'data'])
+
+
+class PacketRecorder(object):
+    """Records host<->board packets to a binary capture file.
+
+    :param filename: The file to record to, it is overwritten.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.fp = open(filename, 'wb')
+        self.fp.write(FILE_HEADER.pack(MAGIC, VERSION))
+        self.lock = threading.Lock()
+        self.n_records = 0
+
+    def _write(self, kind, direction, data, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            self.fp.write(RECORD_HEADER.pack(now, kind, direction, len(data)))
+            self.fp.write(data)
+            self.n_records += 1
+
+    def record_sdp(self, direction, data):
+        """Record an SDP datagram."""
+        self._write(SDP, direction, data)
+
+    def record_mc(self, direction, keys, payloads):
+        """Record a batch of multicast packets."""
+        words = np.empty((len(keys), 2), dtype='<u4')
+        words[:, 0] = keys
+        words[:, 1] = payloads
+
+        # Records are limited in length, split large batches
+        data = words.tostring()
+        for i in range(0, len(data), 0xfff8):
+            self._write(MC, direction, data[i:i + 0xfff8])
+
+    def record_map(self, index, xyp, label):
+        """Record that the Node with the given index is served by the given
+        core.
+        """
+        self._write(MAP, TX, MAP_RECORD.pack(index, *xyp) +
+                    str(label)[:0xff00])
+
+    def flush(self):
+        with self.lock:
+            self.fp.flush()
+
+    def close(self):
+        with self.lock:
+            self.fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, traceback):
+        self.close()
+
+
+def read_capture(filename):
+    """Iterate over the records in a capture file.
+
+    :raises: :py:exc:`ValueError` if the file is not a capture file.
+    """
+    with open(filename, 'rb') as fp:
+        (magic, version) = FILE_HEADER.unpack(fp.read(FILE_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("%s is not a packet capture file" % filename)
+
+        while True:
+            header = fp.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                break
+
+            (t, kind, direction, length) = RECORD_HEADER.unpack(header)
+            data = fp.read(length)
+            if len(data) < length:
+                break  # Truncated record
+            yield Record(t, kind, direction, data)
+
+
+def unpack_mc(data):
+    """Unpack the data of an MC record into arrays of keys and payloads."""
+    words = np.frombuffer(data, dtype='<u4').reshape(-1, 2)
+    return words[:, 0], words[:, 1]
+
+
+def unpack_map(data):
+    """Unpack the data of a MAP record into the Node index, (x, y, p) and
+    label.
+    """
+    (index, x, y, p) = MAP_RECORD.unpack_from(data)
+    return index, (x, y, p), data[MAP_RECORD.size:]
+
+
+class Replay(object):
+    """IO which replays captured board->host packets through another IO
+    object rather than communicating with a board.
+
+    The wrapped IO decodes the packets as it would during a live simulation,
+    and output set for Nodes is processed by the wrapped IO but not
+    transmitted.  The model must be built identically to that which was
+    captured.
+
+    :param io: An (unused) Ethernet or UART IO object of the same type as
+               that which made the capture.  A UART should be built with
+               `protocol=None` so that no serial connection is opened.
+    :param filename: The capture file.
+    :param speed: Factor by which to accelerate the replay, or None to replay
+                  packets as fast as possible.
+    """
+    def __init__(self, io, filename, speed=1.):
+        self.target = io
+        self.filename = filename
+        self.speed = speed
+
+        self.nodes = list()
+        self.n_replayed = 0
+        self.n_outputs = 0
+        self.finished = threading.Event()
+        self.stop_now = False
+        self.thread = None
+
+    @property
+    def io(self):
+        return self
+
+    def prepare_network(self, objects, connections, dt, keyspace,
+                        config=None):
+        # Nodes are identified by their order in the model
+        self.nodes = [o for o in objects if isinstance(o, nengo.Node)]
+        return self.target.prepare_network(objects, connections, dt, keyspace,
+                                           config)
+
+    def __enter__(self):
+        # Read the capture, bind the IO to the cores which communicated on
+        # behalf of each Node and retain the received packets for replay.
+        node_xyps = dict()
+        self.records = list()
+        for record in read_capture(self.filename):
+            if record.kind == MAP:
+                (index, xyp, _) = unpack_map(record.data)
+                node_xyps[self.nodes[index]] = xyp
+            elif record.direction == RX:
+                self.records.append(record)
+
+        self.target.bind(node_xyps, dict())
+        return self
+
+    def __exit__(self, exc_type, exc_val, traceback):
+        self.stop()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.replay_loop,
+                                       name="Replay")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.stop_now = True
+        if self.thread is not None:
+            self.thread.join()
+
+    def replay_loop(self):
+        """Deliver captured packets to the IO at the recorded times, scaled
+        by the replay speed.
+        """
+        start = time.time()
+        for record in self.records:
+            if self.stop_now:
+                break
+
+            if self.speed:
+                wait = (start + (record.time - self.records[0].time) /
+                        self.speed - time.time())
+                if wait > 0.:
+                    time.sleep(wait)
+
+            if record.kind == SDP:
+                self.target.sdp_receive(record.data)
+            elif record.kind == MC:
+                self.target.receive_mc_packets(*unpack_mc(record.data))
+            self.n_replayed += 1
+
+        self.finished.set()
+
+    def get_node_input(self, node):
+        return self.target.get_node_input(node)
+
+    def set_node_output(self, node, output):
+        self.target.set_node_output(node, output)
+        self.n_outputs += 1
+
+
+def replay_host(model, replay, duration=None, dt=0.001, seed=None,
+                config=None):
+    """Simulate the host portion of a model with input replayed from a
+    capture.
+
+    :param model: The model which was captured.
+    :param replay: A :py:class:`Replay` IO.
+    :param duration: Simulated time for which to run, or None to run until
+                     the capture has been replayed.
+    :returns: A :py:class:`~nengo_spinnaker.utils.timing.LatencyRecorder` of
+              the time taken by each host simulation step.
+    """
+    config = Config() if config is None else config
+    (objs, conns, keyspace) = builder.Builder.build(model, dt, seed, config)
+    (objs, conns) = node.replace_function_of_time_nodes(
+        objs, conns, config, duration, dt)
+
+    # Build the host network and prepare the replayed IO as the simulator
+    # would.
+    host_network = utils.nodes.create_host_network(
+        [c.to_connection() if isinstance(c.pre_obj, nengo.Node) and
+         isinstance(c.post_obj, nengo.Node) else c for c in conns],
+        replay, config)
+    replay.prepare_network(objs, conns, dt, keyspace, config)
+    host_sim = utils.host.HostExecutor(host_network, dt, config)
+
+    step_times = utils.timing.LatencyRecorder()
+    with replay as io:
+        io.start()
+
+        n_steps = None if duration is None else int(round(duration / dt))
+        while (n_steps is None and not replay.finished.is_set() or
+               n_steps is not None and host_sim.n_steps < n_steps):
+            s = time.time()
+            host_sim.step()
+            step_times.record(time.time() - s)
+
+    return step_times
@@ -1,16 +1,21 @@
 import collections
 import logging
 import numpy as np
+import select
 import socket
 import struct
 import threading
+import time
 
 import nengo
 
 from pacman103.core.spinnman.sdp import sdp_message as sdp
 
 from nengo_spinnaker.utils import fp
+from nengo_spinnaker.utils import sdp as sdp_format
 from nengo_spinnaker import assembler, utils
+from . import capture
+from .policies import FixedRate
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +29,46 @@ def stop_on_keyboard_interrupt(f):
     return f_
 
 
+EthernetLink = collections.namedtuple(
+    'EthernetLink', ['hostname', 'x', 'y', 'tag', 'port', 'sdp_port'])
+"""An Ethernet connected chip of a SpiNNaker machine.
+
+:param hostname: Address of the Ethernet connected chip.
+:param x: x co-ordinate of the Ethernet connected chip.
+:param y: y co-ordinate of the Ethernet connected chip.
+:param tag: IP tag with which packets for the host are sent via the chip.
+:param port: Port on which the host listens for packets sent via the chip.
+:param sdp_port: Port to which the host sends SDP packets for the chip.
+"""
+
+
+def hex_distance(x0, y0, x1, y1):
+    """Get the number of hops between two chips in the hexagonal mesh of a
+    SpiNNaker machine (ignoring wrap-around links).
+    """
+    dx = x1 - x0
+    dy = y1 - y0
+    if (dx >= 0) == (dy >= 0):
+        return max(abs(dx), abs(dy))
+    return abs(dx) + abs(dy)
+
+
+def select_link(links, loads, x, y, balance=0.):
+    """Select the link to use to communicate with a core on the given chip.
+
+    The nearest link is selected, but each dimension of traffic already
+    assigned to a link counts as `balance` additional hops.  Ties are broken
+    in favour of the least loaded link.
+
+    :param links: List of :py:class:`EthernetLink`.
+    :param loads: Dictionary mapping links to the number of dimensions of
+                  traffic already assigned to them.
+    """
+    return min(links, key=lambda l: (
+        hex_distance(l.x, l.y, x, y) + balance*loads.get(l, 0),
+        loads.get(l, 0)))
+
+
 class TransformFunctionCollection(object):
     def __init__(self, outkeys):
         self.outkeys = outkeys
@@ -52,6 +97,10 @@ class SDPRxVertex(utils.vertices.NengoVertex):
             self.output_keys)
         self.regions = list()
 
+        # Function which selects the link to acknowledge via given the
+        # placement
+        self.link_selector = None
+
     @property
     def remaining_dims(self):
         return 64 - sum(
@@ -59,8 +108,10 @@ class SDPRxVertex(utils.vertices.NengoVertex):
 
     @classmethod
     def assemble(cls, rx, assembler):
-        # Create the regions and monkey-patch them into the SDPRxVertex
-        system_items = [1000, 64-rx.remaining_dims]
+        # Create the regions and monkey-patch them into the SDPRxVertex, the
+        # IP tag and chip via which to acknowledge packets are filled in when
+        # the vertex has been placed.
+        system_items = [1000, 64-rx.remaining_dims, 1, 0x0000]
         system_region = utils.vertices.UnpartitionedListRegion(system_items)
         output_keys_region =\
             utils.vertices.UnpartitionedListRegion(rx.output_keys)
@@ -69,6 +120,15 @@ class SDPRxVertex(utils.vertices.NengoVertex):
 
         return rx
 
+    def generateDataSpec(self, processor, subvertex, dao):
+        if self.link_selector is not None:
+            link = self.link_selector(self, processor.get_coordinates())
+            self.regions[0].data[2] = link.tag
+            self.regions[0].data[3] = (link.x << 8) | link.y
+
+        return super(SDPRxVertex, self).generateDataSpec(
+            processor, subvertex, dao)
+
 assembler.Assembler.register_object_builder(SDPRxVertex.assemble, SDPRxVertex)
 
 
@@ -76,7 +136,8 @@ class SDPTxVertex(utils.vertices.NengoVertex):
     MODEL_NAME = 'nengo_tx'
     MAX_ATOMS = 1
 
-    def __init__(self, size_in, in_connections, dt, output_period=100):
+    def __init__(self, size_in, in_connections, dt, output_period=100,
+                 output_threshold=None):
         super(SDPTxVertex, self).__init__(1)
         """Create a new SDPTxVertex.
 
@@ -85,44 +146,114 @@ class SDPTxVertex(utils.vertices.NengoVertex):
         :param dt: Time step of the simulation.
         :param output_period: Period with which to transmit SDP packets (in
                               ticks)
+        :param output_threshold: If not None then a packet will be transmitted
+                                 early if the value changes by more than this
+                                 amount in any dimension.
         """
-        # Construct the data to be loaded onto the board
-        system_items = [size_in, 1000, output_period]
+        # Construct the data to be loaded onto the board, a threshold of None
+        # is represented by the maximum representable value.  The IP tag and
+        # destination chip are filled in when the vertex has been placed.
+        threshold = fp.bitsk(output_threshold if output_threshold is not None
+                             else 2**16)
+        system_items = [size_in, 1000, output_period, threshold, 1, 0x0000]
         system_region = utils.vertices.UnpartitionedListRegion(system_items)
         (input_filters, input_filter_routing, _) =\
             utils.vertices.make_filter_regions(in_connections, dt)
 
         # Create the regions
         self.regions = [system_region, input_filters, input_filter_routing]
+        self.size_in = size_in
 
+        # Function which selects the link to transmit via given the placement
+        self.link_selector = None
 
-class Ethernet(object):
-    """Ethernet communicator and Node builder."""
+    def generateDataSpec(self, processor, subvertex, dao):
+        # Select the Ethernet link to transmit via now that the vertex has
+        # been placed.
+        if self.link_selector is not None:
+            link = self.link_selector(self, processor.get_coordinates())
+            self.regions[0].data[4] = link.tag
+            self.regions[0].data[5] = (link.x << 8) | link.y
+
+        return super(SDPTxVertex, self).generateDataSpec(
+            processor, subvertex, dao)
 
-    def __init__(self, machinename, port=17895, input_period=10./32):
+
+class Ethernet(object):
+    """Ethernet communicator and Node builder.
+
+    :param machinename: Hostname of the SpiNNaker machine.
+    :param port: Port on which to listen for packets from the board.
+    :param input_period: Period with which to transmit Node output to the
+                         board if no `tx_policy` is given.
+    :param tx_policy: A :py:class:`~nengo_spinnaker.spinn_io.policies.\
+TransmitPolicy` which determines when fresh Node output is transmitted.
+    :param measure_latency: If True then transmitted values are timestamped
+                            and acknowledged by the board so that the
+                            latency of communication may be measured, see
+                            :py:attr:`latency`.
+    """
+
+    def __init__(self, machinename, port=17895, input_period=10./32,
+                 tx_policy=None, links=None, balance=0.,
+                 measure_latency=False):
         # General parameters
         self.machinename = machinename
         self.port = port
         self.input_period = input_period
         self.comms = None
 
+        # Ethernet connected chips via which to communicate, by default the
+        # single chip at (0, 0).
+        if links is None:
+            links = [EthernetLink(machinename, 0, 0, 1, port, 17893)]
+        self.links = links
+        self.balance = balance
+        self.vertex_links = dict()
+        self.link_loads = collections.defaultdict(int)
+
+        # Transmission policy, a copy is made for each Rx element
+        if tx_policy is None:
+            tx_policy = FixedRate(input_period)
+        self.tx_policy = tx_policy
+        self.tx_latency = utils.timing.LatencyRecorder()
+
+        # Round-trip and one-way latency of communication with the board
+        self.measure_latency = measure_latency
+        self.latency = utils.timing.LinkLatency()
+        self.tx_seq = 0
+
         self.rx_elements = list()
 
+        # Map Node --> index amongst the Nodes of the model
+        self.node_indices = dict()
+
+        # Optional recorder of all packets sent and received
+        self.recorder = None
+
+        # Map Node --> received packet rates
+        self.rx_rates = collections.defaultdict(utils.timing.RateMeter)
+
         # Map Node --> Tx
         self.nodes_tx = dict()
 
         # Map Node --> transform, function, buffer index, rx
         self.nodes_connections = collections.defaultdict(list)
 
-        # Map Rx --> Fresh
+        # Map Rx --> Fresh, time at which became fresh, last transmitted value
+        # and transmit policy
         self.rx_fresh = dict()
+        self.rx_fresh_time = dict()
+        self.rx_transmitted = dict()
+        self.rx_policies = dict()
         self.rx_buffers = collections.defaultdict(list)
 
     @property
     def io(self):
         return self
 
-    def prepare_network(self, objects, connections, dt, keyspace):
+    def prepare_network(self, objects, connections, dt, keyspace,
+                        config=None):
         """Swap out each Node with appropriate IO objects."""
         new_objs = list()
         new_conns = list()
@@ -133,6 +264,7 @@ class Ethernet(object):
                 # If not a Node then retain the object
                 new_objs.append(obj)
                 continue
+            self.node_indices[obj] = len(self.node_indices)
 
             out_conns = [c for c in connections if c.pre_obj == obj and
                          not isinstance(c.post_obj, nengo.Node)]
@@ -147,8 +279,11 @@ class Ethernet(object):
                         break
                 else:
                     rx = SDPRxVertex()
+                    rx.link_selector = self.get_vertex_link
                     self.rx_elements.append(rx)
                     self.rx_fresh[rx] = False
+                    self.rx_transmitted[rx] = None
+                    self.rx_policies[rx] = self.tx_policy.copy()
                     new_objs.append(rx)
 
                 rx.transforms_functions.append(tfk)
@@ -168,7 +303,10 @@ class Ethernet(object):
             in_conns = [c for c in connections if c.post_obj == obj and
                         not isinstance(c.pre_obj, nengo.Node)]
             if len(in_conns) > 0:
-                tx = SDPTxVertex(obj.size_in, in_conns, dt)
+                (period, threshold) = utils.nodes.get_output_period(
+                    obj, dt, config)
+                tx = SDPTxVertex(obj.size_in, in_conns, dt, period, threshold)
+                tx.link_selector = self.get_vertex_link
                 self.nodes_tx[obj] = tx
                 new_objs.append(tx)
 
@@ -184,51 +322,145 @@ class Ethernet(object):
 
         return new_objs, new_conns
 
+    def configure_tags(self, controller):
+        """Register the IP tags used to send packets to the host."""
+        for link in self.links:
+            controller.set_tag_output(link.tag, link.port)
+
+    def get_vertex_link(self, vertex, xyp):
+        """Get the link via which to communicate with the given placed vertex.
+
+        Links are assigned to vertices on first request and balanced according
+        to the number of dimensions each vertex transmits or receives.
+        """
+        if vertex not in self.vertex_links:
+            link = select_link(self.links, self.link_loads, xyp[0], xyp[1],
+                               self.balance)
+            self.vertex_links[vertex] = link
+
+            if isinstance(vertex, SDPRxVertex):
+                self.link_loads[link] += 64 - vertex.remaining_dims
+            else:
+                self.link_loads[link] += vertex.size_in
+
+        return self.vertex_links[vertex]
+
     def __enter__(self):
+        # Get the placements of the Tx and Rx elements
+        node_xyps = dict()
+        for (node, tx) in self.nodes_tx.items():
+            node_xyps[node] =\
+                tx.subvertices[0].placement.processor.get_coordinates()
+
+        rx_xyps = dict()
+        for rx in self.rx_elements:
+            rx_xyps[rx] =\
+                rx.subvertices[0].placement.processor.get_coordinates()
+
+        return self.open(node_xyps, rx_xyps)
+
+    def open(self, node_xyps, rx_xyps):
+        """Prepare to communicate with Tx and Rx elements placed on the given
+        cores.
+
+        :param node_xyps: Map of Node to the (x, y, p) of its Tx element.
+        :param rx_xyps: Map of Rx element to its (x, y, p).
+        """
+        self.bind(node_xyps, rx_xyps)
+
+        # Sockets, one to listen for packets via each link
+        self.in_sockets = list()
+        for link in self.links:
+            in_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            in_socket.setblocking(0)
+            in_socket.bind(("", link.port))
+            self.in_sockets.append(in_socket)
+
+        self.out_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.out_socket.setblocking(0)
+
+        # Tx and Rx threads, an error which ends the Rx thread is raised when
+        # communication is stopped.
+        self.stop_now = False
+        self.rx_timeout = 0.1
+        self.rx_error = None
+        self.rx_thread = threading.Thread(target=self.sdp_rx_loop,
+                                          name="EthernetRx")
+        self.rx_thread.daemon = True
+        self.tx_thread = threading.Thread(target=self.sdp_tx_loop,
+                                          name="EthernetTx")
+        self.tx_thread.daemon = True
+
+        return self
+
+    def bind(self, node_xyps, rx_xyps):
+        """Build the state necessary to decode packets from and compute
+        output for the Tx and Rx elements placed on the given cores, without
+        opening any sockets.
+        """
         # Generate a map of x, y, p to Node for received input, a cache of Node
         # input
         self.xyp_nodes = dict()
         self.node_inputs = dict()
-        for (node, tx) in self.nodes_tx.items():
-            xyp = tx.subvertices[0].placement.processor.get_coordinates()
+        for (node, xyp) in node_xyps.items():
             self.xyp_nodes[xyp] = node
             self.node_inputs[node] = None
 
-        # Sockets
-        self.in_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.in_socket.setblocking(0)
-        self.in_socket.bind(("", self.port))
+        # Generate a map of Rx to x, y, p and the link to transmit via
+        self.rx_xyps = dict()
+        for (rx, xyp) in rx_xyps.items():
+            self.rx_xyps[rx] = (xyp, self.get_vertex_link(rx, xyp))
 
-        self.out_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.out_socket.setblocking(0)
-
-        # Locks
+        # Locks, the output lock is also used to wake the Tx thread when
+        # output becomes fresh.
         self.input_lock = threading.Lock()
-        self.output_lock = threading.Lock()
+        self.output_lock = threading.Condition()
 
-        # Tx, Rx timers
-        self.stop_now = False
-        self.tx_period = self.input_period
-        self.rx_period = 0.0005
-        self.rx_timer = threading.Timer(self.rx_period, self.sdp_rx_tick)
-        self.rx_timer.name = "EthernetRx"
-        self.tx_timer = threading.Timer(self.tx_period, self.sdp_tx_tick)
-        self.tx_timer.name = "EthernetTx"
-
-        return self
+        # Record which core serves each Node so that captures may be replayed
+        if self.recorder is not None:
+            for (node, xyp) in node_xyps.items():
+                self.recorder.record_map(self.node_indices[node], xyp, node)
 
     def start(self):
-        self.tx_timer.start()
-        self.rx_timer.start()
+        self.tx_thread.start()
+        self.rx_thread.start()
 
     def stop(self):
-        self.stop_now = True
-
-        self.tx_timer.cancel()
-        self.rx_timer.cancel()
-        self.in_socket.close()
+        """Stop communicating with the board, raising any error which ended
+        the reception of input early as the input of Nodes would otherwise be
+        stale.
+        """
+        # Wake the Tx thread so that it may terminate, and wait for any
+        # transmission or reception in progress to complete before closing
+        # the sockets.
+        with self.output_lock:
+            self.stop_now = True
+            self.output_lock.notify()
+
+        for thread in (self.tx_thread, self.rx_thread):
+            if (thread.is_alive() and
+                    thread is not threading.current_thread()):
+                thread.join()
+
+        for in_socket in self.in_sockets:
+            in_socket.close()
         self.out_socket.close()
 
+        if self.recorder is not None:
+            self.recorder.flush()
+
+        logger.debug("Host->board transmission latency: %s" %
+                     self.tx_latency.summary())
+        if self.measure_latency:
+            logger.debug("Host<->board link latency: %s" %
+                         self.latency.summary())
+        for (node, rate) in self.rx_rates.items():
+            logger.debug("Board->host input for %s received at %s Hz" %
+                         (node, rate.rate))
+
+        if self.rx_error is not None:
+            raise self.rx_error
+
     def __exit__(self, exc_type, exc_val, traceback):
         self.stop()
 
@@ -247,72 +479,183 @@ class Ethernet(object):
 
         :raises: :py:exc:`KeyError` if the Node is not recognised.
         """
-        # For each unique connection compute the output and store in the buffer
-        for (tf, buf, rx) in self.nodes_connections[node]:
-            c_output = output
-            if tf.function is not None:
-                c_output = tf.function(c_output)
-            buf[:] = np.dot(tf.transform, c_output)
-            self.rx_fresh[rx] = True
+        with self.output_lock:
+            # For each unique connection compute the output and store in the
+            # buffer
+            rxs = list()
+            for (tf, buf, rx) in self.nodes_connections[node]:
+                c_output = output
+                if tf.function is not None:
+                    c_output = tf.function(c_output)
+                buf[:] = np.dot(tf.transform, c_output)
+
+                if rx not in rxs:
+                    rxs.append(rx)
+
+            # Mark Rx elements as fresh if their output has changed
+            # significantly since it was last transmitted.
+            for rx in rxs:
+                if self.rx_fresh[rx]:
+                    continue
+
+                values = np.hstack(self.rx_buffers[rx])
+                if self.rx_policies[rx].is_significant(
+                        self.rx_transmitted[rx], values):
+                    self.rx_fresh[rx] = True
+                    self.rx_fresh_time[rx] = time.time()
+
+            # Wake the Tx thread
+            self.output_lock.notify()
 
     @stop_on_keyboard_interrupt
-    def sdp_tx_tick(self):
-        """Transmit packets to the SpiNNaker board.
+    def sdp_tx_loop(self):
+        """Transmit fresh output to the SpiNNaker board as allowed by the
+        transmission policy of each Rx element.
         """
-        # Look for Rx elements with fresh output, transmit the output and
-        # mark as stale.
-        for rx in self.rx_elements:
-            if self.rx_fresh[rx]:
-                xyp = rx.subvertices[0].placement.processor.get_coordinates()
+        while not self.stop_now:
+            # Look for Rx elements with fresh output which may be transmitted
+            # now, copy the output and mark as stale.
+            packets = list()
+            with self.output_lock:
+                now = time.time()
+                next_transmission = None
 
-                with self.output_lock:
-                    data = fp.bitsk(np.hstack(self.rx_buffers[rx]))
-                    self.rx_fresh[rx] = False
-
-                data = struct.pack("H14x%dI" % len(data), 1, *data)
-                packet = sdp.SDPMessage(dst_x=xyp[0], dst_y=xyp[1],
-                                        dst_cpu=xyp[2], data=data)
-                self.out_socket.sendto(str(packet), (self.machinename, 17893))
-
-        # Reschedule the Tx tick
-        if not self.stop_now:
-            self.tx_timer = threading.Timer(self.tx_period, self.sdp_tx_tick)
-            self.tx_timer.name = "EthernetTx"
-            self.tx_timer.start()
+                for rx in self.rx_elements:
+                    if not self.rx_fresh[rx]:
+                        continue
+
+                    t = self.rx_policies[rx].next_transmission(now)
+                    if t <= now:
+                        values = np.hstack(self.rx_buffers[rx])
+                        self.rx_fresh[rx] = False
+                        self.rx_transmitted[rx] = values
+                        self.rx_policies[rx].transmitted(now)
+                        self.tx_latency.record(now - self.rx_fresh_time[rx])
+                        packets.append((rx, values))
+                    elif next_transmission is None or t < next_transmission:
+                        next_transmission = t
+
+                # If there is nothing to transmit then sleep until the next
+                # transmission is allowed or until output becomes fresh.
+                if len(packets) == 0:
+                    if next_transmission is None:
+                        self.output_lock.wait()
+                    else:
+                        self.output_lock.wait(next_transmission - now)
+                    continue
+
+            # Transmit the packets
+            for (rx, values) in packets:
+                self.sdp_transmit(rx, values)
+
+    def sdp_transmit(self, rx, values):
+        """Transmit the given values to the given Rx element."""
+        (xyp, link) = self.rx_xyps[rx]
+
+        data = fp.bitsk(values)
+        if self.measure_latency:
+            # Request an acknowledgement, sending a sequence number and the
+            # time of transmission in microseconds.
+            self.tx_seq = (self.tx_seq + 1) & 0xffff
+            timestamp = int(time.time() * 1e6) & 0xffffffff
+            data = struct.pack("<HHI8x%dI" % len(data),
+                               sdp_format.CMD_DATA_ACK, self.tx_seq,
+                               timestamp, *data)
+        else:
+            data = struct.pack("H14x%dI" % len(data),
+                               sdp_format.CMD_DATA, *data)
+        packet = str(sdp.SDPMessage(dst_x=xyp[0], dst_y=xyp[1],
+                                    dst_cpu=xyp[2], data=data))
+        self.out_socket.sendto(packet, (link.hostname, link.sdp_port))
+
+        if self.recorder is not None:
+            self.recorder.record_sdp(capture.TX, packet)
 
     @stop_on_keyboard_interrupt
-    def sdp_rx_tick(self):
-        """Receive packets from the SpiNNaker board.
+    def sdp_rx_loop(self):
+        """Receive packets from the SpiNNaker board via any link.
         """
         try:
-            data = self.in_socket.recv(512)
-            msg = sdp.SDPMessage(data)
-
-            try:
-                node = self.xyp_nodes[(msg.src_x, msg.src_y, msg.src_cpu)]
-            except KeyError:
-                logger.error(
-                    "Received packet from unexpected core (%3d, %3d, %3d). "
-                    "Board may require resetting." %
-                    (msg.src_x, msg.src_y, msg.src_cpu)
-                )
-                raise IOError  # Jumps out of the receive logic
-
-            # Convert the data
-            data = msg.data[16:]
-            vals = [struct.unpack("I", data[n*4:n*4 + 4])[0] for n in
-                    range(len(data)/4)]
-            values = fp.kbits(vals)
-
-            # Save the data
-            assert(len(values) == node.size_in)
-            with self.input_lock:
-                self.node_inputs[node] = values
-        except IOError:
-            pass
-
-        # Reschedule the Rx tick
-        if not self.stop_now:
-            self.rx_timer = threading.Timer(self.rx_period, self.sdp_rx_tick)
-            self.rx_timer.name = "EthernetRx"
-            self.rx_timer.start()
+            while not self.stop_now:
+                try:
+                    (ready, _, _) = select.select(self.in_sockets, [], [],
+                                                  self.rx_timeout)
+                except (select.error, socket.error):
+                    # Sockets have been closed
+                    break
+
+                for in_socket in ready:
+                    try:
+                        data = in_socket.recv(512)
+                    except socket.error:
+                        continue
+                    self.sdp_receive(data)
+        except Exception as e:
+            logger.error("Receiving from the board failed: %s" % e)
+            self.rx_error = e
+
+    def sdp_receive(self, data):
+        """Handle a packet received from the SpiNNaker board."""
+        if self.recorder is not None:
+            self.recorder.record_sdp(capture.RX, data)
+
+        msg = sdp.SDPMessage(data)
+        now = time.time()
+        (cmd_rc, _, arg1, arg2, _) =\
+            sdp_format.CMD_HEADER.unpack_from(msg.data)
+
+        if cmd_rc == sdp_format.CMD_ACK:
+            # Acknowledgement of timestamped values from an Rx element, arg1
+            # is the echoed time of transmission and arg2 the tick at which
+            # the values were received.
+            rtt = ((int(now * 1e6) - arg1) & 0xffffffff) / 1e6
+            self.latency.acknowledged(now - rtt, arg2, now)
+            return
+
+        try:
+            node = self.xyp_nodes[(msg.src_x, msg.src_y, msg.src_cpu)]
+        except KeyError:
+            logger.error(
+                "Received packet from unexpected core (%3d, %3d, %3d). "
+                "Board may require resetting." %
+                (msg.src_x, msg.src_y, msg.src_cpu)
+            )
+            return
+
+        # Convert the data
+        data = msg.data[16:]
+        vals = [struct.unpack("I", data[n*4:n*4 + 4])[0] for n in
+                range(len(data)/4)]
+        values = fp.kbits(vals)
+
+        # Save the data
+        assert(len(values) == node.size_in)
+        with self.input_lock:
+            self.node_inputs[node] = values
+        self.rx_rates[node].record(now)
+
+        # arg1 is the tick at which the values were transmitted
+        self.latency.received(arg1, now)
+
+
+class MultiEthernet(Ethernet):
+    """Ethernet communicator and Node builder which shares host traffic
+    between several Ethernet connected chips.
+
+    Each SDPRxVertex and SDPTxVertex communicates via the nearest Ethernet
+    connected chip, with traffic balanced between links of similar distance.
+
+    :param links: List of :py:class:`EthernetLink` describing each Ethernet
+                  connected chip.  Each link requires a distinct IP tag and
+                  host port.
+    :param balance: Number of additional hops which each dimension of traffic
+                    already assigned to a link counts as.
+    """
+    def __init__(self, links, input_period=10./32, tx_policy=None,
+                 balance=1./16, measure_latency=False):
+        assert len(set(l.tag for l in links)) == len(links)
+        assert len(set(l.port for l in links)) == len(links)
+
+        super(MultiEthernet, self).__init__(
+            links[0].hostname, links[0].port, input_period, tx_policy,
+            links=links, balance=balance, measure_latency=measure_latency)
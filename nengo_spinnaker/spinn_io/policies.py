@@ -0,0 +1,112 @@
+"""Policies which determine when host computed Node output is transmitted to
+the SpiNNaker board.
+
+Each SDPRxVertex is given its own copy of the policy provided to the IO
+handler, so stateful policies (e.g., :py:class:`TokenBucket`) are accounted
+per Rx element.
+"""
+
+import copy
+import numpy as np
+
+
+class TransmitPolicy(object):
+    """Base class for transmission policies.
+
+    :param deadband: Changes in output smaller than this (in any dimension)
+                     do not cause the output to be transmitted.
+    """
+    def __init__(self, deadband=0.):
+        self.deadband = deadband
+
+    def copy(self):
+        """Create a new, independent, instance of this policy."""
+        return copy.deepcopy(self)
+
+    def is_significant(self, transmitted, value):
+        """Determine whether the value differs sufficiently from the last
+        transmitted value to warrant transmitting it.
+
+        :param transmitted: The last transmitted value, or None.
+        :param value: The new value.
+        """
+        if transmitted is None or self.deadband <= 0.:
+            return True
+        return np.max(np.abs(value - transmitted)) > self.deadband
+
+    def next_transmission(self, now):
+        """Return the earliest time at which fresh output may be transmitted.
+        """
+        raise NotImplementedError
+
+    def transmitted(self, now):
+        """Inform the policy that output was transmitted at the given time."""
+        raise NotImplementedError
+
+
+class FixedRate(TransmitPolicy):
+    """Transmit fresh output in regular slots of the given period.
+
+    :param period: Period between transmission slots (in seconds).
+    """
+    def __init__(self, period, deadband=0.):
+        super(FixedRate, self).__init__(deadband)
+        self.period = period
+        self._next_slot = None
+
+    def next_transmission(self, now):
+        if self._next_slot is None:
+            self._next_slot = now + self.period
+        return self._next_slot
+
+    def transmitted(self, now):
+        # Move to the first slot after the current time
+        while self._next_slot <= now:
+            self._next_slot += self.period
+
+
+class OnChange(TransmitPolicy):
+    """Transmit output as soon as it changes, but no more frequently than
+    once every `min_interval` seconds.
+    """
+    def __init__(self, min_interval=0., deadband=0.):
+        super(OnChange, self).__init__(deadband)
+        self.min_interval = min_interval
+        self._last_transmitted = None
+
+    def next_transmission(self, now):
+        if self._last_transmitted is None:
+            return now
+        return self._last_transmitted + self.min_interval
+
+    def transmitted(self, now):
+        self._last_transmitted = now
+
+
+class TokenBucket(TransmitPolicy):
+    """Transmit output as soon as it changes, limiting the average rate of
+    transmission to `rate` packets per second with bursts of up to `burst`
+    packets.
+    """
+    def __init__(self, rate, burst=1, deadband=0.):
+        super(TokenBucket, self).__init__(deadband)
+        self.rate = float(rate)
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last_update = None
+
+    def _refill(self, now):
+        if self._last_update is not None:
+            self._tokens = min(self.burst, self._tokens +
+                               (now - self._last_update) * self.rate)
+        self._last_update = now
+
+    def next_transmission(self, now):
+        self._refill(now)
+        if self._tokens >= 1.:
+            return now
+        return now + (1. - self._tokens) / self.rate
+
+    def transmitted(self, now):
+        self._refill(now)
+        self._tokens -= 1.
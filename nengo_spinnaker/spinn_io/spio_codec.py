@@ -0,0 +1,216 @@
+"""Encoding and decoding of SpiNNaker packets framed for the SpIO UART.
+
+Each multicast packet with a payload is framed as 9 bytes: a header byte,
+followed by the key and payload as little-endian 32-bit words.  The header is
+0x02 (multicast, with payload) with bit 0 set such that the frame has odd
+parity.  Packets without payloads are framed as 5 bytes.
+
+Arrays of packets are encoded and decoded in single NumPy passes with parity
+computed from a 256-entry table.
+"""
+
+import numpy as np
+
+
+# Parity of each possible byte value
+PARITY = np.array([bin(i).count("1") & 1 for i in range(256)], dtype=np.uint8)
+
+MC_PAYLOAD_HEADER = 0x02
+HEADER_MASK = 0xC2  # Packet type and payload bits
+SYNC_FRAMES = 4  # Consecutive valid frames required to regain synchronisation
+CONFIRM_FRAMES = 3  # Valid frames required to confirm an unexpected frame
+
+
+def frame_parity(frames):
+    """Get the parity of each row of an array of frames."""
+    return PARITY[np.bitwise_xor.reduce(frames, axis=1)]
+
+
+def find_sync(data, n_frames=SYNC_FRAMES):
+    """Find the first offset into an array of bytes at which a number of
+    consecutive valid multicast frames with payloads start.
+
+    :returns: The offset or None if there is no such offset.
+    """
+    if data.size < 9*n_frames:
+        return None
+
+    # View every 9 bytes starting at each offset as a frame
+    frames = np.lib.stride_tricks.as_strided(
+        data, shape=(data.size - 8, 9), strides=(data.strides[0],) * 2)
+    valid = (((frames[:, 0] & HEADER_MASK) == MC_PAYLOAD_HEADER) &
+             (frame_parity(frames) == 1))
+
+    # Offsets at which each of the following frames is also valid
+    n = valid.size - 9*(n_frames - 1)
+    synced = valid[:n].copy()
+    for f in range(1, n_frames):
+        synced &= valid[9*f:9*f + n]
+    offsets = np.flatnonzero(synced)
+    return offsets[0] if offsets.size > 0 else None
+
+
+def is_confirmed(data, i, n_frames=CONFIRM_FRAMES):
+    """Determine whether the frame starting at data[i] is valid and is
+    followed by a number of consecutive valid multicast frames with payloads.
+    Valid frames of other types may precede these.
+
+    :returns: True or False, or None if the frames are incomplete.
+    """
+    n_mc = -1  # The frame being confirmed is not counted
+    while n_mc < n_frames:
+        if i >= data.size:
+            return None
+        length = 9 if data[i] & 0x02 else 5
+        if i + length > data.size:
+            return None
+
+        frame = data[i:i + length]
+        if PARITY[np.bitwise_xor.reduce(frame)] == 0:
+            return False
+        elif (frame[0] & HEADER_MASK) == MC_PAYLOAD_HEADER:
+            n_mc += 1
+        else:
+            n_mc = 0
+        i += length
+    return True
+
+
+def encode(keys, payloads):
+    """Frame multicast packets with the given keys and payloads.
+
+    :param keys: Array-like of 32-bit keys.
+    :param payloads: Array-like of 32-bit payloads.
+    :returns: A string containing the frames.
+    """
+    keys = np.asarray(keys, dtype='<u4')
+    payloads = np.asarray(payloads, dtype='<u4')
+    n = keys.size
+
+    frames = np.empty((n, 9), dtype=np.uint8)
+    frames[:, 0] = MC_PAYLOAD_HEADER
+    frames[:, 1:5] = keys.reshape(n, 1).view(np.uint8)
+    frames[:, 5:9] = payloads.reshape(n, 1).view(np.uint8)
+
+    # Set the parity bit such that each frame has odd parity
+    frames[:, 0] |= frame_parity(frames) ^ 1
+
+    return frames.tostring()
+
+
+class SpIODecoder(object):
+    """Streaming decoder for SpIO framed packets.
+
+    Data may be fed in arbitrary chunks, incomplete frames are retained until
+    the remainder arrives.  A frame with incorrect parity is assumed to be the
+    result of corruption or lost synchronisation.  Bytes are then discarded
+    until `SYNC_FRAMES` consecutive valid multicast frames are found, after
+    which decoding resumes.
+
+    Valid packets other than multicast packets with payloads are ignored.  As
+    these are unexpected they, like the first frame received, are only
+    accepted once they are followed by `CONFIRM_FRAMES` consecutive valid
+    multicast frames, otherwise they are assumed to be the result of
+    corruption.
+    """
+    def __init__(self):
+        self.buffer = np.zeros(0, dtype=np.uint8)
+        self.resync = False
+        self.synchronised = False
+
+        self.n_packets = 0
+        self.n_ignored = 0
+        self.n_parity_errors = 0
+        self.n_dropped = 0
+
+    def feed(self, data):
+        """Decode the given data.
+
+        :returns: (keys, payloads) as arrays of the multicast packets
+                  completed by the data.
+        """
+        buf = np.concatenate((self.buffer,
+                              np.frombuffer(data, dtype=np.uint8)))
+        keys = list()
+        payloads = list()
+
+        i = 0
+        while i < buf.size:
+            if self.resync:
+                # Discard bytes up to the first offset at which enough
+                # consecutive valid frames start, retaining those bytes which
+                # cannot yet be checked.
+                offset = find_sync(buf[i:])
+                if offset is None:
+                    n_drop = max(0, buf.size - i - (9*SYNC_FRAMES - 1))
+                    self.n_dropped += n_drop
+                    i += n_drop
+                    break
+                self.n_dropped += offset
+                i += offset
+                self.resync = False
+                self.synchronised = True
+                continue
+
+            if self.synchronised:
+                # Determine which of the following 9-byte frames are valid
+                # multicast packets with payloads.
+                n = (buf.size - i) // 9
+                frames = buf[i:i + 9*n].reshape(n, 9)
+                valid = (((frames[:, 0] & HEADER_MASK) == MC_PAYLOAD_HEADER) &
+                         (frame_parity(frames) == 1))
+
+                # Decode as many consecutive valid frames as possible
+                n_valid = n if valid.all() else np.argmin(valid)
+                if n_valid > 0:
+                    keys.append(frames[:n_valid, 1:5].copy().view('<u4'))
+                    payloads.append(frames[:n_valid, 5:9].copy().view('<u4'))
+                    i += 9*n_valid
+
+                if i >= buf.size:
+                    break
+
+            # Deal with the next frame, which is either the first frame or is
+            # not a valid multicast packet with a payload.
+            length = 9 if buf[i] & 0x02 else 5
+            if i + length > buf.size:
+                break  # Incomplete frame
+
+            if PARITY[np.bitwise_xor.reduce(buf[i:i + length])] == 0:
+                # Corruption, discard bytes until synchronisation is regained
+                self.n_parity_errors += 1
+                self._lose_sync()
+                i += 1
+                continue
+
+            # The frame is only accepted if the following frames confirm that
+            # it is not the result of corruption.
+            confirmed = is_confirmed(buf, i)
+            if confirmed is None:
+                break  # Incomplete frames
+            elif not confirmed:
+                self._lose_sync()
+                i += 1
+            elif not self.synchronised:
+                self.synchronised = True
+            else:
+                # A valid packet of another type
+                self.n_ignored += 1
+                i += length
+
+        # Retain any incomplete frame
+        self.buffer = buf[i:]
+
+        if len(keys) == 0:
+            return (np.zeros(0, dtype=np.uint32),
+                    np.zeros(0, dtype=np.uint32))
+
+        keys = np.concatenate(keys).ravel()
+        payloads = np.concatenate(payloads).ravel()
+        self.n_packets += keys.size
+        return keys, payloads
+
+    def _lose_sync(self):
+        """Discard the current byte and resynchronise."""
+        self.n_dropped += 1
+        self.resync = True
@@ -0,0 +1,351 @@
+"""A stand-in for a SpiNNaker board which speaks the SDP framing used by the
+`nengo_rx` and `nengo_tx` executables.
+
+The stand-in allows the host side of the Ethernet IO to be exercised and
+benchmarked without a board.  Packets sent to the stand-in are consumed as if
+they had been received by `nengo_rx` cores, and packets are emitted as if by
+`nengo_tx` cores at configurable rates.  Loss and jitter may be injected in
+both directions.  Requests for acknowledgements are answered as `nengo_rx`
+would, with ticks counted from the moment the stand-in is started.
+
+:py:class:`SCPStandIn` answers SCP memory read and write requests as the
+monitor processors of a board would, with configurable latency and loss, so
+that bulk memory transfers may be tested without a board.
+"""
+
+import collections
+import heapq
+import logging
+import random
+import select
+import socket
+import struct
+import threading
+import time
+
+from ..utils import scp, sdp
+
+logger = logging.getLogger(__name__)
+
+
+StandInSource = collections.namedtuple(
+    'StandInSource', ['x', 'y', 'p', 'n_dims', 'rate', 'tag'])
+"""A `nengo_tx` core emitting `n_dims` values `rate` times per second."""
+
+
+class SDPStandIn(object):
+    """Local UDP server standing in for a SpiNNaker board.
+
+    :param sdp_port: Port on which to receive host->board packets.
+    :param host: Hostname to which board->host packets are sent.
+    :param host_port: Port to which board->host packets are sent.
+    :param loss: Probability with which any packet is dropped.
+    :param jitter: Maximum delay (in seconds) added to each packet, delays are
+                   drawn uniformly from `[0, jitter]`.
+    :param seed: Seed for the random number generator used for loss and
+                 jitter.
+    """
+    def __init__(self, sdp_port=17893, host="localhost", host_port=17895,
+                 loss=0., jitter=0., seed=None):
+        self.sdp_port = sdp_port
+        self.host = host
+        self.host_port = host_port
+        self.loss = loss
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.tick_period = 0.001
+
+        self.sources = list()
+        self.receivers = list()
+
+        # Counts of packets
+        self.n_received = 0
+        self.n_consumed = 0
+        self.n_emitted = 0
+        self.n_dropped = 0
+
+        # Map (x, y, p) --> latest received values
+        self.values = dict()
+
+        # Map (x, y, p) --> {sequence number: time emitted}
+        self.emit_times = collections.defaultdict(dict)
+
+        self._queue = list()
+        self._lock = threading.Lock()
+        self.stop_now = False
+
+    def add_source(self, x, y, p, n_dims, rate, tag=1):
+        """Emit packets as though from a `nengo_tx` core at the given
+        location.
+
+        The first value of each packet holds a sequence number (modulo
+        2**15) so that the receiver can measure latency using
+        :py:attr:`emit_times`, the remaining values are zero.
+        """
+        self.sources.append(StandInSource(x, y, p, n_dims, float(rate), tag))
+
+    def add_receiver(self, f):
+        """Register a function to be called with `(xyp, values, t)` whenever
+        a host->board packet is consumed.
+        """
+        self.receivers.append(f)
+
+    def __enter__(self):
+        self.in_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.in_socket.bind(("", self.sdp_port))
+        self.in_socket.setblocking(0)
+
+        self.out_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        # Schedule the first emission from each source
+        now = time.time()
+        self.start_time = now
+        for (i, source) in enumerate(self.sources):
+            self._schedule(now + 1./source.rate, self._emit, i, 0)
+
+        self.thread = threading.Thread(target=self._run, name="SDPStandIn")
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, traceback):
+        self.stop_now = True
+        self.thread.join()
+        self.in_socket.close()
+        self.out_socket.close()
+
+    def _tick(self, t):
+        """Get the tick corresponding to the given time."""
+        return int((t - self.start_time) / self.tick_period)
+
+    def _schedule(self, t, f, *args):
+        heapq.heappush(self._queue, (t, f, args))
+
+    def _delay(self):
+        """Get the time for which to delay a packet, or None if it should be
+        dropped.
+        """
+        if self.loss > 0. and self.rng.random() < self.loss:
+            self.n_dropped += 1
+            return None
+        if self.jitter > 0.:
+            return self.rng.uniform(0., self.jitter)
+        return 0.
+
+    def _run(self):
+        while not self.stop_now:
+            # Perform any scheduled actions which are due
+            now = time.time()
+            while len(self._queue) > 0 and self._queue[0][0] <= now:
+                (t, f, args) = heapq.heappop(self._queue)
+                f(t, *args)
+
+            # Wait for packets until the next action is due
+            timeout = 0.01
+            if len(self._queue) > 0:
+                timeout = max(0., min(timeout, self._queue[0][0] - now))
+            (ready, _, _) = select.select([self.in_socket], [], [], timeout)
+
+            if len(ready) > 0:
+                try:
+                    data = self.in_socket.recv(512)
+                except socket.error:
+                    continue
+                self.n_received += 1
+
+                delay = self._delay()
+                if delay is not None:
+                    self._schedule(time.time() + delay, self._consume, data)
+
+    def _consume(self, t, data):
+        """Consume a host->board packet as `nengo_rx` would."""
+        try:
+            packet = sdp.unpack_sdp(data)
+            (cmd_rc, seq, args, values) = sdp.unpack_values(packet.data)
+        except (ValueError, struct.error):
+            logger.warning("Stand-in received malformed packet.")
+            return
+
+        xyp = (packet.dest_x, packet.dest_y, packet.dest_cpu)
+        now = time.time()
+        with self._lock:
+            self.values[xyp] = values
+            self.n_consumed += 1
+
+        for f in self.receivers:
+            f(xyp, values, now)
+
+        if cmd_rc == sdp.CMD_DATA_ACK:
+            tick = self._tick(now)
+            ack = sdp.SDPPacket(
+                flags=0x07, tag=packet.tag, dest_port=0xff >> 5,
+                dest_cpu=0xff & 0x1f, src_port=1, src_cpu=packet.dest_cpu,
+                dest_x=0, dest_y=0, src_x=packet.dest_x, src_y=packet.dest_y,
+                data=sdp.CMD_HEADER.pack(sdp.CMD_ACK, seq, args[0], tick,
+                                         tick)
+            )
+            self.out_socket.sendto(sdp.pack_sdp(ack),
+                                   (self.host, self.host_port))
+
+    def _emit(self, t, i, seq):
+        """Emit a board->host packet from the given source and schedule the
+        next one.
+        """
+        source = self.sources[i]
+        self._schedule(t + 1./source.rate, self._emit, i, seq + 1)
+
+        delay = self._delay()
+        if delay is None:
+            return
+        self._schedule(time.time() + delay, self._send, source, seq)
+
+    def _send(self, t, source, seq):
+        values = [float(seq % (1 << 15))] + [0.] * (source.n_dims - 1)
+        packet = sdp.SDPPacket(
+            flags=0x07, tag=source.tag, dest_port=0xff >> 5,
+            dest_cpu=0xff & 0x1f, src_port=1, src_cpu=source.p,
+            dest_x=0, dest_y=0, src_x=source.x, src_y=source.y,
+            data=sdp.pack_values(values[:source.n_dims], sdp.CMD_DATA,
+                                 seq & 0xffff, (self._tick(time.time()), 0, 0))
+        )
+
+        with self._lock:
+            self.emit_times[(source.x, source.y, source.p)][seq % (1 << 15)] =\
+                time.time()
+            self.n_emitted += 1
+        self.out_socket.sendto(sdp.pack_sdp(packet),
+                               (self.host, self.host_port))
+
+
+class SCPStandIn(object):
+    """Local UDP server answering SCP memory read and write requests.
+
+    The memory of each chip is initially zero.  Responses are returned to the
+    address from which each request was received.
+
+    :param scp_port: Port on which to receive requests.
+    :param latency: Delay (in seconds) before each request is answered.
+    :param loss: Probability with which any request or response is dropped.
+    :param seed: Seed for the random number generator used for loss.
+    """
+    def __init__(self, scp_port=scp.SCP_PORT, latency=0., loss=0.,
+                 seed=None):
+        self.scp_port = scp_port
+        self.latency = latency
+        self.loss = loss
+        self.rng = random.Random(seed)
+
+        # Map (x, y) --> {page index: bytearray}
+        self.memory = collections.defaultdict(dict)
+        self.page_size = 1 << 16
+
+        # Counts of packets
+        self.n_received = 0
+        self.n_dropped = 0
+
+        self._queue = list()
+        self.stop_now = False
+
+    def __enter__(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(("", self.scp_port))
+        self.socket.setblocking(0)
+
+        self.thread = threading.Thread(target=self._run, name="SCPStandIn")
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, traceback):
+        self.stop_now = True
+        self.thread.join()
+        self.socket.close()
+
+    def read_memory(self, x, y, address, length):
+        """Read the memory of a chip."""
+        data = bytearray()
+        while length > 0:
+            (page, offset) = divmod(address, self.page_size)
+            n_bytes = min(length, self.page_size - offset)
+            block = self.memory[(x, y)].get(page)
+            if block is None:
+                data += bytearray(n_bytes)
+            else:
+                data += block[offset:offset + n_bytes]
+            address += n_bytes
+            length -= n_bytes
+        return str(data)
+
+    def write_memory(self, x, y, address, data):
+        """Write the memory of a chip."""
+        data = bytearray(data)
+        while len(data) > 0:
+            (page, offset) = divmod(address, self.page_size)
+            n_bytes = min(len(data), self.page_size - offset)
+            block = self.memory[(x, y)].setdefault(
+                page, bytearray(self.page_size))
+            block[offset:offset + n_bytes] = data[:n_bytes]
+            address += n_bytes
+            data = data[n_bytes:]
+
+    def _dropped(self):
+        if self.loss > 0. and self.rng.random() < self.loss:
+            self.n_dropped += 1
+            return True
+        return False
+
+    def _run(self):
+        while not self.stop_now:
+            # Send any responses which are due
+            now = time.time()
+            while len(self._queue) > 0 and self._queue[0][0] <= now:
+                (_, data, addr) = heapq.heappop(self._queue)
+                self.socket.sendto(data, addr)
+
+            timeout = 0.01
+            if len(self._queue) > 0:
+                timeout = max(0., min(timeout, self._queue[0][0] - now))
+            (ready, _, _) = select.select([self.socket], [], [], timeout)
+
+            if len(ready) > 0:
+                try:
+                    (data, addr) = self.socket.recvfrom(1024)
+                except socket.error:
+                    continue
+                self.n_received += 1
+
+                if self._dropped():
+                    continue
+                response = self._respond(data)
+                if response is not None and not self._dropped():
+                    heapq.heappush(self._queue, (time.time() + self.latency,
+                                                 response, addr))
+
+    def _respond(self, data):
+        """Perform a request and get the datagram of the response."""
+        try:
+            packet = sdp.unpack_sdp(data)
+            (cmd_rc, seq, address, length, _) =\
+                sdp.CMD_HEADER.unpack_from(packet.data)
+        except (ValueError, struct.error):
+            logger.warning("Stand-in received malformed packet.")
+            return None
+
+        (x, y) = (packet.dest_x, packet.dest_y)
+        payload = ""
+        if cmd_rc == scp.CMD_READ and length <= scp.BLOCK_SIZE:
+            rc = scp.RC_OK
+            payload = self.read_memory(x, y, address, length)
+        elif cmd_rc == scp.CMD_WRITE and length <= scp.BLOCK_SIZE:
+            rc = scp.RC_OK
+            self.write_memory(x, y, address,
+                              packet.data[sdp.CMD_HEADER.size:][:length])
+        else:
+            rc = 0x84  # RC_ARG
+
+        response = sdp.SDPPacket(
+            flags=0x07, tag=0xff, dest_port=packet.src_port,
+            dest_cpu=packet.src_cpu, src_port=0, src_cpu=packet.dest_cpu,
+            dest_x=packet.src_x, dest_y=packet.src_y, src_x=x, src_y=y,
+            data=scp.RESPONSE_HEADER.pack(rc, seq) + payload)
+        return sdp.pack_sdp(response)
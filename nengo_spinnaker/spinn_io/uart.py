@@ -2,24 +2,34 @@
 """
 
 import collections
+import logging
 import nengo
 import numpy as np
 import serial
 import threading
-import struct
+import time
 
 from pacman103.front import common
 
 from nengo_spinnaker.utils import fp
 from .ethernet import stop_on_keyboard_interrupt
+import capture
 import serial_vertex
-from .. import assembler, builder, utils
+import spio_codec
+from .. import assembler, utils
+from ..connection import IntermediateConnection
+from ..node import FilterVertex
+
+logger = logging.getLogger(__name__)
 
 
 class UART(object):
     """A builder and communicator for generic serial interfaces.
 
-    :param protocol:
+    :param protocol: Type of the protocol object, or None to build a UART
+                     which does not open a connection (e.g., to replay a
+                     capture with :py:class:`~nengo_spinnaker.spinn_io.\
+capture.Replay`).
     :param connection: The location where the connection to SpiNNlink is made.
     :param **kwargs: Arguments for the protocol object
     """
@@ -32,14 +42,18 @@ class UART(object):
         self.connected_node_coords = connected_node_coords
         self.connected_node_edge = connected_node_edge
 
-        # General components
-        self.protocol = protocol(**kwargs)
+        # General components, the protocol opens the connection
+        self.protocol = protocol(**kwargs) if protocol is not None else None
         self._serial_vertex = None
 
-        self.node_in_keys = dict()  # Map of routing keys to Nodes
+        self.dispatch = None  # Map of routing keys to Node inputs
+        self.node_indices = dict()  # Map of Nodes to index amongst Nodes
+        self.recorder = None  # Optional recorder of all packets
+        self.rx_rates = collections.defaultdict(utils.timing.RateMeter)
         self.nodes_tfks = dict()  # Map of Nodes to Transforms/Funcs/Keyspaces
 
-    def prepare_network(self, objects, connections, dt, keyspace):
+    def prepare_network(self, objects, connections, dt, keyspace,
+                        config=None):
         """Swap out connections to/from Nodes with connections to a Filter
         vertex to the serial vertex, and from the serial vertex.
 
@@ -47,9 +61,15 @@ class UART(object):
         with the MSB set as 1.  Incoming connections retain their existing
         keys.
         """
+        # Connections not to or from Nodes are retained unchanged, they are
+        # found before the connections of Nodes are modified.
         new_objs = list()
-        new_conns = list()
+        new_conns = [c for c in connections if not (
+            isinstance(c.pre_obj, nengo.Node) or
+            isinstance(c.post_obj, nengo.Node))]
         filter_index = 0  # Index of filter vertex
+        self.dispatch = utils.dispatch.KeyDispatchTable(keyspace.filter_mask,
+                                                        keyspace.mask_d)
 
         for obj in objects:
             # For each Node find the outgoing connections, combine and modify
@@ -60,6 +80,7 @@ class UART(object):
                 # If the object isn't a Node then retain it
                 new_objs.append(obj)
                 continue
+            self.node_indices[obj] = len(self.node_indices)
 
             # Get the list of incoming connections, these will all feed to the
             # given serial vertex. (Except for connections from other Nodes).
@@ -68,7 +89,11 @@ class UART(object):
 
             # Create a filter vertex for this object
             if len(in_connections) > 0:
-                fv = assembler.FilterVertex(obj.size_in, in_connections, dt)
+                (period, threshold) = utils.nodes.get_output_period(
+                    obj, dt, config)
+                fv = FilterVertex(
+                    obj.size_in, in_connections, dt, output_period=period,
+                    output_threshold=threshold)
                 new_objs.append(fv)
 
                 # Create a serial vertex if desired
@@ -81,11 +106,12 @@ class UART(object):
 
                 # Create a new connection from the filter vertex to the serial
                 # vertex.
-                fvs = builder.IntermediateConnection(
+                fvs = IntermediateConnection(
                     fv, self._serial_vertex,
                     keyspace=keyspace(x=1, o=filter_index))
                 filter_index += 1
-                self.node_in_keys[fvs.keyspace.filter_key()] = obj
+                self.dispatch.add(fvs.keyspace.filter_key(), obj,
+                                  obj.size_in)
                 new_conns.append(fvs)
 
                 # Swap out the target of each of all these connections and add
@@ -115,12 +141,6 @@ class UART(object):
                     c.pre_obj = self._serial_vertex
                     new_conns.append(c)
 
-        # Retain all other connections unchanged
-        for c in connections:
-            if not (isinstance(c.pre_obj, nengo.Node) or
-                    isinstance(c.post_obj, nengo.Node)):
-                new_conns.append(c)
-
         return new_objs, new_conns
 
     @property
@@ -128,12 +148,24 @@ class UART(object):
         return self
 
     def __enter__(self):
-        self.nodes_inputs = collections.defaultdict(lambda : [None])
+        return self.bind()
+
+    def bind(self, node_xyps=None, rx_xyps=None):
+        """Build the state necessary to decode received packets.
+
+        Placements are not required for UART communication and are ignored.
+        """
+        self.node_inputs = utils.dispatch.InputFrames(self.dispatch)
         return self
 
     def __exit__(self, *args):
         # Ensure everything shuts down ok
-        self.protocol.stop()
+        try:
+            if self.protocol is not None:
+                self.protocol.stop()
+        finally:
+            if self.recorder is not None:
+                self.recorder.flush()
 
     def start(self):
         # Start!
@@ -141,11 +173,12 @@ class UART(object):
 
     def get_node_input(self, node):
         """Get the input for the Node or None if no (or incomplete) input has
-        been received
+        been received.
+
+        The input is returned as a read-only view of the latest complete
+        frame.
         """
-        if None in self.nodes_inputs[node]:
-            return None
-        return np.asarray(self.nodes_inputs[node])
+        return self.node_inputs.get(node)
 
     def set_node_output(self, node, output):
         """Set the output for the Node
@@ -159,158 +192,261 @@ class UART(object):
                 t_output = tfk.function(t_output)
             t_output = np.dot(tfk.transform, t_output)
 
-            # Transmit the packets
-            for (d, v) in enumerate(t_output):
-                self.protocol.queue_mc_packet(tfk.keyspace.key(d=d),
-                                              fp.bitsk(v))
+            # Transmit the packets, if there is a connection
+            payloads = fp.bitsk_array(t_output)
+            keys = [tfk.keyspace.key(d=d) for d in range(len(payloads))]
+            if self.protocol is not None:
+                for (k, v) in zip(keys, payloads):
+                    self.protocol.queue_mc_packet(k, int(v))
+
+            if self.recorder is not None:
+                self.recorder.record_mc(capture.TX, keys, payloads)
 
     def receive_mc_packet(self, key, payload):
         """Handle an incoming MC packet, store the received dimension value."""
-        # TODO: Deal with this properly rather than with handcoded masks
-        node = self.keys_nodes[key & self.in_keyspace.filter_mask]
-        d = key & self.in_keyspace.mask_d
-        self.nodes_inputs[node][d] = fp.kbits(payload)
+        self.receive_mc_packets([key], [payload])
+
+    def receive_mc_packets(self, keys, payloads):
+        """Handle a batch of incoming MC packets, store the received dimension
+        values.
+        """
+        if self.recorder is not None:
+            self.recorder.record_mc(capture.RX, keys, payloads)
+
+        now = time.time()
+        for node in self.node_inputs.receive(keys, payloads):
+            self.rx_rates[node].record(now)
 
 
 class GenericUARTProtocol(object):
     """GenericUARTProtocol provides the interface necessary to receive and
     transmit SpiNNaker packets over USB or UART connections.
+
+    A long-lived writer thread drains the queue of outgoing packets in batches
+    of up to `max_batch` packets which are framed and written to the serial
+    connection together.  Only the most recent payload for each key is
+    retained in the queue.  A long-lived reader thread performs bulk reads of
+    all available data which are parsed into packets together.
+
+    Subclasses are required to provide `serial` (an object with the interface
+    of :py:class:`serial.Serial`), :py:func:`frame_mc_packets` and
+    :py:func:`parse_mc_packets`.
     """
-    def __init__(self):
+    def __init__(self, max_batch=256, read_size=4096):
         """Create (but do not start) a new GenericUARTProtocol handler."""
         self.outgoing_packet_queue = collections.OrderedDict()
-        self.queue_lock = threading.Lock()
+        self.queue_lock = threading.Condition()
+        self.max_batch = max_batch
+        self.read_size = read_size
 
         self.stop_now = False
-
-        self.transmit_ticker = threading.Timer(
-            self.tx_period, self.transmit_tick)
-        self.receive_ticker = threading.Timer(
-            self.rx_period, self.receive_tick)
+        self.writer = None
+        self.reader = None
+        self.error = None  # Error which ended the reader thread
+
+        # Statistics
+        self.start_time = None
+        self.tx_packets = 0
+        self.tx_bytes = 0
+        self.tx_batches = 0
+        self.rx_packets = 0
+        self.rx_bytes = 0
+        self.queue_depth = utils.timing.LatencyRecorder()
 
     def start(self, io):
         """Start the communication threads."""
         self.io = io  # Save a reference to the IO handler
-        self.transmit_ticker.start()
-        self.receive_ticker.start()
+        self.start_time = time.time()
+
+        self.writer = threading.Thread(target=self.writer_loop, name="UARTTx")
+        self.writer.daemon = True
+        self.reader = threading.Thread(target=self.reader_loop, name="UARTRx")
+        self.reader.daemon = True
+
+        self.writer.start()
+        self.reader.start()
 
     def stop(self):
-        """Stop the communication threads."""
+        """Stop the communication threads, raising any error which ended the
+        reader thread early as the input of Nodes would otherwise be stale.
+        """
         self.stop_now = True
-        self.transmit_ticker.cancel()
-        self.receive_ticker.cancel()
+        with self.queue_lock:
+            self.queue_lock.notify()
+
+        for thread in (self.writer, self.reader):
+            if (thread is not None and
+                    thread is not threading.current_thread()):
+                thread.join(self.serial.timeout or 1.)
+
+        if self.error is not None:
+            raise self.error
+
+    @property
+    def stats(self):
+        """Dictionary of throughput and queue depth statistics."""
+        elapsed = (time.time() - self.start_time if self.start_time is not None
+                   else None)
+        stats = dict(elapsed=elapsed,
+                     tx_packets=self.tx_packets, tx_bytes=self.tx_bytes,
+                     tx_batches=self.tx_batches,
+                     rx_packets=self.rx_packets, rx_bytes=self.rx_bytes,
+                     queue_depth=self.queue_depth.summary())
+        if elapsed:
+            stats['tx_rate'] = self.tx_packets / elapsed
+            stats['rx_rate'] = self.rx_packets / elapsed
+        return stats
 
     def queue_mc_packet(self, key, payload):
         """Register a multicast packet in the queue."""
         with self.queue_lock:
             self.outgoing_packet_queue[key] = payload
+            self.queue_lock.notify()
 
     @stop_on_keyboard_interrupt
-    def transmit_tick(self):
-        """Transmit a single packet from the transmit queue and reschedule."""
-        # If there are any packets to send then transmit a single packet
-        key, payload = None, None
-        with self.queue_lock:
-            if len(self.outgoing_packet_queue) > 0:
-                key, payload = self.outgoing_packet_queue.popitem(last=False)
-        if key is not None:
-            self.send_mc_packet(key, payload)
-
-        # Schedule this function to run again
-        if not self.stop_now:
-            self.transmit_ticker = threading.Timer(
-                self.tx_period, self.transmit_tick)
-            self.transmit_ticker.start()
+    def writer_loop(self):
+        """Transmit batches of packets from the transmit queue."""
+        while not self.stop_now:
+            # Wait for packets, then remove a batch from the queue
+            with self.queue_lock:
+                while len(self.outgoing_packet_queue) == 0:
+                    if self.stop_now:
+                        return
+                    self.queue_lock.wait(0.1)
+
+                self.queue_depth.record(len(self.outgoing_packet_queue))
+                packets = list()
+                while (len(self.outgoing_packet_queue) > 0 and
+                       len(packets) < self.max_batch):
+                    packets.append(
+                        self.outgoing_packet_queue.popitem(last=False))
+
+            # Frame and write the batch
+            data = self.frame_mc_packets(packets)
+            self.write(data)
+
+            self.tx_packets += len(packets)
+            self.tx_bytes += len(data)
+            self.tx_batches += 1
 
-    def receive_mc_packet(self, key, payload):
-        """Callback for when a multicast packet has been received.
+    @stop_on_keyboard_interrupt
+    def reader_loop(self):
+        """Read and parse data, calling :py:func:`receive_mc_packets` for
+        each batch of received packets.
+        """
+        buf = ""
+        try:
+            while not self.stop_now:
+                try:
+                    data = self.read()
+                except (IOError, OSError, serial.SerialException):
+                    if self.stop_now:
+                        break
+                    raise
+
+                if not data:
+                    continue
+                self.rx_bytes += len(data)
+
+                # Parse as many packets as possible, retaining any incomplete
+                # packet for the next read.
+                (keys, payloads, buf) = self.parse_mc_packets(buf + data)
+                if len(keys) > 0:
+                    self.rx_packets += len(keys)
+                    self.receive_mc_packets(keys, payloads)
+        except Exception as e:
+            logger.error("Receiving from the board failed: %s" % e)
+            self.error = e
+
+    def receive_mc_packets(self, keys, payloads):
+        """Callback for when a batch of multicast packets has been received.
         """
-        # Inform the IO handler that a multicast packet has been received
-        self.io.receive_mc_packet(key, payload)
+        # Inform the IO handler that multicast packets have been received
+        self.io.receive_mc_packets(keys, payloads)
 
-    @stop_on_keyboard_interrupt
-    def receive_tick(self):
-        """Listen for packets and call :py:func:`receive_mc_packet` when
-        received."""
-        # Ask the protocol to listen for packet(s)
-        self.receive_tick_inner()
-
-        # Schedule this function to run again
-        if not self.stop_now:
-            self.receive_ticker = threading.Timer(
-                self.rx_period, self.receive_tick)
-            self.receive_ticker.start()
-
-    def send_mc_packet(self, key, payload):
-        """Transmit a multicast packet into the system given the appropriate
-        key and payload.
-
-        .. note::
-            If this function does not respond quickly, the internal queue will
-            fill up.
+    def write(self, data):
+        """Write data to the serial connection."""
+        self.serial.write(data)
+
+    def read(self):
+        """Block until data is available (or the read times out) and then read
+        all available data, up to `read_size` bytes.
+        """
+        data = self.serial.read(1)
+        if data:
+            n_waiting = self.serial.inWaiting()
+            if n_waiting > 0:
+                data += self.serial.read(min(n_waiting, self.read_size - 1))
+        return data
+
+    def frame_mc_packets(self, packets):
+        """Frame the given list of (key, payload) multicast packets into a
+        string for transmission.
         """
         raise NotImplementedError
 
-    def receive_tick_inner(self):
-        """Listen for packets and call :py:func:`receive_mc_packet` when
-        received."""
+    def parse_mc_packets(self, data):
+        """Parse received data.
+
+        :returns: Sequences of the keys and payloads of received multicast
+                  packets and the remaining unparsed data.
+        """
         raise NotImplementedError
 
 
 class NSTSpiNNlinkProtocol(GenericUARTProtocol):
-    def __init__(self, dev):
-        super(NSTSpiNNlinkProtocol, self).__init__(dev)
-        # AM: I have no idea if these values are even slightly sensible...
-        self.tx_period = 0.00001
-        self.rx_period = 0.00001
+    def __init__(self, dev, **kwargs):
+        super(NSTSpiNNlinkProtocol, self).__init__(**kwargs)
 
         # Set up the serial link
         self.serial = serial.Serial(dev, baudrate=8000000, rtscts=True,
                                     timeout=0.1)
         self.serial.write("S+\n")  # Send SpiNNaker packets to host
 
-    def send_mc_packet(self, key, payload):
-        """Transmit a multicast with the given key and payload into the system.
-        """
-        msg = "%08x.%08x\n" % (key, payload)
-        self.serial.write(msg)
+    def write(self, data):
+        self.serial.write(data)
         self.serial.flush()
 
-    def receive_tick_inner(self):
-        """Listen for packets and call :py:func:`receive_mc_packet` when an MC
-        packet is received.
-        """
-        try:
-            data = self.serial.readline()
+    def frame_mc_packets(self, packets):
+        """Frame multicast packets with the given keys and payloads."""
+        return "".join("%08x.%08x\n" % (key, payload) for
+                       (key, payload) in packets)
+
+    def parse_mc_packets(self, data):
+        """Parse lines of the form `header.key.payload` into MC packets."""
+        lines = data.split('\n')
+        keys = list()
+        payloads = list()
+        for line in lines[:-1]:
+            if '.' not in line:
+                continue
+
+            try:
+                parts = [int(p, 16) for p in line.split('.')]
+            except ValueError:
+                continue
+            if len(parts) == 3:
+                (header, key, payload) = parts
+                keys.append(key)
+                payloads.append(payload)
 
-            if '.' in data:
-                parts = [int(p, 16) for p in data.split('.')]
-                if len(parts) == 3:
-                    (header, key, payload) = parts
-                    self.receive_mc_packet(key, payload)
-        except IOError:  # No data to read
-            pass
+        return keys, payloads, lines[-1]
 
 
 class SpIOUARTProtocol(GenericUARTProtocol):
-    def __init__(self, port=None, baudrate=3000000):
-        # AM: I have no idea if these values are even slightly sensible...
-        self.tx_period = 0.00001
-        self.rx_period = 0.00001
-
-        self.packet_struct = struct.Struct("<LL")
+    def __init__(self, port=None, baudrate=3000000, **kwargs):
+        super(SpIOUARTProtocol, self).__init__(**kwargs)
+        self.decoder = spio_codec.SpIODecoder()
 
         self.serial = serial.Serial(port, baudrate=baudrate,
                                     rtscts=True, timeout=1.0)
         self.spio_uart_sync()
 
-        super(SpIOUARTProtocol, self).__init__()
-
     def spio_uart_sync(self):
         """Send a sync sequence to the remote device.
 
-        XXX: Currently will not be safe to call once the send_mc_packet and
-        receive_mc_packet functions are being executed.
+        XXX: Currently will not be safe to call once the reader and writer
+        threads are running.
         """
         # Send sync sequence
         self.serial.write("\x00"*13 + "\xFF")
@@ -331,48 +467,25 @@ class SpIOUARTProtocol(GenericUARTProtocol):
             if char == "\xFF":
                 break
 
-    def send_mc_packet(self, key, payload):
-        """Transmit a multicast with the given key and payload into the system.
-        """
-        # A multicast packet with a payload
-        pkt = "\x02"
-        pkt += self.packet_struct.pack(key, payload)
-
-        # Calculate the checksum
-        checksum = 0x00
-        for b in pkt:
-            checksum ^= ord(b)
-        checksum ^= checksum >> 4
-        checksum ^= checksum >> 2
-        checksum ^= checksum >> 1
-        checksum = (checksum & 1) ^ 1
-
-        # Add checksum to header
-        pkt = chr(ord(pkt[0]) | checksum) + pkt[1:]
-
-        # Send
-        self.serial.write(pkt)
-
-    def receive_tick_inner(self):
-        """Listen for packets and call :py:func:`receive_mc_packet` when an MC
-        packet is received.
+    @property
+    def stats(self):
+        stats = super(SpIOUARTProtocol, self).stats
+        stats['parity_errors'] = self.decoder.n_parity_errors
+        return stats
+
+    def frame_mc_packets(self, packets):
+        """Frame multicast packets with the given keys and payloads."""
+        if len(packets) == 0:
+            return ""
+        (keys, payloads) = zip(*packets)
+        return spio_codec.encode(keys, payloads)
+
+    def parse_mc_packets(self, data):
+        """Parse received SpIO packets, ignoring non multicast packets and
+        multicast packets without payloads.
+
+        Incomplete frames are retained by the decoder, so no data is returned
+        for later parsing.
         """
-        head_chr = self.serial.read(1)
-        if not head_chr:
-            # Terminate early on timeout
-            return
-
-        head = ord(head_chr)
-        is_multicast = head & 0xC0 == 0x00
-        long_packet = head & 0x02 == 0x02
-
-        if is_multicast and long_packet:
-            # Grab the key & payload
-            key, payload = self.packet_struct.unpack(self.serial.read(8))
-
-            # XXX: No parity checks are carried out
-            self.receive_mc_packet(key, payload)
-        else:
-            # Ignore non multicast packets or multicast packets without
-            # payloads
-            self.serial.read(8 if long_packet else 4)
+        (keys, payloads) = self.decoder.feed(data)
+        return keys, payloads, ""
@@ -0,0 +1,37 @@
+import nengo
+
+from .. import builder
+from ..config import Config
+
+
+def test_connectivity_transforms_config():
+    """Check that only connectivity transforms which accept a `config` are
+    provided with it.
+    """
+    calls = list()
+
+    def transform_without_config(objs, conns, probes):
+        calls.append(None)
+        return objs, conns
+
+    def transform_with_config(objs, conns, probes, config=None):
+        calls.append(config)
+        return objs, conns
+
+    model = nengo.Network()
+    with model:
+        a = nengo.Node(0.5)
+        b = nengo.Node(lambda t, x: None, size_in=1)
+        nengo.Connection(a, b)
+
+    config = Config()
+    transforms = list(builder.Builder.pre_rpn_transforms)
+    try:
+        builder.Builder.register_connectivity_transform(
+            transform_without_config)
+        builder.Builder.register_connectivity_transform(transform_with_config)
+        builder.Builder.build(model, 0.001, 1, config)
+    finally:
+        builder.Builder.pre_rpn_transforms[:] = transforms
+
+    assert calls == [None, config]
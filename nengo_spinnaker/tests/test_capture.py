@@ -0,0 +1,126 @@
+"""Tests for packet capture and replay.
+"""
+import numpy as np
+import pytest
+
+from nengo_spinnaker.spinn_io import capture
+
+
+def test_record_and_read(tmpdir):
+    filename = str(tmpdir.join("test.cap"))
+
+    with capture.PacketRecorder(filename) as recorder:
+        recorder.record_map(3, (1, 2, 17), "Node A")
+        recorder.record_sdp(capture.TX, "\x00\x01\x02")
+        recorder.record_mc(capture.RX, [0xfeed0000, 0xfeed0001], [1, 2])
+
+    records = list(capture.read_capture(filename))
+    assert [r.kind for r in records] == [capture.MAP, capture.SDP, capture.MC]
+    assert [r.direction for r in records] == [capture.TX, capture.TX,
+                                              capture.RX]
+    assert records[0].time <= records[1].time <= records[2].time
+
+    assert capture.unpack_map(records[0].data) == (3, (1, 2, 17), "Node A")
+    assert records[1].data == "\x00\x01\x02"
+    (keys, payloads) = capture.unpack_mc(records[2].data)
+    assert list(keys) == [0xfeed0000, 0xfeed0001]
+    assert list(payloads) == [1, 2]
+
+
+def test_read_not_capture(tmpdir):
+    filename = str(tmpdir.join("test.cap"))
+    with open(filename, 'wb') as f:
+        f.write("NOT A CAPTURE")
+
+    with pytest.raises(ValueError):
+        list(capture.read_capture(filename))
+
+
+class RecordingIO(object):
+    """IO which records the calls made to it by a Replay."""
+    def __init__(self):
+        self.calls = list()
+
+    def prepare_network(self, objects, connections, dt, keyspace,
+                        config=None):
+        return objects, connections
+
+    def bind(self, node_xyps, rx_xyps):
+        self.calls.append(('bind', node_xyps))
+
+    def sdp_receive(self, data):
+        self.calls.append(('sdp', data))
+
+    def receive_mc_packets(self, keys, payloads):
+        self.calls.append(('mc', list(keys), list(payloads)))
+
+
+def test_replay(tmpdir):
+    nengo = pytest.importorskip("nengo")
+    filename = str(tmpdir.join("test.cap"))
+
+    # Record some packets, those sent to the board should not be replayed
+    with capture.PacketRecorder(filename) as recorder:
+        recorder.record_map(1, (0, 0, 3), "b")
+        recorder.record_sdp(capture.RX, "rx")
+        recorder.record_sdp(capture.TX, "tx")
+        recorder.record_mc(capture.RX, [5], [6])
+
+    with nengo.Network():
+        a = nengo.Node(lambda t: t)
+        b = nengo.Node(lambda t, x: None, size_in=1)
+
+    io = RecordingIO()
+    replay = capture.Replay(io, filename, speed=None)
+    replay.prepare_network([a, "not a node", b], [], 0.001, None)
+
+    with replay:
+        replay.start()
+        assert replay.finished.wait(1.)
+
+    assert io.calls == [('bind', {b: (0, 0, 3)}), ('sdp', "rx"),
+                        ('mc', [5], [6])]
+    assert replay.n_replayed == 2
+
+
+def test_replay_uart(tmpdir):
+    """A UART built without a protocol may replay captured packets without
+    opening a serial connection.
+    """
+    nengo = pytest.importorskip("nengo")
+    uart = pytest.importorskip("nengo_spinnaker.spinn_io.uart")
+    from nengo_spinnaker.connection import IntermediateConnection
+    from nengo_spinnaker.utils import keyspaces
+    filename = str(tmpdir.join("test.cap"))
+
+    with nengo.Network():
+        a = nengo.Node([0.5, 0.25])
+        b = nengo.Node(lambda t, x: None, size_in=2)
+        e = nengo.Ensemble(10, 2)
+
+    ks = keyspaces.create_keyspace(
+        'TestKeySpace', [('x', 1), ('o', 8), ('c', 7), ('i', 8), ('d', 8)],
+        'xoci', 'xoi')(x=0)
+    conns = [IntermediateConnection(a, e, keyspace=ks(o=0, i=0)),
+             IntermediateConnection(e, b, keyspace=ks(o=1, i=0))]
+
+    io = uart.UART(None)
+    replay = capture.Replay(io, filename, speed=None)
+    (objs, conns) = replay.prepare_network([a, b, e], conns, 0.001, ks)
+    assert len(conns) == 3  # a->serial, e->filter, filter->serial
+
+    # Record the input of `b` as received from its filter vertex
+    (fvs, ) = [c for c in conns if c.post_obj is io._serial_vertex and
+               c.pre_obj is not e]
+    keys = [fvs.keyspace.key(d=d) for d in range(2)]
+    with capture.PacketRecorder(filename) as recorder:
+        recorder.record_mc(capture.RX, keys, [0x4000, 0x2000])
+
+    with replay:
+        replay.start()
+        assert replay.finished.wait(1.)
+        assert np.all(replay.get_node_input(b) == [0.5, 0.25])
+
+        # Output is processed but not transmitted
+        replay.set_node_output(a, np.array([0.5, 0.25]))
+    assert replay.n_outputs == 1
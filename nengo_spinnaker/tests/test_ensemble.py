@@ -0,0 +1,238 @@
+import nengo
+import numpy as np
+
+from .. import builder
+from .. import connection
+from .. import ensemble
+
+
+def _make_connections(model):
+    return [connection.IntermediateConnection.from_connection(c) for c in
+            model.connections]
+
+
+def test_pack_ensembles_limits():
+    """Ensembles are packed while their neurons and weights fit on a core."""
+    model = nengo.Network()
+    with model:
+        # Only two of these fit within MAX_ATOMS neurons
+        a = nengo.Ensemble(50, 1)
+        b = nengo.Ensemble(50, 1)
+        c = nengo.Ensemble(50, 1)
+
+        # These fit within MAX_ATOMS neurons, but not MAX_PACKED_WEIGHTS
+        d = nengo.Ensemble(60, 40)
+        e = nengo.Ensemble(60, 40)
+
+        # This is too large to be packed at all
+        f = nengo.Ensemble(ensemble.EnsembleLIF.MAX_ATOMS, 1)
+
+    packs = ensemble.pack_ensembles(model.ensembles, list())
+    assert packs == [[a, b], [c], [d], [e], [f]]
+
+
+def test_pack_ensembles_decoded_weights():
+    """Decoded dimensions count towards the weights of a pack."""
+    model = nengo.Network()
+    with model:
+        a = nengo.Ensemble(40, 1)
+        b = nengo.Ensemble(40, 1)
+        c = nengo.Ensemble(40, 1)
+        d = nengo.Ensemble(ensemble.EnsembleLIF.MAX_ATOMS, 60)
+
+        # a decodes 60 dimensions, so cannot be packed with b
+        nengo.Connection(a, d, transform=np.ones((60, 1)))
+
+        # c decodes a single dimension, the other rows of the transform are
+        # zero and are not decoded.
+        transform = np.zeros((60, 1))
+        transform[0] = 1.
+        nengo.Connection(c, d, transform=transform)
+
+    conns = _make_connections(model)
+    packs = ensemble.pack_ensembles(model.ensembles, conns)
+    assert packs == [[a], [b, c], [d]]
+
+
+def test_pack_ensembles_equal_taus():
+    """Only Ensembles with equal time constants are packed together."""
+    model = nengo.Network()
+    with model:
+        a = nengo.Ensemble(10, 1, neuron_type=nengo.LIF(tau_rc=0.02))
+        b = nengo.Ensemble(10, 1, neuron_type=nengo.LIF(tau_rc=0.03))
+        c = nengo.Ensemble(10, 1, neuron_type=nengo.LIF(tau_rc=0.02))
+        d = nengo.Ensemble(10, 1, neuron_type=nengo.LIF(tau_rc=0.03,
+                                                        tau_ref=0.001))
+
+    packs = ensemble.pack_ensembles(model.ensembles, list())
+    assert packs == [[a, c], [b], [d]]
+
+
+def test_pack_ensembles_unpackable_inputs():
+    """Ensembles fed by callable Nodes are not packed."""
+    model = nengo.Network()
+    with model:
+        n = nengo.Node(lambda t: t)
+        a = nengo.Ensemble(10, 1)
+        b = nengo.Ensemble(10, 1)
+        c = nengo.Ensemble(10, 1)
+        nengo.Connection(n, a)
+        nengo.Connection(c, b)
+
+    conns = _make_connections(model)
+    packs = ensemble.pack_ensembles(model.ensembles, conns)
+    assert packs == [[a], [b, c]]
+
+
+def test_pad_input_transforms():
+    """Transforms into packed Ensembles are padded onto their dimensions."""
+    model = nengo.Network()
+    with model:
+        n = nengo.Node([0.5, 0.25])
+        a = nengo.Ensemble(10, 1)
+        b = nengo.Ensemble(10, 2)
+        c = nengo.Ensemble(10, 3)
+        nengo.Connection(n[0], a)
+        nengo.Connection(n, b, transform=[[1., 2.], [3., 4.]])
+        nengo.Connection(a, c[1])
+
+    conns = _make_connections(model)
+    packs = ensemble.pack_ensembles(model.ensembles, conns)
+    assert packs == [[a, b, c]]
+    n_dims = [ensemble.get_n_output_dimensions(c) for c in conns]
+
+    ensemble.pad_input_transforms(packs[0], conns)
+    assert np.all(conns[0].transform == [[1., 0.],
+                                         [0., 0.],
+                                         [0., 0.],
+                                         [0., 0.],
+                                         [0., 0.],
+                                         [0., 0.]])
+    assert np.all(conns[1].transform == [[0., 0.],
+                                         [1., 2.],
+                                         [3., 4.],
+                                         [0., 0.],
+                                         [0., 0.],
+                                         [0., 0.]])
+    assert np.all(conns[2].transform == [[0.], [0.], [0.], [0.], [1.], [0.]])
+
+    # Padding does not change the dimensions decoded, or the packs
+    assert [ensemble.get_n_output_dimensions(c) for c in conns] == n_dims
+    assert ensemble.pack_ensembles(model.ensembles, conns) == packs
+
+
+def _decode(ens, x, decoders):
+    """Get the decoded output of an intermediate Ensemble representing x."""
+    rates = nengo.LIF(tau_rc=ens.tau_rc, tau_ref=ens.tau_ref).rates(
+        np.dot(x, ens.encoders.T), ens.gains, ens.bias)
+    return np.dot(rates, decoders)
+
+
+def test_pack_populations_distinct_connections():
+    """Equivalent connections from different packed populations are not
+    merged, each keeps its own headers, decoders and index.
+    """
+    model = nengo.Network()
+    with model:
+        n = nengo.Node(0.5)
+        a = nengo.Ensemble(10, 1, seed=1)
+        b = nengo.Ensemble(10, 1, seed=2)
+        c = nengo.Ensemble(200, 1, seed=3)
+        d = nengo.Ensemble(200, 1, seed=4)
+        nengo.Connection(n, a)
+        nengo.Connection(n, b)
+        nengo.Connection(a, c)
+        nengo.Connection(b, d)
+
+    # Build the populations alone for comparison
+    dt = 0.001
+    conns = _make_connections(model)
+    pop_a = ensemble.IntermediateEnsembleLIF.from_object(
+        a, [conns[2]], dt, None)
+    pop_b = ensemble.IntermediateEnsembleLIF.from_object(
+        b, [conns[3]], dt, None)
+
+    # Build the packed model
+    objs = model.all_nodes + model.all_ensembles
+    objs, conns = ensemble.build_ensembles(objs, conns, list(), dt, None)
+    (packed, ) = [o for o in objs if getattr(o, 'n_neurons', 0) == 20]
+    assert packed.population_offsets == {a: 0, b: 10}
+
+    (a_c, b_d) = [c for c in conns if c.pre_obj is packed]
+    assert a_c.post_obj.n_neurons == b_d.post_obj.n_neurons == 200
+    assert a_c.post_obj is not b_d.post_obj
+
+    # Each connection has its own index, used by the builder
+    assert packed.connection_indices == {a_c: 0, b_d: 1}
+    ids = builder._get_outgoing_ids(conns)
+    assert ids[a_c] == 0 and ids[b_d] == 1
+
+    # And its own headers and decoders
+    assert packed.decoder_headers == [(None, 0, 0), (None, 1, 0)]
+    assert packed.decoders.shape == (20, 2)
+    assert np.all(packed.decoders[:10, 0] == pop_a.decoders[:, 0])
+    assert np.all(packed.decoders[10:, 0] == 0.)
+    assert np.all(packed.decoders[:10, 1] == 0.)
+    assert np.all(packed.decoders[10:, 1] == pop_b.decoders[:, 0])
+
+    # Both Ensembles receive the constant input of the Node
+    assert np.all(packed.direct_input == [0.5, 0.5])
+
+
+def test_pack_populations_internal_connections():
+    """Connections between Ensembles of a pack become connections from the
+    packed Ensemble to itself, and the combined decoders decode the output of
+    each population.
+    """
+    model = nengo.Network()
+    with model:
+        n = nengo.Node([0.5, -0.25])
+        a = nengo.Ensemble(30, 1, seed=1)
+        b = nengo.Ensemble(30, 2, seed=2)
+        c = nengo.Ensemble(200, 1, seed=3)
+        nengo.Connection(n[0], a)
+        nengo.Connection(n, b)
+        nengo.Connection(a, b[1], function=lambda x: x**2)
+        nengo.Connection(b, c, function=lambda x: x[0] * x[1])
+        nengo.Connection(a, c, transform=-1.)
+
+    dt = 0.001
+    conns = _make_connections(model)
+    objs = model.all_nodes + model.all_ensembles
+    objs, conns = ensemble.build_ensembles(objs, conns, list(), dt, None)
+    (packed, ) = [o for o in objs if getattr(o, 'n_neurons', 0) == 60]
+    assert packed.population_offsets == {a: 0, b: 30}
+    assert packed.n_dimensions == 3
+    assert np.all(packed.direct_input == [0.5, 0.5, -0.25])
+
+    # The connection from a to b is from and to the packed Ensemble, onto the
+    # dimensions of b.
+    (a_b, ) = [c for c in conns if c.post_obj is packed]
+    assert a_b.pre_obj is packed
+    assert a_b.width == 3
+    assert np.all(a_b.transform == [[0.], [0.], [1.]])
+
+    # Each connection has its own index and headers
+    (a_c, ) = [c for c in conns if c.post_obj is not packed and
+               c.function is None]
+    (b_c, ) = [c for c in conns if c.post_obj is not packed and
+               c.function is not None]
+    assert packed.connection_indices == {a_b: 0, a_c: 1, b_c: 2}
+    assert packed.decoder_headers == [(None, 0, 2), (None, 1, 0),
+                                      (None, 2, 0)]
+
+    # Check the decoded output of the combined decoders: each header decodes
+    # the output of a single population as if it were built alone.
+    (a_b, b_c, a_c) = _make_connections(model)[2:]
+    pop_a = ensemble.IntermediateEnsembleLIF.from_object(
+        a, [a_b, a_c], dt, None)
+    pop_b = ensemble.IntermediateEnsembleLIF.from_object(b, [b_c], dt, None)
+
+    x = np.array([[0.5, 0.5, -0.25], [-0.5, 0.25, 0.75]])
+    decoded = _decode(packed, x, packed.decoders)
+    assert np.allclose(decoded[:, :2],
+                       _decode(pop_a, x[:, :1], pop_a.decoders))
+    assert np.allclose(decoded[:, 2:],
+                       _decode(pop_b, x[:, 1:], pop_b.decoders))
+    assert np.allclose(decoded[:, 0] * dt, x[:, 0]**2, atol=0.1)
+    assert np.allclose(decoded[:, 1] * dt, -x[:, 0], atol=0.1)
@@ -0,0 +1,145 @@
+"""Tests for selecting Ethernet links for host communication.
+"""
+import socket
+import time
+
+import mock
+import numpy as np
+import pytest
+
+import nengo
+from nengo_spinnaker.connection import IntermediateConnection
+from nengo_spinnaker.spinn_io import ethernet, policies, standin
+from nengo_spinnaker.utils import keyspaces
+
+
+def _get_free_port():
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    s.bind(("localhost", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def test_hex_distance():
+    assert ethernet.hex_distance(0, 0, 0, 0) == 0
+    assert ethernet.hex_distance(0, 0, 3, 2) == 3  # Diagonal links
+    assert ethernet.hex_distance(0, 0, 3, -2) == 5
+    assert ethernet.hex_distance(4, 8, 0, 0) == 8
+
+
+def test_select_link_nearest():
+    links = [ethernet.EthernetLink("a", 0, 0, 1, 17895, 17893),
+             ethernet.EthernetLink("b", 8, 4, 2, 17896, 17893)]
+
+    assert ethernet.select_link(links, {}, 1, 1) is links[0]
+    assert ethernet.select_link(links, {}, 7, 5) is links[1]
+
+
+def test_select_link_balanced():
+    links = [ethernet.EthernetLink("a", 0, 0, 1, 17895, 17893),
+             ethernet.EthernetLink("b", 8, 4, 2, 17896, 17893)]
+    loads = {links[0]: 64}
+
+    # Without balancing the nearest link is always used
+    assert ethernet.select_link(links, loads, 3, 1) is links[0]
+
+    # With balancing a heavily loaded link is avoided
+    assert ethernet.select_link(links, loads, 3, 1, balance=0.25) is links[1]
+
+    # Ties are broken in favour of the least loaded link
+    assert ethernet.select_link(links, loads, 4, 2) is links[1]
+
+
+def test_multi_ethernet_loopback():
+    """Traffic should be shared between stand-in boards on the loopback
+    interface, each vertex communicating via its nearest link.
+    """
+    model = nengo.Network()
+    with model:
+        a = nengo.Node(np.zeros(40))
+        b = nengo.Node(np.zeros(40))
+        c = nengo.Node(lambda t, x: None, size_in=2)
+        e = nengo.Ensemble(10, 40)
+        f = nengo.Ensemble(10, 2)
+
+    ks = keyspaces.create_keyspace(
+        'TestKeySpace', [('x', 1), ('o', 8), ('c', 7), ('i', 8), ('d', 8)],
+        'xoci', 'xoi')(x=0)
+    conns = [IntermediateConnection(a, e, transform=np.eye(40),
+                                    keyspace=ks(o=0, i=0)),
+             IntermediateConnection(b, e, transform=np.eye(40),
+                                    keyspace=ks(o=1, i=0)),
+             IntermediateConnection(f, c, transform=np.eye(2),
+                                    keyspace=ks(o=2, i=0))]
+
+    # Two boards, each with an Ethernet connected chip
+    links = [ethernet.EthernetLink("localhost", 0, 0, 1, _get_free_port(),
+                                   _get_free_port()),
+             ethernet.EthernetLink("localhost", 8, 4, 2, _get_free_port(),
+                                   _get_free_port())]
+    standins = [standin.SDPStandIn(l.sdp_port, "localhost", l.port)
+                for l in links]
+
+    io = ethernet.MultiEthernet(links, tx_policy=policies.OnChange())
+    io.prepare_network([a, b, c, e, f], conns, 0.001, ks)
+
+    # Each Node requires its own Rx element, place one near each link.  The
+    # input of `c` is emitted by a core near the second link.
+    assert len(io.rx_elements) == 2
+    rx_xyps = {io.rx_elements[0]: (1, 0, 1), io.rx_elements[1]: (7, 4, 1)}
+    node_xyps = {c: (8, 5, 2)}
+    standins[1].add_source(8, 5, 2, 2, 100., links[1].tag)
+
+    received = [list(), list()]
+    for (s, r) in zip(standins, received):
+        s.add_receiver(lambda xyp, values, t, r=r: r.append(xyp))
+
+    with standins[0], standins[1]:
+        io.open(node_xyps, rx_xyps)
+        try:
+            io.start()
+            io.set_node_output(a, np.ones(40))
+            io.set_node_output(b, np.ones(40))
+            time.sleep(0.2)
+            c_input = io.get_node_input(c)
+        finally:
+            io.stop()
+
+    # Output for each Rx element should have been sent via its nearest link
+    assert received[0] == [(1, 0, 1)]
+    assert received[1] == [(7, 4, 1)]
+    assert io.vertex_links[io.rx_elements[0]] is links[0]
+    assert io.vertex_links[io.rx_elements[1]] is links[1]
+
+    # Input for `c` should have been received via the second link, which is
+    # also the link its Tx element would be told to transmit via.
+    assert c_input is not None and len(c_input) == 2
+    assert io.get_vertex_link(io.nodes_tx[c], (8, 5, 2)) is links[1]
+
+
+def test_ethernet_rx_error():
+    """An error which ends the reception of packets should be raised when
+    communication is stopped.
+    """
+    link = ethernet.EthernetLink("localhost", 0, 0, 1, _get_free_port(),
+                                 _get_free_port())
+    io = ethernet.Ethernet("localhost", links=[link])
+    io.open(dict(), dict())
+
+    with mock.patch.object(io, 'sdp_receive',
+                           side_effect=ValueError("Bad packet")):
+        io.start()
+        try:
+            out = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            out.sendto("\x00" * 24, ("localhost", link.port))
+            out.close()
+
+            # The Rx thread ends rather than receiving further packets
+            io.rx_thread.join(1.)
+            assert not io.rx_thread.is_alive()
+            assert isinstance(io.rx_error, ValueError)
+        finally:
+            with pytest.raises(ValueError):
+                io.stop()
+    assert not io.tx_thread.is_alive()
@@ -0,0 +1,71 @@
+"""Tests for host->board transmission policies.
+"""
+import numpy as np
+
+from nengo_spinnaker.spinn_io import policies
+
+
+def test_deadband():
+    p = policies.OnChange(deadband=0.1)
+
+    # Anything is significant if nothing has been transmitted
+    assert p.is_significant(None, np.array([0., 0.]))
+
+    # Small changes are not significant, large changes are
+    assert not p.is_significant(np.array([0., 0.]), np.array([0.05, -0.05]))
+    assert p.is_significant(np.array([0., 0.]), np.array([0.05, -0.2]))
+
+    # No deadband means all changes are significant
+    p = policies.OnChange()
+    assert p.is_significant(np.array([0.]), np.array([0.]))
+
+
+def test_fixed_rate():
+    p = policies.FixedRate(0.1)
+
+    # The first transmission should occur after a period
+    assert p.next_transmission(1.0) == 1.1
+
+    # Transmitting moves to the next slot
+    p.transmitted(1.1)
+    assert np.allclose(p.next_transmission(1.15), 1.2)
+
+    # Missed slots are skipped
+    p.transmitted(1.45)
+    assert np.allclose(p.next_transmission(1.45), 1.5)
+
+
+def test_on_change():
+    p = policies.OnChange(min_interval=0.05)
+
+    # Transmit immediately when nothing has been sent
+    assert p.next_transmission(2.0) == 2.0
+    p.transmitted(2.0)
+
+    # Then no sooner than the minimum interval
+    assert p.next_transmission(2.01) == 2.05
+    assert p.next_transmission(3.0) == 2.05
+
+
+def test_token_bucket():
+    p = policies.TokenBucket(rate=10., burst=2)
+
+    # Can burst twice immediately
+    assert p.next_transmission(0.) == 0.
+    p.transmitted(0.)
+    assert p.next_transmission(0.) == 0.
+    p.transmitted(0.)
+
+    # Then have to wait for the bucket to refill
+    assert np.allclose(p.next_transmission(0.), 0.1)
+    assert np.allclose(p.next_transmission(0.05), 0.1)
+    assert p.next_transmission(0.1) == 0.1
+
+
+def test_copy_is_independent():
+    p = policies.OnChange(min_interval=1.)
+    q = p.copy()
+
+    p.transmitted(0.)
+    assert q.next_transmission(0.5) == 0.5
+    assert p.next_transmission(0.5) == 1.
@@ -0,0 +1,87 @@
+"""Tests for packing probes into value sinks.
+"""
+import mock
+import numpy as np
+
+from nengo_spinnaker import probe
+from nengo_spinnaker.connection import IntermediateConnection
+from nengo_spinnaker.utils import keyspaces
+
+
+def _pack(sizes, n_conns=None):
+    """Pack probes of the given sizes, each with the given number of incoming
+    connections, returning the probes packed into each value sink.
+    """
+    n_conns = [1] * len(sizes) if n_conns is None else n_conns
+    probes = [probe.IntermediateProbe(s, None, mock.Mock()) for s in sizes]
+    conns = dict(zip(probes, n_conns))
+    assembler = mock.Mock()
+    assembler.get_incoming_connections.side_effect =\
+        lambda p: [mock.Mock()] * conns[p]
+
+    with mock.patch.object(probe.DecodedValueProbe, 'assemble',
+                           side_effect=lambda ps, a: list(ps)):
+        vertices = probe.pack_probes(probes, assembler)
+
+    sinks = list()
+    for p in probes:
+        if vertices[p] not in sinks:
+            sinks.append(vertices[p])
+    return [[p.size_in for p in s] for s in sinks]
+
+
+def test_pack_probes_dimensions():
+    """Probes should be packed, largest first, into the first value sink with
+    room for their dimensions.
+    """
+    assert (sorted(_pack([40, 30, 20, 10, 64, 1])) ==
+            sorted([[64], [40, 20, 1], [30, 10]]))
+
+
+def test_pack_probes_packets():
+    """Probes receiving more packets than the budget allows should not share
+    a value sink.
+    """
+    n_packets = probe.DecodedValueProbe.MAX_PACKETS
+    assert (sorted(_pack([2, 2, 2], [n_packets // 4, n_packets // 4,
+                                     n_packets // 2])) ==
+            sorted([[2, 2], [2]]))
+
+
+def test_pack_probes_same_ensemble():
+    """Probes of the same Ensemble with different synapses receive the same
+    packets, so every channel of their value sink must route those packets to
+    its own filters.
+    """
+    ks = keyspaces.create_keyspace(
+        'TestKeySpace', [('x', 1), ('o', 8), ('c', 7), ('i', 8), ('d', 8)],
+        'xoci', 'xoi')(x=0, o=3, i=0)
+    ens = mock.Mock()
+    probes = [probe.IntermediateProbe(2, None, mock.Mock()) for _ in
+              range(2)]
+    conns = dict((p, [IntermediateConnection(ens, p, synapse=s,
+                                             transform=np.eye(2),
+                                             keyspace=ks)])
+                 for (p, s) in zip(probes, [0.01, 0.05]))
+
+    assembler = mock.MagicMock()
+    assembler.timestep = 1000
+    assembler.dt = 0.001
+    assembler.n_recording_ticks = 100
+    assembler.config.__getitem__.return_value.average = False
+    assembler.get_incoming_connections.side_effect = lambda p: conns[p]
+
+    # Both probes share a value sink
+    vertices = probe.pack_probes(probes, assembler)
+    assert vertices[probes[0]] is vertices[probes[1]]
+
+    # The routes of each channel, which follow those of the previous channel,
+    # match the same key.
+    routes = vertices[probes[0]].regions[2].data
+    assert routes[0] == routes[5] == 1
+    assert routes[1:3] == routes[6:8] == [ks.filter_key(), ks.filter_mask]
+
+    # But each channel has its own filter
+    filters = vertices[probes[0]].regions[1].data
+    assert filters[0] == filters[5] == 1
+    assert filters[1] != filters[6]
@@ -0,0 +1,80 @@
+"""Tests for windowed SCP transfers against the SCP stand-in.
+"""
+import numpy as np
+import pytest
+import socket
+import time
+
+from nengo_spinnaker.utils import scp
+from nengo_spinnaker.spinn_io import standin
+
+
+def _get_free_port():
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    s.bind(("localhost", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def test_write_read():
+    port = _get_free_port()
+    data = np.random.randint(0, 256, size=5000).astype(np.uint8).tostring()
+
+    with standin.SCPStandIn(port) as board:
+        with scp.SCPConnection("localhost", port) as conn:
+            conn.write(1, 2, 0x60001000, data)
+            assert conn.read(1, 2, 0x60001000, len(data)) == data
+
+            # Unaligned reads, and reads of memory never written
+            assert conn.read(1, 2, 0x60001003, 10) == data[3:13]
+            assert conn.read(2, 2, 0x60001000, 8) == "\x00" * 8
+
+    assert board.read_memory(1, 2, 0x60001000, len(data)) == data
+    assert conn.n_retransmitted == 0
+
+
+def test_loss():
+    """Lost requests and responses should be retransmitted."""
+    port = _get_free_port()
+    data = np.random.randint(0, 256, size=8192).astype(np.uint8).tostring()
+
+    with standin.SCPStandIn(port, loss=0.1, seed=3) as board:
+        with scp.SCPConnection("localhost", port, timeout=0.05,
+                               n_retries=20) as conn:
+            conn.write(0, 0, 0x60000000, data)
+            assert conn.read(0, 0, 0x60000000, len(data)) == data
+
+    assert board.n_dropped > 0
+    assert conn.n_retransmitted > 0
+
+
+def test_window():
+    """Keeping requests outstanding should hide the latency of each."""
+    port = _get_free_port()
+    n_blocks = 40
+
+    with standin.SCPStandIn(port, latency=0.01):
+        with scp.SCPConnection("localhost", port, window=8) as conn:
+            s = time.time()
+            conn.read(0, 0, 0x60000000, n_blocks * scp.BLOCK_SIZE)
+            t = time.time() - s
+
+    assert t < 0.5 * n_blocks * 0.01
+
+
+def test_errors():
+    port = _get_free_port()
+
+    # Requests the stand-in rejects
+    with standin.SCPStandIn(port):
+        with scp.SCPConnection("localhost", port) as conn:
+            with pytest.raises(scp.SCPError):
+                conn._transfer(0, 0, 0, [(scp.CMD_READ, (0, 1024, 0), "")])
+
+    # No response
+    with scp.SCPConnection("localhost", port, timeout=0.01,
+                           n_retries=2) as conn:
+        with pytest.raises(scp.SCPError):
+            conn.read(0, 0, 0x60000000, 4)
+    assert conn.n_sent == 3
@@ -0,0 +1,169 @@
+"""Tests for the SpIO UART framing codec.
+"""
+import numpy as np
+import struct
+
+from nengo_spinnaker.spinn_io import spio_codec
+
+
+def _frame(key, payload):
+    """Reference framing of a single multicast packet."""
+    pkt = "\x02" + struct.pack("<LL", key, payload)
+    parity = 0
+    for b in pkt:
+        parity ^= ord(b)
+    parity = bin(parity).count("1") & 1
+    return chr(ord(pkt[0]) | (parity ^ 1)) + pkt[1:]
+
+
+def test_encode_matches_reference():
+    keys = [0x00000000, 0x12345678, 0xffffffff, 0x80000001]
+    payloads = [0x00000000, 0xdeadbeef, 0x00000001, 0xffffffff]
+
+    data = spio_codec.encode(keys, payloads)
+    assert data == "".join(_frame(k, p) for (k, p) in zip(keys, payloads))
+
+    # Every frame has odd parity
+    frames = np.frombuffer(data, dtype=np.uint8).reshape(-1, 9)
+    assert np.all(spio_codec.frame_parity(frames) == 1)
+
+
+def test_roundtrip():
+    keys = np.random.randint(0, 2**32, size=1000).astype(np.uint32)
+    payloads = np.random.randint(0, 2**32, size=1000).astype(np.uint32)
+
+    decoder = spio_codec.SpIODecoder()
+    (rkeys, rpayloads) = decoder.feed(spio_codec.encode(keys, payloads))
+    assert np.all(rkeys == keys)
+    assert np.all(rpayloads == payloads)
+    assert decoder.n_packets == 1000
+    assert decoder.buffer.size == 0
+
+
+def test_streaming_partial_frames():
+    keys = range(20)
+    payloads = range(100, 120)
+    data = spio_codec.encode(keys, payloads)
+
+    # Feed the data in awkwardly sized chunks
+    decoder = spio_codec.SpIODecoder()
+    rkeys = list()
+    rpayloads = list()
+    for i in range(0, len(data), 7):
+        (k, p) = decoder.feed(data[i:i + 7])
+        rkeys.extend(k)
+        rpayloads.extend(p)
+
+    assert rkeys == keys
+    assert rpayloads == payloads
+
+
+def test_resynchronise_on_corruption():
+    keys = [0xfeed0000 | i for i in range(10)]
+    payloads = [0x1000 + i for i in range(10)]
+    good = spio_codec.encode(keys, payloads)
+    corrupt = spio_codec.encode([3], [30])
+    corrupt = corrupt[:4] + chr(ord(corrupt[4]) ^ 0x10) + corrupt[5:]
+
+    # A corrupted frame followed by good frames
+    decoder = spio_codec.SpIODecoder()
+    (rkeys, rpayloads) = decoder.feed(corrupt + good)
+
+    assert list(rkeys) == keys
+    assert list(rpayloads) == payloads
+    assert decoder.n_parity_errors == 1
+    assert decoder.n_dropped == 9
+
+    # Once synchronised, decoding continues as usual
+    (rkeys, rpayloads) = decoder.feed(spio_codec.encode([1], [2]))
+    assert list(rkeys) == [1]
+
+    # Stray bytes are also discarded
+    decoder = spio_codec.SpIODecoder()
+    (rkeys, rpayloads) = decoder.feed("\x42\x42\x42" + good)
+    assert list(rkeys) == keys
+    assert decoder.n_dropped == 3
+
+
+def test_resynchronise_across_chunks():
+    keys = [0xfeed0000 | i for i in range(10)]
+    payloads = [0x1000 + i for i in range(10)]
+    good = spio_codec.encode(keys, payloads)
+    corrupt = spio_codec.encode([3], [30])
+    corrupt = corrupt[:4] + chr(ord(corrupt[4]) ^ 0x10) + corrupt[5:]
+
+    # Long runs of noise are discarded even when fed in several chunks
+    data = corrupt + "\x00" * 10000 + good
+    decoder = spio_codec.SpIODecoder()
+    rkeys = list()
+    for i in range(0, len(data), 1000):
+        rkeys.extend(decoder.feed(data[i:i + 1000])[0])
+
+    assert rkeys == keys
+    assert decoder.n_parity_errors == 1
+    assert decoder.n_dropped == 10009
+    assert decoder.buffer.size == 0
+
+
+def test_ignore_packets_without_payload():
+    short = "\x00\x01\x02\x03\x04"  # Odd parity, no payload
+    data = (spio_codec.encode([1], [10]) + short +
+            spio_codec.encode([2, 3, 4], [20, 30, 40]))
+
+    decoder = spio_codec.SpIODecoder()
+    (keys, payloads) = decoder.feed(data)
+    assert list(keys) == [1, 2, 3, 4]
+    assert decoder.n_ignored == 1
+
+    # Packets of other types are only ignored once confirmed by the frames
+    # which follow them.
+    decoder = spio_codec.SpIODecoder()
+    (keys, payloads) = decoder.feed(
+        spio_codec.encode([1, 2, 3, 4], [10, 20, 30, 40]) + short +
+        spio_codec.encode([5], [50]))
+    assert list(keys) == [1, 2, 3, 4]
+    assert decoder.n_ignored == 0
+
+    (keys, payloads) = decoder.feed(spio_codec.encode([6, 7], [60, 70]))
+    assert list(keys) == [5, 6, 7]
+    assert decoder.n_ignored == 1
+
+
+def test_resynchronise_on_flipped_header_bits():
+    """A flipped bit in the header of a frame should only lose that packet,
+    even if the corrupted frame appears to be a valid packet of another type.
+    """
+    keys = [0xfeed0000 | i for i in range(10)]
+    payloads = [0x1000 + i for i in range(10)]
+    good = spio_codec.encode(keys, payloads)
+
+    for bit in range(8):
+        data = good[:45] + chr(ord(good[45]) ^ (1 << bit)) + good[46:]
+
+        for chunk in (len(data), 7):
+            decoder = spio_codec.SpIODecoder()
+            (rkeys, rpayloads) = (list(), list())
+            for i in range(0, len(data), chunk):
+                (k, p) = decoder.feed(data[i:i + chunk])
+                rkeys.extend(k)
+                rpayloads.extend(p)
+
+            assert rkeys == keys[:5] + keys[6:]
+            assert rpayloads == payloads[:5] + payloads[6:]
+
+
+def test_resynchronise_on_garbage_prefix():
+    """Garbage preceding the first frame should be discarded even if it
+    appears to start a valid frame.
+    """
+    keys = [0xfeed0000 | i for i in range(10)]
+    payloads = [0x1000 + i for i in range(10)]
+    good = spio_codec.encode(keys, payloads)
+
+    for prefix in ["\xff", "\xff\xff\xff", "\x02", "\x03\x00",
+                   "\x03\x12\x34\x56\x78"]:
+        decoder = spio_codec.SpIODecoder()
+        (rkeys, rpayloads) = decoder.feed(prefix + good)
+        assert list(rkeys) == keys
+        assert list(rpayloads) == payloads
+        assert decoder.n_dropped == len(prefix)
@@ -0,0 +1,118 @@
+"""Tests for the SDP stand-in board and the benchmark regression check.
+"""
+import socket
+import time
+
+from nengo_spinnaker.utils import sdp
+from nengo_spinnaker.spinn_io import standin
+
+
+def _get_free_port():
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    s.bind(("localhost", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def test_standin_consume_and_emit():
+    # Socket on which to receive packets from the stand-in
+    host = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    host.bind(("localhost", 0))
+    host.settimeout(1.)
+    host_port = host.getsockname()[1]
+    sdp_port = _get_free_port()
+
+    received = list()
+    s = standin.SDPStandIn(sdp_port, "localhost", host_port)
+    s.add_source(1, 2, 3, 2, 100.)
+    s.add_receiver(lambda xyp, values, t: received.append((xyp, values)))
+
+    with s:
+        # Send a packet to the stand-in as the Ethernet IO would
+        packet = sdp.SDPPacket(flags=0x07, tag=0xff, dest_port=1, dest_cpu=5,
+                               src_port=7, src_cpu=31, dest_x=0, dest_y=1,
+                               src_x=0, src_y=0,
+                               data=sdp.pack_values([0.25, 0.5]))
+        host.sendto(sdp.pack_sdp(packet), ("localhost", sdp_port))
+
+        # Receive a packet emitted by the stand-in
+        data = host.recv(512)
+        time.sleep(0.05)
+    host.close()
+
+    # The packet sent to the stand-in should have been consumed
+    assert received == [((0, 1, 5), [0.25, 0.5])]
+    assert s.n_consumed == 1
+
+    # The emitted packet should be from the source and hold a sequence number
+    packet = sdp.unpack_sdp(data)
+    assert (packet.src_x, packet.src_y, packet.src_cpu) == (1, 2, 3)
+    (cmd_rc, _, _, values) = sdp.unpack_values(packet.data)
+    assert cmd_rc == 1
+    assert len(values) == 2
+    assert values[0] in s.emit_times[(1, 2, 3)]
+
+
+def test_standin_acknowledges():
+    host = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    host.bind(("localhost", 0))
+    host.settimeout(1.)
+    sdp_port = _get_free_port()
+
+    s = standin.SDPStandIn(sdp_port, "localhost", host.getsockname()[1])
+    with s:
+        # Request an acknowledgement of some values
+        packet = sdp.SDPPacket(flags=0x07, tag=0xff, dest_port=1, dest_cpu=5,
+                               src_port=7, src_cpu=31, dest_x=0, dest_y=1,
+                               src_x=0, src_y=0,
+                               data=sdp.pack_values([0.5], sdp.CMD_DATA_ACK,
+                                                    7, (1234, 0, 0)))
+        host.sendto(sdp.pack_sdp(packet), ("localhost", sdp_port))
+        data = host.recv(512)
+    host.close()
+
+    # The acknowledgement should come from the receiving core and echo the
+    # sequence number and timestamp.
+    packet = sdp.unpack_sdp(data)
+    assert (packet.src_x, packet.src_y, packet.src_cpu) == (0, 1, 5)
+    (cmd_rc, seq, args, values) = sdp.unpack_values(packet.data)
+    assert (cmd_rc, seq, args[0]) == (sdp.CMD_ACK, 7, 1234)
+    assert args[1] <= args[2]
+    assert values == []
+
+
+def test_standin_loss():
+    sdp_port = _get_free_port()
+    s = standin.SDPStandIn(sdp_port, "localhost", _get_free_port(), loss=1.)
+    out = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    with s:
+        for _ in range(10):
+            out.sendto("\x00" * 30, ("localhost", sdp_port))
+        time.sleep(0.1)
+    out.close()
+
+    assert s.n_received == 10
+    assert s.n_dropped == 10
+    assert s.n_consumed == 0
+
+
+def test_check_regression():
+    from nengo_spinnaker.spinn_io import benchmark
+
+    baseline = dict(tx_rate=1000., rx_rate=100., tx_latency_p50=0.001,
+                    cpu_per_packet=1e-5)
+
+    # Small changes are not regressions
+    results = dict(tx_rate=950., rx_rate=110., tx_latency_p50=0.0011,
+                   cpu_per_packet=1e-5, rx_latency_p50=None)
+    assert benchmark.check_regression(results, baseline) == []
+
+    # Falling rates and rising latencies are
+    results = dict(tx_rate=500., rx_rate=100., tx_latency_p50=0.002,
+                   cpu_per_packet=1e-5)
+    regressions = benchmark.check_regression(results, baseline)
+    assert len(regressions) == 2
+    assert "tx_rate" in regressions[0]
+    assert "tx_latency_p50" in regressions[1]
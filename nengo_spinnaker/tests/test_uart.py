@@ -0,0 +1,131 @@
+"""Tests for the UART protocol engine using a pty as a loopback stand-in for
+a SpiNNaker board.
+"""
+import os
+import pytest
+import threading
+
+serial = pytest.importorskip("serial")
+pty = pytest.importorskip("pty")
+
+from nengo_spinnaker.spinn_io import uart
+
+
+class LoopbackBoard(object):
+    """Exchanges a SpIO sync sequence with the host and then echoes everything
+    written by the host back to it.
+    """
+    def __init__(self):
+        (self.master, slave) = pty.openpty()
+        self.port = os.ttyname(slave)
+        self.stop_now = False
+
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run(self):
+        # Wait for the sync sequence from the host and reply with our own
+        data = ""
+        while not data.endswith("\xff"):
+            data += os.read(self.master, 1)
+        os.write(self.master, "\x00"*13 + "\xff")
+
+        # Echo
+        while not self.stop_now:
+            try:
+                os.write(self.master, os.read(self.master, 4096))
+            except OSError:
+                break
+
+
+class PacketRecorder(object):
+    def __init__(self, n_expected):
+        self.packets = list()
+        self.n_expected = n_expected
+        self.done = threading.Event()
+
+    def receive_mc_packets(self, keys, payloads):
+        self.packets.extend(zip(keys, payloads))
+        if len(self.packets) >= self.n_expected:
+            self.done.set()
+
+
+def test_spio_loopback():
+    board = LoopbackBoard()
+    protocol = uart.SpIOUARTProtocol(board.port, max_batch=32)
+
+    # Queue packets before starting so that they are written in batches
+    sent = [(0xfeed0000 | i, i * 3) for i in range(100)]
+    for (key, payload) in sent:
+        protocol.queue_mc_packet(key, payload)
+
+    io = PacketRecorder(len(sent))
+    protocol.start(io)
+    io.done.wait(5.)
+    protocol.stop()
+    board.stop_now = True
+
+    assert io.packets == sent
+
+    stats = protocol.stats
+    assert stats['tx_packets'] == 100
+    assert stats['rx_packets'] == 100
+    assert stats['tx_bytes'] == stats['rx_bytes'] == 900
+    assert stats['tx_batches'] <= 4  # Batched writes
+    assert stats['queue_depth']['max'] == 100
+
+
+def test_spio_coalesce_and_parse():
+    board = LoopbackBoard()
+    protocol = uart.SpIOUARTProtocol(board.port)
+
+    # Only the latest payload for a key is retained
+    protocol.queue_mc_packet(1, 10)
+    protocol.queue_mc_packet(2, 20)
+    protocol.queue_mc_packet(1, 11)
+    assert list(protocol.outgoing_packet_queue.items()) == [(1, 11), (2, 20)]
+
+    # Incomplete packets are retained for later parsing, packets without
+    # payloads are ignored once confirmed by the packets following them.
+    packets = [(k, 10*k) for k in range(1, 8)]
+    data = protocol.frame_mc_packets(packets)
+    short = "\x00\x01\x02\x03\x04"
+    (keys, payloads, rest) = protocol.parse_mc_packets(
+        data[:36] + short + data[36:40])
+    assert list(keys) == [1, 2, 3, 4]
+    assert list(payloads) == [10, 20, 30, 40]
+    assert rest == ""
+
+    (keys, payloads, rest) = protocol.parse_mc_packets(data[40:])
+    assert list(keys) == [5, 6, 7] and list(payloads) == [50, 60, 70]
+    assert protocol.stats['parity_errors'] == 0
+
+    board.stop_now = True
+    protocol.serial.close()
+
+
+def test_spio_reader_error():
+    """An error which ends the reader thread should be raised when the
+    protocol is stopped.
+    """
+    board = LoopbackBoard()
+    protocol = uart.SpIOUARTProtocol(board.port)
+
+    class FailingIO(object):
+        def receive_mc_packets(self, keys, payloads):
+            raise ValueError("Bad packets")
+
+    for k in range(10):
+        protocol.queue_mc_packet(k, k)
+    protocol.start(FailingIO())
+
+    # The reader thread ends rather than reading further packets
+    protocol.reader.join(5.)
+    assert not protocol.reader.is_alive()
+    assert isinstance(protocol.error, ValueError)
+
+    with pytest.raises(ValueError):
+        protocol.stop()
+    board.stop_now = True
+    protocol.serial.close()
@@ -3,8 +3,13 @@ import nengo
 from . import builder
 from . import connections
 from . import decoders
+from . import dispatch
 from . import fixpoint as fp
+from . import host
+from . import host_process
 from . import keyspaces
 from . import nodes
 from . import probes
+from . import scp
+from . import timing
 from . import vertices
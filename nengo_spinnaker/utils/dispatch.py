@@ -0,0 +1,145 @@
+"""Dispatch of received multicast packets to the inputs of host objects.
+"""
+
+import numpy as np
+import threading
+
+from . import fixpoint as fp
+
+
+class KeyDispatchTable(object):
+    """Maps multicast keys to slots in a single contiguous array of inputs.
+
+    Each target (e.g., a Node) is registered with the filter key of the
+    packets which carry its input and its number of dimensions, and is
+    allocated a contiguous block of slots.  The slot for a packet is the base
+    of the block for its filter key plus the dimension extracted from the key.
+
+    :param filter_mask: Mask selecting the bits of a key which identify the
+                        target.
+    :param d_mask: Mask selecting the bits of a key which give the dimension.
+    """
+    def __init__(self, filter_mask, d_mask):
+        self.filter_mask = filter_mask
+        self.d_mask = d_mask
+        self.d_shift = 0
+        while d_mask and not (d_mask >> self.d_shift) & 1:
+            self.d_shift += 1
+
+        self.targets = list()
+        self.indices = dict()
+        self.slices = dict()
+        self.size = 0
+
+        self._filter_keys = np.zeros(0, dtype=np.uint32)
+        self._indices = np.zeros(0, dtype=np.intp)
+        self._bases = np.zeros(0, dtype=np.intp)
+        self._sizes = np.zeros(0, dtype=np.intp)
+
+    def add(self, filter_key, target, size):
+        """Allocate slots for a target which receives packets with the given
+        filter key.
+        """
+        assert target not in self.slices
+        self.indices[target] = len(self.targets)
+        self.slices[target] = slice(self.size, self.size + size)
+        self.targets.append((filter_key, target, self.size, size))
+        self.size += size
+
+        # Rebuild the lookup arrays sorted by filter key
+        entries = sorted((fk, i, base, n) for (i, (fk, _, base, n)) in
+                         enumerate(self.targets))
+        (filter_keys, indices, bases, sizes) = zip(*entries)
+        self._filter_keys = np.array(filter_keys, dtype=np.uint32)
+        self._indices = np.array(indices, dtype=np.intp)
+        self._bases = np.array(bases, dtype=np.intp)
+        self._sizes = np.array(sizes, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.targets)
+
+    def lookup(self, keys):
+        """Get the slots for a batch of keys.
+
+        :returns: (slots, target indices, valid) where `valid` is a boolean
+                  array indicating which keys were recognised; `slots` and
+                  `target indices` contain entries for recognised keys only.
+        """
+        keys = np.asarray(keys, dtype=np.uint32)
+        if len(self.targets) == 0:
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty, np.zeros(keys.shape, dtype=bool)
+
+        filter_keys = keys & self.filter_mask
+        d = (keys & self.d_mask) >> self.d_shift
+
+        i = np.searchsorted(self._filter_keys, filter_keys)
+        i = np.minimum(i, self._filter_keys.size - 1)
+        valid = ((self._filter_keys[i] == filter_keys) &
+                 (d < self._sizes[i]))
+
+        i = i[valid]
+        return self._bases[i] + d[valid], self._indices[i], valid
+
+
+class InputFrames(object):
+    """Double-buffered assembly of input frames from received packets.
+
+    Values for each target are written into a back buffer.  Once every
+    dimension of a target has been received the target's frame is complete
+    and the buffers are swapped for that target, so that readers see only
+    complete frames and may be given views into the front buffer rather than
+    copies.  A view remains valid until the frame after next begins to
+    arrive.
+
+    :param table: The :py:class:`KeyDispatchTable` allocating slots.
+    """
+    def __init__(self, table):
+        self.table = table
+        self.buffers = np.zeros((2, table.size))
+        self.received = np.zeros(table.size, dtype=bool)
+
+        # Index of the front buffer for each target, -1 until the first frame
+        # for the target has been completed.
+        self.front = np.zeros(len(table), dtype=int) - 1
+        self.lock = threading.Lock()
+
+    def receive(self, keys, payloads):
+        """Store the values from a batch of packets.
+
+        :returns: The list of targets for which frames were completed.
+        """
+        (slots, indices, valid) = self.table.lookup(keys)
+        values = fp.kbits_array(np.asarray(payloads)[valid])
+
+        completed = list()
+        with self.lock:
+            for i in np.unique(indices):
+                (_, target, base, size) = self.table.targets[i]
+                back = 1 if self.front[i] == 0 else 0
+                mine = indices == i
+
+                self.buffers[back][slots[mine]] = values[mine]
+                self.received[slots[mine]] = True
+
+                if self.received[base:base + size].all():
+                    # Frame complete, swap the buffers for this target.  The
+                    # old front buffer is not written to until the next frame
+                    # begins arriving.
+                    self.front[i] = back
+                    self.received[base:base + size] = False
+                    completed.append(target)
+
+        return completed
+
+    def get(self, target):
+        """Get a read-only view of the latest complete frame for the target,
+        or None if no frame has yet been completed.
+        """
+        with self.lock:
+            front = self.front[self.table.indices[target]]
+            if front < 0:
+                return None
+            view = self.buffers[front][self.table.slices[target]]
+        view.flags.writeable = False
+        return view
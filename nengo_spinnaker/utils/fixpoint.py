@@ -1,4 +1,5 @@
 import collections
+import numpy as np
 
 
 def bitsk(value, n_bits=32, n_frac=15, signed=True):
@@ -62,3 +63,29 @@ def kbits(value, n_bits=32, n_frac=15, signed=True):
                 for v in value]
     else:
         raise TypeError('Values must be ints or iterables')
+
+
+def bitsk_array(values, n_frac=15):
+    """Convert an array of values into signed 32-bit fixed point words.
+
+    Equivalent to :py:func:`bitsk` with `n_bits=32` and `signed=True`, but
+    performed in a single vectorised pass.
+
+    :returns: an array of uint32
+    """
+    values = np.asarray(values, dtype=np.float64) * 2**n_frac
+    values = np.clip(values, -2**31, 2**31 - 1)
+    return np.trunc(values).astype(np.int64).astype(np.uint32)
+
+
+def kbits_array(words, n_frac=15, out=None):
+    """Convert an array of signed 32-bit fixed point words into values.
+
+    Equivalent to :py:func:`kbits` with `n_bits=32` and `signed=True`, but
+    performed in a single vectorised pass.
+
+    :param out: Optional array (of the same shape as `words`) into which to
+                write the values, e.g., of float32 or memory-mapped.
+    """
+    words = np.ascontiguousarray(words, dtype=np.uint32)
+    return np.multiply(words.view(np.int32), 2.**-n_frac, out=out)
@@ -0,0 +1,282 @@
+"""Lightweight execution of the Node-only network simulated on the host.
+
+The network produced by :py:func:`~nengo_spinnaker.utils.nodes.\
+create_host_network` contains nothing but Nodes and the connections between
+them.  Rather than building a reference `nengo.Simulator` for this network the
+:py:class:`HostExecutor` sorts the Nodes such that every Node is evaluated
+after the Nodes which feed it through unfiltered connections, preallocates the
+input and output of every Node and applies transforms and Lowpass synapses in
+place.
+
+As in the reference simulator, the output of a filtered connection is updated
+at the end of each step and so is seen by the post-synaptic Node a step
+later, whereas unfiltered connections are seen immediately.
+
+Nodes which do not depend on each other within a step may be evaluated
+concurrently by a pool of threads, which is of benefit when Node functions
+release the GIL (e.g., in NumPy, OpenCV or I/O).  Results do not depend on the
+number of threads.  The time taken to evaluate each Node is recorded in
+:py:attr:`HostExecutor.node_times`.
+
+Nodes may be evaluated less often than every step by setting their `period`
+in the Config.  The output of such a Node is held between evaluations, and
+the Nodes which communicate its output to the board are evaluated at the same
+rate so that output is only transmitted when it has been refreshed.
+"""
+
+from multiprocessing.pool import ThreadPool
+import numpy as np
+import time
+
+import nengo
+
+from . import nodes, timing
+
+
+class HostConnection(object):
+    """A connection between Nodes simulated on the host.
+
+    :param connection: The Nengo connection.
+    :param pre_output: Output buffer of the pre-synaptic Node.
+    :param dt: Time step of the simulation.
+    """
+    def __init__(self, connection, pre_output, dt):
+        self.pre_obj = connection.pre_obj
+        self.post_obj = connection.post_obj
+        self.function = connection.function
+        self.pre_output = pre_output
+
+        # Scalar transforms are applied elementwise
+        self.transform = np.asarray(connection.transform, dtype=float)
+        self.is_scalar = self.transform.ndim == 0
+        self.value = np.zeros(self.post_obj.size_in)
+
+        # Lowpass filters are characterised by the decay of their state in
+        # each step, None for unfiltered connections.
+        synapse = connection.synapse
+        if isinstance(synapse, nengo.synapses.Lowpass):
+            synapse = synapse.tau
+        if synapse is not None and not isinstance(synapse, (int, float)):
+            raise NotImplementedError(
+                "Host connections only support Lowpass synapses, not '%s'." %
+                synapse.__class__.__name__)
+
+        self.decay = None
+        if synapse is not None:
+            self.decay = np.exp(-dt / synapse) if synapse > 0.03*dt else 0.
+            self._new = np.zeros(self.post_obj.size_in)
+
+    @property
+    def is_filtered(self):
+        return self.decay is not None
+
+    def compute(self, out):
+        """Write the transformed (and function of the) output of the
+        pre-synaptic Node into `out`.
+        """
+        x = self.pre_output
+        if self.function is not None:
+            x = np.asarray(self.function(x), dtype=float)
+
+        if self.is_scalar:
+            np.multiply(x, self.transform, out=out)
+        else:
+            np.dot(self.transform, x, out=out)
+
+    def update(self):
+        """Advance the state of a filtered connection by a step."""
+        self.compute(self._new)
+        self._new -= self.value
+        self._new *= 1. - self.decay
+        self.value += self._new
+
+
+class HostExecutor(object):
+    """Steps a network of Nodes on the host.
+
+    :param network: A network containing only Nodes and connections between
+                    them.
+    :param dt: Time step of the simulation.
+    :param config: Config from which the `period` of each Node is read.
+    :param threads: If greater than 1, the number of threads with which to
+                    evaluate independent Nodes concurrently.
+    :raises: :py:exc:`ValueError` if the network contains a cycle of
+             unfiltered connections.
+    """
+    def __init__(self, network, dt=0.001, config=None, threads=None):
+        self.dt = dt
+        self.n_steps = 0
+        self.step_times = timing.LatencyRecorder()
+
+        # Objects (e.g., a HostProcess) which exchange values with the IO at
+        # the end of every step
+        self.workers = list()
+
+        # Allocate the input and output of every Node, passthrough Nodes share
+        # a single buffer for both.
+        self.inputs = dict()
+        self.outputs = dict()
+        for n in network.nodes:
+            self.inputs[n] = np.zeros(n.size_in)
+            if n.output is None:
+                self.outputs[n] = self.inputs[n]
+            elif callable(n.output):
+                self.outputs[n] = np.zeros(n.size_out)
+            else:
+                self.outputs[n] = np.array(n.output, dtype=float).reshape(
+                    n.size_out)
+
+        self.connections = [HostConnection(c, self.outputs[c.pre_obj], dt)
+                            for c in network.connections]
+        self.filtered = [c for c in self.connections if c.is_filtered]
+
+        # Group the Nodes into levels such that Nodes within a level are
+        # independent of each other within a step, and precompute the work
+        # for each.  Node parameters are looked up once here as attribute
+        # access is comparatively slow.
+        self.levels = list()
+        self.order = list()
+        self.node_times = dict()
+        for level in get_levels(network.nodes, self.connections):
+            entries = list()
+            for n in level:
+                incoming = [c for c in self.connections if c.post_obj is n]
+                f = n.output if callable(n.output) else None
+                self.node_times[n] = timing.LatencyRecorder()
+                entries.append((n, get_period(n, dt, config), f,
+                                n.size_in > 0, n.size_out > 0,
+                                self.inputs[n], self.outputs[n], incoming,
+                                self.node_times[n]))
+            self.levels.append(entries)
+            self.order.extend(entries)
+
+        # Pool of threads with which to evaluate the Nodes of each level
+        self.pool = None
+        if threads is not None and threads > 1:
+            self.pool = ThreadPool(threads)
+
+    @property
+    def time(self):
+        return self.n_steps * self.dt
+
+    def step(self):
+        """Advance the simulation by one time step."""
+        s = time.time()
+        self.n_steps += 1
+
+        if self.pool is None:
+            for entry in self.order:
+                self._evaluate(entry)
+        else:
+            for level in self.levels:
+                if len(level) == 1:
+                    self._evaluate(level[0])
+                else:
+                    self.pool.map(self._evaluate, level)
+
+        # Advance the filters
+        for c in self.filtered:
+            c.update()
+
+        for w in self.workers:
+            w.exchange()
+
+        self.step_times.record(time.time() - s)
+
+    def _evaluate(self, entry):
+        """Compute the input to and evaluate a single Node."""
+        (_, period, f, has_input, has_output, x, y, incoming,
+         node_time) = entry
+
+        # Hold the output of Nodes which are not due to be evaluated
+        if period > 1 and (self.n_steps - 1) % period != 0:
+            return
+
+        s = time.time()
+
+        # Sum the input to the Node
+        if incoming:
+            x.fill(0.)
+            for c in incoming:
+                if c.decay is None:
+                    c.compute(c.value)
+                x += c.value
+
+        # Evaluate the Node, constant and passthrough Nodes need no work
+        if f is not None:
+            t = self.n_steps * self.dt
+            v = f(t, x) if has_input else f(t)
+            if has_output:
+                y[:] = v
+
+        node_time.record(time.time() - s)
+
+    def run_steps(self, steps):
+        """Advance the simulation by the given number of steps."""
+        for _ in range(steps):
+            self.step()
+
+    def close(self):
+        """Stop any threads used to evaluate Nodes."""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+
+def get_period(node, dt, config=None):
+    """Get the period (in steps) with which the given Node should be
+    evaluated.
+
+    Nodes which communicate with the board on behalf of another Node share its
+    period.
+    """
+    if isinstance(node.output, (nodes.InputFromBoard, nodes.OutputToBoard)):
+        node = node.output.node
+
+    period = None if config is None else config[node].period
+    if period is None:
+        return 1
+    return max(1, int(round(period / dt)))
+
+
+def get_levels(nodes, connections):
+    """Group Nodes into levels such that every Node is in a later level than
+    those which feed it via unfiltered connections.
+
+    Nodes within a level do not depend on each other within a step and may be
+    evaluated in any order, or concurrently.
+
+    :raises: :py:exc:`ValueError` if the unfiltered connections form a cycle.
+    """
+    # Count the unfiltered inputs to each Node
+    n_inputs = dict((n, 0) for n in nodes)
+    for c in connections:
+        if not c.is_filtered:
+            n_inputs[c.post_obj] += 1
+
+    levels = list()
+    ready = [n for n in nodes if n_inputs[n] == 0]
+    while len(ready) > 0:
+        levels.append(ready)
+
+        ready = list()
+        for n in levels[-1]:
+            for c in connections:
+                if c.pre_obj is n and not c.is_filtered:
+                    n_inputs[c.post_obj] -= 1
+                    if n_inputs[c.post_obj] == 0:
+                        ready.append(c.post_obj)
+
+    if sum(len(l) for l in levels) < len(nodes):
+        raise ValueError("Host Nodes contain a cycle of unfiltered "
+                         "connections.")
+    return levels
+
+
+def sort_nodes(nodes, connections):
+    """Order Nodes such that every Node follows those which feed it via
+    unfiltered connections.
+
+    :raises: :py:exc:`ValueError` if the unfiltered connections form a cycle.
+    """
+    return [n for level in get_levels(nodes, connections) for n in level]
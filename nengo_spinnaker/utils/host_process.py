@@ -0,0 +1,236 @@
+"""Execution of host Nodes in a separate worker process.
+
+Nodes with heavy functions (e.g., vision or robot control) compete for the
+GIL with the threads which handle IO with the board.  Nodes may instead be
+simulated in a worker process by setting the `separate_process` parameter in
+the Config::
+
+    config = nengo_spinnaker.Config()
+    config[n].separate_process = True
+
+Every host Node connected to such a Node (directly or via other host Nodes)
+is simulated in the worker process with it.  The worker exchanges input and
+output with the IO, which remains in the main process, through ring buffers
+in shared memory.  The main process moves values between the rings and the
+IO's `get_node_input` and `set_node_output` once per step of the Nodes it
+simulates.
+
+The worker process is forked, which is not possible on Windows.
+"""
+
+import multiprocessing
+import numpy as np
+import sys
+import time
+
+import nengo
+
+from . import host, nodes
+
+
+class SharedRing(object):
+    """Ring buffer of fixed size vectors in shared memory with a single
+    producer and a single consumer.
+
+    The producer never blocks, once the ring is full the oldest values are
+    overwritten.  The consumer is only interested in the most recent value.
+
+    :param size: Length of each vector.
+    :param n_slots: Number of vectors held by the ring.
+    """
+    def __init__(self, size, n_slots=4):
+        assert n_slots >= 2
+        self.size = size
+        self.n_slots = n_slots
+
+        # Number of vectors written, and the number which had been written
+        # when the consumer last read.
+        self._count = multiprocessing.RawValue('L', 0)
+        self.n_read = 0
+
+        self._data = multiprocessing.RawArray('d', size * n_slots)
+        self.data = np.ctypeslib.as_array(self._data).reshape(n_slots, size)
+
+    @property
+    def count(self):
+        return self._count.value
+
+    def put(self, values):
+        """Write a vector into the ring."""
+        i = self._count.value
+        self.data[i % self.n_slots] = values
+        self._count.value = i + 1
+
+    def get(self):
+        """Get a copy of the most recently written vector if it has not
+        already been read, otherwise None.
+        """
+        while True:
+            count = self._count.value
+            if count == self.n_read:
+                return None
+
+            values = self.data[(count - 1) % self.n_slots].copy()
+
+            # The slot may have been overwritten while it was copied if the
+            # producer has since lapped the ring, in which case try again.
+            if self._count.value - count < self.n_slots - 1:
+                self.n_read = count
+                return values
+
+
+class WorkerIO(object):
+    """Stands in for the IO within the worker process, exchanging values
+    through shared rings.
+
+    :param inputs: Map of Node to the ring carrying its input.
+    :param outputs: Map of Node to the ring carrying its output.
+    """
+    def __init__(self, inputs, outputs):
+        self.inputs = inputs
+        self.outputs = outputs
+        self.latest = dict()
+
+    def get_node_input(self, node):
+        values = self.inputs[node].get()
+        if values is not None:
+            self.latest[node] = values
+        return self.latest.get(node)
+
+    def set_node_output(self, node, output):
+        self.outputs[node].put(output)
+
+
+class HostProcess(object):
+    """Simulates a network of host Nodes in a worker process.
+
+    :param network: Network of Nodes as produced by
+                    :py:func:`split_host_network`.
+    :param io: The IO with which the Nodes communicate.
+    :param dt: Time step of the simulation.
+    :param config: Config from which the `period` of each Node is read.
+    """
+    def __init__(self, network, io, dt=0.001, config=None):
+        if sys.platform == 'win32':
+            raise NotImplementedError(
+                "Host Nodes may not be simulated in a separate process on "
+                "Windows.")
+
+        self.network = network
+        self.io = io
+        self.dt = dt
+        self.config = config
+
+        # Create rings for the Nodes which communicate with the board
+        self.inputs = dict()
+        self.outputs = dict()
+        for n in network.nodes:
+            if isinstance(n.output, nodes.InputFromBoard):
+                self.inputs[n.output.node] = SharedRing(n.size_out)
+            elif isinstance(n.output, nodes.OutputToBoard):
+                self.outputs[n.output.node] = SharedRing(n.size_in)
+
+        self._n_steps = multiprocessing.RawValue('L', 0)
+        self.stop_event = multiprocessing.Event()
+        (self._summary_recv, self._summary_send) = multiprocessing.Pipe(False)
+        self.step_times = None
+        self.process = None
+
+    @property
+    def n_steps(self):
+        """Number of steps simulated by the worker process."""
+        return self._n_steps.value
+
+    def start(self):
+        """Start the worker process."""
+        self.process = multiprocessing.Process(target=self._run,
+                                               name="HostProcess")
+        self.process.daemon = True
+        self.process.start()
+
+    def stop(self, timeout=1.):
+        """Stop the worker process and retrieve a summary of its step
+        times.
+        """
+        self.stop_event.set()
+        if self.process is not None:
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+
+        if self._summary_recv.poll():
+            self.step_times = self._summary_recv.recv()
+
+    def exchange(self):
+        """Pass input from the IO to the worker process and output from the
+        worker process to the IO.
+        """
+        for (node, ring) in self.inputs.items():
+            values = self.io.get_node_input(node)
+            if values is not None:
+                ring.put(values)
+
+        for (node, ring) in self.outputs.items():
+            values = ring.get()
+            if values is not None:
+                self.io.set_node_output(node, values)
+
+    def _run(self):
+        """Simulate the Nodes in real time until stopped, run within the
+        worker process.
+        """
+        # Redirect the IO Nodes to the rings
+        io = WorkerIO(self.inputs, self.outputs)
+        for n in self.network.nodes:
+            if isinstance(n.output, (nodes.InputFromBoard,
+                                     nodes.OutputToBoard)):
+                n.output.io = io
+
+        executor = host.HostExecutor(self.network, self.dt, self.config)
+        start = time.time()
+        while not self.stop_event.is_set():
+            executor.step()
+            self._n_steps.value = executor.n_steps
+
+            wait = start + executor.n_steps * self.dt - time.time()
+            if wait > 0.:
+                time.sleep(wait)
+
+        self._summary_send.send(executor.step_times.summary())
+
+
+def split_host_network(network, config=None):
+    """Split a network of host Nodes into those to simulate in the main
+    process and those to simulate in a worker process.
+
+    A Node is simulated in the worker process if it, or any Node to which it
+    is connected, has `separate_process` set in the config.
+
+    :returns: (main network, worker network)
+    """
+    # Group the Nodes into connected components
+    component = dict((n, set([n])) for n in network.nodes)
+    for c in network.connections:
+        (a, b) = (component[c.pre_obj], component[c.post_obj])
+        if a is not b:
+            a |= b
+            for n in b:
+                component[n] = a
+
+    separate = set()
+    if config is not None:
+        for n in network.nodes:
+            if (not isinstance(n.output, (nodes.InputFromBoard,
+                                          nodes.OutputToBoard)) and
+                    config[n].separate_process):
+                separate |= component[n]
+
+    # Build the networks
+    (main, worker) = (nengo.Network(), nengo.Network())
+    main.nodes = [n for n in network.nodes if n not in separate]
+    worker.nodes = [n for n in network.nodes if n in separate]
+    main.connections.extend(c for c in network.connections if
+                            c.pre_obj not in separate)
+    worker.connections.extend(c for c in network.connections if
+                              c.pre_obj in separate)
+    return main, worker
@@ -28,6 +28,20 @@ def create_host_network(connections, io, config=None):
     return new_network
 
 
+def get_output_period(node, dt, config=None, default=100):
+    """Get the period (in ticks) with which input for the given Node should be
+    transmitted from the board to the host, and the threshold by which the
+    input must change for it to be transmitted early.
+
+    :returns: (period in ticks, threshold or None)
+    """
+    period = None if config is None else config[node].output_period
+    threshold = None if config is None else config[node].output_threshold
+
+    ticks = default if period is None else max(1, int(round(period / dt)))
+    return ticks, threshold
+
+
 def get_connected_nodes(connections):
     """From the connections return a list of Nodes which are are either at the
     beginning or end of a connection.
@@ -64,7 +78,8 @@ def replace_node_x_connections(connections, io, config=None):
 
                 # Create a new Connection: transforms, functions and filters
                 # are handled elsewhere
-                c_ = nengo.Connection(c.pre_obj, n, add_to_container=False)
+                c_ = nengo.Connection(c.pre_obj, n, synapse=None,
+                                      add_to_container=False)
 
                 new_nodes.append(n)
                 new_conns.append(c_)
@@ -88,7 +103,8 @@ def replace_x_node_connections(connections, io):
                 isinstance(c.post_obj, nengo.Node)):
             # Create a new input node
             n = create_input_node(c.post_obj, io)
-            c_ = nengo.Connection(n, c.post_obj, add_to_container=False)
+            c_ = nengo.Connection(n, c.post_obj, synapse=None,
+                                  add_to_container=False)
 
             new_nodes.append(n)
             new_conns.append(c_)
@@ -1,6 +1,9 @@
+import collections
 import numpy as np
 import logging
-import warnings
+import Queue
+import struct
+import threading
 logger = logging.getLogger(__name__)
 
 import nengo
@@ -10,98 +13,805 @@ from . import fixpoint as fp
 from . import vertices
 
 
+def get_sample_ticks(sample_every, dt):
+    """Get the number of ticks between the samples of a probe which samples
+    every `sample_every` seconds (or every tick if None).
+    """
+    if sample_every is None:
+        return 1
+    return max(1, int(round(sample_every / dt)))
+
+
+class RecordingReader(object):
+    """Reads the frames recorded into the circular buffer of a recording
+    region as they are written.
+
+    The region starts with a count of the frames written followed by the
+    length of the buffer in frames (see
+    :py:class:`~nengo_spinnaker.utils.vertices.FrameBasedRecordingRegion`).
+    Frames which are overwritten before they are read are lost.
+
+    :param region_id: Index of the recording region.
+    :param frame_length: Length of each frame (in words).
+    :param n_frames: Length of the buffer (in frames).
+    :param offset: Position of the header in the region (in words).
+    :param in_progress: Most frames of the buffer written before the count is
+                        updated.
+    """
+    def __init__(self, x, y, p, region_id, frame_length, n_frames, offset=0,
+                 in_progress=1):
+        self.x = x
+        self.y = y
+        self.p = p
+        self.region_id = region_id
+        self.frame_length = frame_length
+        self.n_frames = n_frames
+        self.offset = offset
+        self.in_progress = in_progress
+        self.n_read = 0
+        self.n_lost = 0
+
+        # The address of the region is looked up only once
+        self.address_cache = dict()
+
+    def _read_count(self, txrx):
+        data = vertices.retrieve_region_data(
+            txrx, self.x, self.y, self.p, self.region_id, 1, self.offset,
+            self.address_cache)
+        return struct.unpack('<I', data)[0]
+
+    def _read_frames(self, txrx, start, n_frames):
+        offset = (self.offset + vertices.RECORDING_HEADER_WORDS +
+                  start * self.frame_length)
+        return vertices.retrieve_region_data(
+            txrx, self.x, self.y, self.p, self.region_id,
+            n_frames * self.frame_length, offset, self.address_cache)
+
+    def read(self, txrx, final=False):
+        """Read the frames written since the last read.
+
+        :param final: True if recording has finished, in which case no frame
+                      is being written and every frame in the buffer may be
+                      read.
+        :returns: (index of the first frame, string of frames)
+        """
+        # While recording, the slots following the last frame written hold
+        # the oldest frames, which may be being overwritten by the frame in
+        # progress.
+        in_progress = 0 if final else self.in_progress
+        count = self._read_count(txrx)
+        first = max(self.n_read, count - self.n_frames + in_progress)
+        if count <= first:
+            return first, ""
+
+        # Read the frames from the buffer in at most two blocks
+        start = first % self.n_frames
+        n_frames = count - first
+        data = self._read_frames(txrx, start, min(n_frames,
+                                                  self.n_frames - start))
+        if start + n_frames > self.n_frames:
+            data += self._read_frames(txrx, 0,
+                                      start + n_frames - self.n_frames)
+
+        # Discard any frames which may have been overwritten while being read
+        overwritten = min(
+            self._read_count(txrx) - self.n_frames + in_progress - first,
+            count - first)
+        if overwritten > 0:
+            data = data[overwritten * self.frame_length * 4:]
+            first += overwritten
+
+        self.n_lost += first - self.n_read
+        if first > self.n_read:
+            logger.warning("%d frames of region %d on (%d, %d, %d) were "
+                           "overwritten before being read." %
+                           (first - self.n_read, self.region_id, self.x,
+                            self.y, self.p))
+        self.n_read = count
+        return first, data
+
+
+class EventRecordingReader(RecordingReader):
+    """Reads the events recorded into a recording region of spike events,
+    and the count of frames recorded which precedes its header (see
+    :py:class:`~nengo_spinnaker.utils.vertices.EventBasedRecordingRegion`).
+
+    :attr n_frames_recorded: Number of frames recorded, including those in
+                             which nothing spiked, when last read.
+    """
+    def __init__(self, *args, **kwargs):
+        super(EventRecordingReader, self).__init__(*args, **kwargs)
+        self.n_frames_recorded = 0
+
+    def read(self, txrx, final=False):
+        # The count of frames is updated after the count of words, so every
+        # event of the frames counted is read.
+        data = vertices.retrieve_region_data(
+            txrx, self.x, self.y, self.p, self.region_id, 1, self.offset - 1,
+            self.address_cache)
+        self.n_frames_recorded = struct.unpack('<I', data)[0]
+        return super(EventRecordingReader, self).read(txrx, final)
+
+
 class SpiNNakerProbe(object):
     """A NengoProbe encapsulates the logic required to retrieve data from a
     SpiNNaker machine.
+
+    Data is read from the board, possibly periodically during the
+    simulation, by the :py:class:`RecordingReader` for each subvertex and
+    passed to :py:meth:`receive`.  Once the simulation is complete the data
+    is retrieved in full by :py:meth:`get_data`.
+
+    A frame is recorded at the end of every `sample_ticks` ticks, frame `f`
+    holds the data for tick `(f + 1) * sample_ticks - 1`.
     """
-    def __init__(self, probe, dt=0.001):
+    def __init__(self, probe, dt=0.001, sample_ticks=1):
         self.probe = probe
         self.dt = dt
+        self.sample_ticks = sample_ticks
+        self.readers = None
+        self.lock = threading.Lock()
+
+    def _create_readers(self, vertex, region_id, reader=RecordingReader):
+        """Create a reader for the recording region of each subvertex which
+        records anything, the subvertex read by each reader is stored in
+        `subvertices`.
+        """
+        region = vertex.regions[region_id - 1]
+        readers = list()
+        self.subvertices = list()
+        for sv in vertex.subvertices:
+            frame_length = region.frame_length(sv.lo_atom, sv.hi_atom)
+            if frame_length == 0:
+                continue
+            (x, y, p) = sv.placement.processor.get_coordinates()
+            readers.append(reader(
+                x, y, p, region_id, frame_length,
+                region.buffer_length(sv.lo_atom, sv.hi_atom),
+                region.header_offset(sv.lo_atom, sv.hi_atom),
+                region.max_frame_length(sv.lo_atom, sv.hi_atom)))
+            self.subvertices.append(sv)
+        return readers
 
-    def get_data(self, txrx):
+    def get_readers(self):
+        """Get the reader for the recording region of each subvertex."""
+        raise NotImplementedError
+
+    @property
+    def n_frames(self):
+        """Number of frames which have been read (or lost)."""
+        return max(r.n_read for r in self.readers) if self.readers else 0
+
+    @property
+    def n_ticks(self):
+        """Number of ticks covered by the frames which have been read."""
+        return self.n_frames * self.sample_ticks
+
+    def receive(self, index, first, data):
+        """Decode and retain data read by the reader with the given index.
+
+        :param first: Index of the first frame in the data.
+        :param data: String of recorded frames.
+        """
+        raise NotImplementedError
+
+    def read(self, txrx, final=False):
+        """Read data recorded since the last read."""
+        for (i, reader) in enumerate(self.get_readers()):
+            self.receive(i, *reader.read(txrx, final))
+
+    def get_data(self, txrx=None):
+        """Retrieve the recorded data.
+
+        :param txrx: Transceiver with which to read any data not yet read, or
+                     None if all data has been read.
+        """
         raise NotImplementedError
 
 
 class DecodedValueProbe(SpiNNakerProbe):
+    """Retrieves the values recorded by a channel of a value sink."""
     def __init__(self, recording_vertex, probe):
-        super(DecodedValueProbe, self).__init__(probe)
+        self.channel = recording_vertex.probes.index(probe)
+        super(DecodedValueProbe, self).__init__(
+            probe, sample_ticks=recording_vertex.sample_ticks[self.channel])
         self.recording_vertex = recording_vertex
+        self.width = recording_vertex.widths[self.channel]
+        self.chunks = list()
+        self.n_received = 0
 
-    def get_data(self, txrx):
-        # For only 1 subvertex, get the recorded data
+    def get_readers(self):
+        # For only 1 subvertex, read the stripe of the recording region for
+        # this channel.
         assert(len(self.recording_vertex.subvertices) == 1)
-        sv = self.recording_vertex.subvertices[0]
-        (x, y, p) = sv.placement.processor.get_coordinates()
-
-        size = self.recording_vertex.regions[
-            self.recording_vertex.recording_region_index-1].sizeof(
-                sv.lo_atom, sv.hi_atom)
-
-        sdata = vertices.retrieve_region_data(
-            txrx, x, y, p, self.recording_vertex.recording_region_index,
-            size
-        )
-
-        # Cast as a Numpy array, shape and return
-        data = np.array(fp.kbits([int(i) for i in
-                                  np.fromstring(sdata, dtype=np.uint32)]))
-        return data.reshape((self.recording_vertex.run_ticks,
-                             self.recording_vertex.width))
-
-
-try:
-    from bitarray import bitarray
-
-    class SpikeProbe(SpiNNakerProbe):
-        def __init__(self, target_vertex, probe):
-            super(SpikeProbe, self).__init__(probe)
-            self.target_vertex = target_vertex
-
-        def get_data(self, txrx):
-            # Calculate the number of frames
-            n_frames = int(self.target_vertex.runtime * 1000)  # TODO Neaten!
-            data = [list() for n in range(n_frames)]
-
-            for subvertex in self.target_vertex.subvertices:
-                # Get the contents of the "SPIKES" region for each subvertex
-                (x, y, p) = subvertex.placement.processor.get_coordinates()
-
-                size = self.target_vertex.regions[
-                    self.target_vertex.spikes_recording_region-1].sizeof(
-                        subvertex.lo_atom, subvertex.hi_atom)
-
-                sdata = vertices.retrieve_region_data(
-                    txrx, x, y, p, self.target_vertex.spikes_recording_region,
-                    size)
-
-                # Cast the spikes as a bit array
-                spikes = bitarray()
-                spikes.frombytes(sdata)
-
-                # Convert each frame into a list of spiked neurons
-                frame_length = ((subvertex.n_atoms >> 5) +
-                                (1 if subvertex.n_atoms & 0x1f else 0))
-
-                for f in range(n_frames-1):  # TODO Understand the -1
-                    frame = spikes[32*f*frame_length + 32:
-                                   32*(f + 1)*frame_length + 32]
-                    data[f].extend([n + subvertex.lo_atom for n in
-                                    range(subvertex.n_atoms) if frame[n]])
-
-            # Convert into list of spike times
-            spikes = [[0.] for n in range(self.probe.target.n_neurons)]
-            for (i, f) in enumerate(data):
-                for n in f:
-                    spikes[n].append(i*self.dt)
+        if self.readers is None:
+            region_id = self.recording_vertex.recording_region_index
+            region = self.recording_vertex.regions[region_id - 1]
+            stripe = region.stripes[self.channel]
+            sv = self.recording_vertex.subvertices[0]
+            (x, y, p) = sv.placement.processor.get_coordinates()
+            self.readers = [RecordingReader(
+                x, y, p, region_id, stripe.frame_length(0, 0),
+                stripe.buffer_length(0, 0),
+                region.stripe_offset(self.channel, 0, 0))]
+        return self.readers
+
+    def receive(self, index, first, data):
+        # Retain the raw words, frames which were lost are left as zeros
+        with self.lock:
+            if first > self.n_received:
+                self.chunks.append(np.zeros(
+                    (first - self.n_received, self.width),
+                    dtype='<u4'))
+            words = np.frombuffer(data, dtype='<u4')
+            n_frames = words.size // self.width
+            if n_frames > 0:
+                self.chunks.append(words.reshape(n_frames, self.width))
+            self.n_received = first + n_frames
+
+    def get_data(self, txrx=None, out=None, dtype=np.float64):
+        """Retrieve the recorded values.
+
+        :param txrx: Transceiver with which to read any data not yet read, or
+                     None if all data has been read.
+        :param out: Array of shape (ticks, width) into which to write the
+                    values, or the name of a `.npy` file to create and map
+                    into memory for the purpose.
+        :param dtype: Type of the values if `out` is not an array.
+        :returns: The array of values.
+        """
+        if txrx is not None:
+            self.read(txrx, final=True)
+
+        # Reinterpret the data as fixed point words and convert into the
+        # output array in a single pass.
+        shape = (self.n_received, self.width)
+        if out is None:
+            out = np.empty(shape, dtype=dtype)
+        elif isinstance(out, basestring):
+            out = np.lib.format.open_memmap(out, mode='w+', dtype=dtype,
+                                            shape=shape)
+
+        i = 0
+        for words in self.chunks:
+            fp.kbits_array(words, out=out[i:i + words.shape[0]])
+            i += words.shape[0]
+        return out
+
+
+def lowpass(values, tau, dt, block=256):
+    """Filter values with a first-order lowpass filter, as applied by the
+    input filters on the board.
+
+    Each output is `y[i] = a*y[i-1] + (1 - a)*x[i]` where `a = exp(-dt/tau)`.
+    Blocks of values are filtered at once by multiplying by a lower-triangular
+    matrix of the decay between each pair of ticks in the block.
+
+    :param values: Array of shape (ticks, width).
+    :param tau: Time constant of the filter, or None for no filtering.
+    :returns: Array of the filtered values.
+    """
+    if tau is None:
+        return values
+
+    a = np.exp(-dt / tau)
+    k = np.arange(block)
+    decay = np.tril(a ** np.maximum(k[:, np.newaxis] - k, 0))
+
+    filtered = np.empty_like(values)
+    y = np.zeros(values.shape[1:])
+    for i in range(0, values.shape[0], block):
+        x = values[i:i + block]
+        n = x.shape[0]
+        filtered[i:i + n] = ((1. - a) * np.dot(decay[:n, :n], x) +
+                             np.outer(a ** (k[:n] + 1), y))
+        y = filtered[i + n - 1]
+    return filtered
+
+
+class EnsembleOutputProbe(SpiNNakerProbe):
+    """Retrieves the decoded output of an Ensemble recorded by the Ensemble
+    itself rather than by a separate value sink.
+
+    Each subvertex records, every tick, the sum of the decoders of its neurons
+    which spiked.  The sums of every subvertex are added and filtered on the
+    host before being sampled every `sample_every`.
+
+    :param target_vertex: The Ensemble vertex.
+    :param connection: Connection from the Ensemble to the probe, one of the
+                       `recorded_connections` of the vertex.
+    :param average: Average the values over each sampling period rather than
+                    sampling them at its end.
+    """
+    def __init__(self, target_vertex, connection, dt=0.001, average=False):
+        probe = connection.post_obj.probe
+        super(EnsembleOutputProbe, self).__init__(
+            probe, dt, get_sample_ticks(probe.sample_every, dt))
+        self.target_vertex = target_vertex
+        self.average = average
+
+        # Get the dimensions of the recorded frames belonging to this probe
+        conns = target_vertex.recorded_connections
+        self.offset = sum(c.post_obj.size_in for c in
+                          conns[:conns.index(connection)])
+        self.width = connection.post_obj.size_in
+
+        synapse = connection.synapse
+        if isinstance(synapse, nengo.synapses.Lowpass):
+            synapse = synapse.tau
+        self.tau = synapse
+
+        self.chunks = collections.defaultdict(list)
+
+    def get_readers(self):
+        if self.readers is None:
+            self.readers = self._create_readers(
+                self.target_vertex,
+                self.target_vertex.output_recording_region)
+        return self.readers
+
+    @property
+    def n_frames(self):
+        # Frames are recorded every tick but sampled every `sample_ticks`
+        return super(EnsembleOutputProbe, self).n_frames // self.sample_ticks
+
+    def receive(self, index, first, data):
+        # Retain the values of this probe, frames which were lost are zeros
+        frame_length = self.readers[index].frame_length
+        words = np.frombuffer(data, dtype='<u4')
+        words = words[:words.size - words.size % frame_length]
+        words = words.reshape(-1, frame_length)
+        values = fp.kbits_array(words[:, self.offset:self.offset +
+                                      self.width])
+        with self.lock:
+            self.chunks[index].append((first, values))
+
+    def get_data(self, txrx=None, out=None, dtype=np.float64):
+        """Retrieve the recorded values.
+
+        :param txrx: Transceiver with which to read any data not yet read, or
+                     None if all data has been read.
+        :param out: Array of shape (samples, width) into which to write the
+                    values, or the name of a `.npy` file to create and map
+                    into memory for the purpose.
+        :param dtype: Type of the values if `out` is not an array.
+        :returns: The array of values.
+        """
+        if txrx is not None:
+            self.read(txrx, final=True)
+
+        # Sum the output of every subvertex and filter
+        values = np.zeros((self.n_ticks, self.width))
+        for chunks in self.chunks.values():
+            for (first, v) in chunks:
+                v = v[:max(0, self.n_ticks - first)]
+                values[first:first + v.shape[0]] += v
+        values = lowpass(values, self.tau, self.dt)
+
+        # Sample (or average) the values
+        if self.average:
+            samples = values.reshape(
+                self.n_frames, self.sample_ticks, self.width).mean(axis=1)
+        else:
+            samples = values[self.sample_ticks - 1::self.sample_ticks]
+
+        shape = (self.n_frames, self.width)
+        if out is None:
+            out = np.empty(shape, dtype=dtype)
+        elif isinstance(out, basestring):
+            out = np.lib.format.open_memmap(out, mode='w+', dtype=dtype,
+                                            shape=shape)
+        out[:] = samples
+        return out
+
+
+class SparseSpikes(collections.namedtuple(
+        'SparseSpikes', ['neurons', 'ticks', 'n_neurons', 'dt'])):
+    """Spikes as arrays of the index of the neuron which spiked and the tick
+    at which it spiked, ordered by tick and then by neuron.
+    """
+    @property
+    def times(self):
+        """Times (in seconds) of each spike."""
+        return self.ticks * self.dt
+
+    def to_csr(self):
+        """Get the spike ticks grouped by neuron.
+
+        :returns: (indptr, ticks) such that the ticks at which neuron `n`
+                  spiked are `ticks[indptr[n]:indptr[n+1]]`.
+        """
+        order = np.argsort(self.neurons, kind='mergesort')
+        indptr = np.searchsorted(self.neurons[order],
+                                 np.arange(self.n_neurons + 1))
+        return indptr, self.ticks[order]
+
+    def to_lists(self):
+        """Get a list of spike times for each neuron.
+
+        Each list starts with an additional spike at time 0.
+        """
+        (indptr, ticks) = self.to_csr()
+        times = ticks * self.dt
+        return [[0.] + times[indptr[n]:indptr[n + 1]].tolist() for n in
+                range(self.n_neurons)]
 
+
+def get_probed_neurons(probe):
+    """Get the Ensemble whose spikes are probed by a probe and the indices of
+    the probed neurons.
+
+    Spikes may be probed on an Ensemble, its neurons or a slice of its
+    neurons, e.g., ``nengo.Probe(ens.neurons[:100], 'spikes')``.
+
+    :returns: (ensemble, array of neuron indices)
+    """
+    target = probe.target
+    key = slice(None)
+    if isinstance(target, nengo.base.ObjView):
+        (target, key) = (target.obj, target.slice)
+    if isinstance(target, nengo.ensemble.Neurons):
+        target = target.ensemble
+    return target, np.arange(target.n_neurons)[key]
+
+
+def decode_spike_frames(data, n_atoms, n_frames):
+    """Decode recorded spike frames.
+
+    Each frame is a bitfield of whole 32-bit words, in which neuron `n` is
+    represented by bit `n & 0x1f` of word `n >> 5`.
+
+    :param data: String of the recorded frames.
+    :returns: (neurons, frames) as arrays giving the index of the neuron and
+              the frame for each spike, ordered by frame and then by neuron.
+    """
+    frame_length = (n_atoms >> 5) + (1 if n_atoms & 0x1f else 0)
+    n_frames = min(n_frames, len(data) // (4 * frame_length))
+    words = np.frombuffer(data, dtype='<u4', count=n_frames * frame_length)
+    words = words.reshape(n_frames, frame_length)
+
+    # Unpack only the words containing spikes, reversing the order of the bits
+    # in each byte so that bit `b` of each word is in column `b`.
+    (frames, word_index) = np.nonzero(words)
+    bits = np.unpackbits(
+        words[frames, word_index].astype('<u4').view(np.uint8))
+    bits = bits.reshape(-1, 4, 8)[:, :, ::-1].reshape(-1, 32)
+
+    (i, bit) = np.nonzero(bits)
+    neurons = word_index[i] * 32 + bit
+    frames = frames[i]
+
+    valid = neurons < n_atoms
+    return neurons[valid], frames[valid]
+
+
+def decode_spike_events(data):
+    """Decode recorded spike events.
+
+    Each frame in which any neuron spiked is recorded as a header word, with
+    the top bit set and the index of the frame in the remaining bits, followed
+    by the index of each neuron which spiked (see
+    :py:class:`~nengo_spinnaker.utils.vertices.EventBasedRecordingRegion`).
+    Words before the first header, the remains of a frame which was partly
+    overwritten, are ignored.
+
+    :param data: String of the recorded words.
+    :returns: (neurons, frames) as arrays giving the index of the neuron and
+              the frame for each spike, ordered by frame and then by neuron.
+    """
+    header = vertices.EventBasedRecordingRegion.EVENT_HEADER
+    words = np.frombuffer(data, dtype='<u4')
+    is_header = (words & header) != 0
+    headers = words[is_header] & ~np.uint32(header)
+
+    # Each event belongs to the frame of the last preceding header
+    frame_index = np.cumsum(is_header) - 1
+    events = ~is_header & (frame_index >= 0)
+    return (words[events].astype(int),
+            headers[frame_index[events]].astype(int))
+
+
+class SpikeProbe(SpiNNakerProbe):
+    """Retrieves the spikes recorded by an Ensemble.
+
+    Only the neurons recorded by some probe of the Ensemble are recorded,
+    neurons are numbered by their position in the neurons probed by this
+    probe.
+
+    :param spike_format: Format in which to return spikes, either 'list' for a
+                         list of spike times for each neuron or 'sparse' for a
+                         :py:class:`SparseSpikes`.
+    """
+    def __init__(self, target_vertex, probe, spike_format='list'):
+        super(SpikeProbe, self).__init__(
+            probe, sample_ticks=target_vertex.spikes_sample_ticks)
+        self.target_vertex = target_vertex
+
+        if spike_format not in ('list', 'sparse'):
+            raise ValueError("Unknown spike format '%s'." % spike_format)
+        self.spike_format = spike_format
+        self.neurons = list()
+        self.ticks = list()
+
+        # Map the index of each neuron of the vertex to its index in this
+        # probe, or -1 if not probed.  The vertex may simulate several
+        # Ensembles, the neurons of each following those of the last.
+        (ens, neurons) = get_probed_neurons(probe)
+        offset = target_vertex.population_offsets[ens]
+        self.n_neurons = len(neurons)
+        self.neuron_indices = -np.ones(target_vertex.n_neurons, dtype=int)
+        self.neuron_indices[offset + neurons] = np.arange(self.n_neurons)
+
+    def get_readers(self):
+        if self.readers is None:
+            self.readers = self._create_readers(
+                self.target_vertex,
+                self.target_vertex.spikes_recording_region,
+                EventRecordingReader if self.records_events else
+                RecordingReader)
+        return self.readers
+
+    @property
+    def region(self):
+        return self.target_vertex.regions[
+            self.target_vertex.spikes_recording_region - 1]
+
+    @property
+    def records_events(self):
+        """True if spikes are recorded as a list of events."""
+        return isinstance(self.region, vertices.EventBasedRecordingRegion)
+
+    @property
+    def n_frames(self):
+        if not self.records_events:
+            return super(SpikeProbe, self).n_frames
+
+        # Only frames in which some neuron spiked are written, so the number
+        # of frames is that counted by the executable.
+        if not self.readers:
+            return 0
+        return max(r.n_frames_recorded for r in self.readers)
+
+    def receive(self, index, first, data):
+        subvertex = self.subvertices[index]
+        atoms = self.region.recorded_atoms(subvertex.lo_atom,
+                                           subvertex.hi_atom)
+        if self.records_events:
+            # Events are recorded with the index of their frame
+            (n, f) = decode_spike_events(data)
+        else:
+            (n, f) = decode_spike_frames(
+                data, len(atoms),
+                len(data) // (4 * self.readers[index].frame_length))
+            f += first
+
+        # Discard the spikes of neurons recorded for other probes
+        n = self.neuron_indices[atoms[n]]
+        probed = n >= 0
+        with self.lock:
+            self.neurons.append(n[probed])
+            self.ticks.append((f[probed] + 1) * self.sample_ticks - 1)
+
+    def get_data(self, txrx=None):
+        if txrx is not None:
+            self.read(txrx, final=True)
+
+        # Combine the spikes of every subvertex ordered by tick
+        neurons = np.concatenate(self.neurons)
+        ticks = np.concatenate(self.ticks)
+        order = np.lexsort((neurons, ticks))
+        spikes = SparseSpikes(neurons[order], ticks[order], self.n_neurons,
+                              self.dt)
+
+        if self.spike_format == 'sparse':
             return spikes
+        return spikes.to_lists()
+
+
+class ProbeRetriever(object):
+    """Reads the data recorded by many probes concurrently.
+
+    The readers of every probe are grouped by chip, and each chip is read by
+    one of a pool of threads with its own connection to the machine so that
+    many chips are read at once.  Data is decoded by the calling thread as it
+    arrives, overlapping decoding with the transfer of data from other chips.
+
+    :param txrx: Transceiver with which to read, or None if connections
+                 should only be opened (with `connect`) when first read.
+    :param n_connections: Number of connections (and threads) with which to
+                          read.
+    :param connect: Function which creates a new transceiver, required if
+                    more than one connection is used or if no transceiver is
+                    given.
+    """
+    def __init__(self, txrx, n_connections=1, connect=None):
+        self.txrxs = [txrx] if txrx is not None else list()
+        self.n_connections = n_connections if connect is not None else 1
+        self.connect = connect
+
+    def read(self, probes, final=False):
+        """Read the data recorded since the last read by each probe.
+
+        :param final: True if recording has finished.
+        """
+        # Group the readers by chip, reads for the cores of a chip are issued
+        # in sequence by a single thread.
+        chips = collections.defaultdict(list)
+        for probe in probes:
+            for (i, reader) in enumerate(probe.get_readers()):
+                chips[(reader.x, reader.y)].append((probe, i, reader))
+
+        if len(chips) == 0:
+            return
+
+        # Open further connections to the machine as required
+        n_threads = min(self.n_connections, len(chips))
+        while len(self.txrxs) < n_threads:
+            self.txrxs.append(self.connect())
+
+        work = Queue.Queue()
+        for readers in chips.values():
+            work.put(readers)
+        results = Queue.Queue()
+
+        threads = [threading.Thread(target=self._fetch,
+                                    args=(txrx, work, results, final),
+                                    name="ProbeRetriever")
+                   for txrx in self.txrxs[:n_threads]]
+        for t in threads:
+            t.daemon = True
+            t.start()
+
+        # Decode the data as it arrives
+        try:
+            for _ in range(sum(len(r) for r in chips.values())):
+                (probe, index, result) = results.get()
+                if isinstance(result, Exception):
+                    raise result
+                probe.receive(index, *result)
+        finally:
+            # Abandon any outstanding work if a read failed
+            while not work.empty():
+                try:
+                    work.get_nowait()
+                except Queue.Empty:
+                    break
+            for t in threads:
+                t.join()
+
+    def close(self):
+        """Close the connections to the machine, further reads open new
+        connections with `connect`.
+        """
+        for txrx in self.txrxs:
+            txrx.close()
+        self.txrxs = list()
+
+    def _fetch(self, txrx, work, results, final):
+        """Read chips from the work queue until it is empty."""
+        while True:
+            try:
+                readers = work.get_nowait()
+            except Queue.Empty:
+                return
+
+            for (probe, index, reader) in readers:
+                try:
+                    results.put((probe, index, reader.read(txrx, final)))
+                except Exception as e:
+                    results.put((probe, index, e))
+                    return
+
+
+class ProbeData(collections.Mapping):
+    """Mapping of Nengo Probes to their data which retrieves and decodes the
+    data for a probe when it is first accessed.
+
+    Data may also be prefetched for every probe in the background with
+    :py:meth:`prefetch`.  The retriever opens connections to the machine for
+    each retrieval, and they are closed again once the data is retrieved.
+
+    :param probes: The :py:class:`SpiNNakerProbe` objects.
+    :param retriever: :py:class:`ProbeRetriever` with which to read.
+    :param config: Config from which the `dtype` and `npy_file` of decoded
+                   value probes are read.
+    """
+    def __init__(self, probes, retriever, config):
+        self.probes = collections.OrderedDict((p.probe, p) for p in probes)
+        self.retriever = retriever
+        self.config = config
+        self.data = dict()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def __getitem__(self, key):
+        with self.lock:
+            if key not in self.data:
+                try:
+                    self.data[key] = self._retrieve(self.probes[key])
+                finally:
+                    self.retriever.close()
+            return self.data[key]
+
+    def __iter__(self):
+        return iter(self.probes)
+
+    def __len__(self):
+        return len(self.probes)
+
+    def _retrieve(self, p):
+        logger.debug("Retrieving data for %s from the board." % p.probe)
+        self.retriever.read([p], final=True)
+        if isinstance(p, (DecodedValueProbe, EnsembleOutputProbe)):
+            return p.get_data(out=self.config[p.probe].npy_file,
+                              dtype=self.config[p.probe].dtype)
+        return p.get_data()
+
+    @property
+    def retrieved(self):
+        """The probes whose data has been retrieved."""
+        return [k for k in self.probes if k in self.data]
+
+    @property
+    def n_ticks(self):
+        """Number of ticks recorded by the probes, retrieving the data of the
+        first probe if no data has yet been retrieved.
+        """
+        if len(self.probes) == 0:
+            return None
+        if len(self.data) == 0:
+            self[next(iter(self.probes))]
+        return max(self.probes[k].n_ticks for k in self.retrieved)
+
+    def prefetch(self):
+        """Retrieve the data for every probe in a background thread."""
+        self.thread = threading.Thread(target=self._prefetch,
+                                       name="ProbeData")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _prefetch(self):
+        for k in self.probes:
+            self[k]
+
+
+class ProbeStreamer(object):
+    """Periodically reads the data recorded by probes while the simulation is
+    running, so that recording regions need only buffer the data recorded
+    between reads.
+
+    :param probes: The :py:class:`SpiNNakerProbe` objects to read.
+    :param retriever: :py:class:`ProbeRetriever` with which to read.
+    :param period: Time (in seconds) between reads.
+    """
+    def __init__(self, probes, retriever, period=1.):
+        self.probes = probes
+        self.retriever = retriever
+        self.period = period
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.error = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.read_loop,
+                                       name="ProbeStreamer")
+        self.thread.daemon = True
+        self.thread.start()
 
-except ImportError:
-    # No bitarray, so no spike probing!
-    warnings.warn("Cannot import module bitarray: spike probing is disabled",
-                  ImportWarning)
+    def stop(self):
+        """Stop reading, raising any error which ended the reads early as
+        the data of the probes would otherwise be incomplete.
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
 
-    class SpikeProbe(object):
-        def __init__(self, *args, **kwargs):
-            raise NotImplementedError("Spike probing requires the module "
-                                      "'bitarray' to be installed.")
+    def read_loop(self):
+        try:
+            while not self.stop_event.wait(self.period):
+                self.retriever.read(self.probes)
+        except Exception as e:
+            logger.error("Reading probed data failed: %s" % e)
+            self.error = e
@@ -0,0 +1,215 @@
+"""Bulk transfers to and from the memory of a SpiNNaker machine using SCP.
+
+Memory is read and written in blocks of at most :py:data:`BLOCK_SIZE` bytes,
+each of which is a single SCP request to the monitor processor of a chip.
+Rather than waiting for the response to each request before sending the
+next, :py:class:`SCPConnection` keeps a window of requests outstanding so that
+the transfer of a large block of memory is limited by bandwidth rather than
+by the round trip time.  Requests which are not answered within a timeout (or
+which are answered with a transient error) are retransmitted.
+
+SCP requests are carried in SDP packets (see :py:mod:`.sdp`) whose data
+starts with a command header (`cmd_rc`, `seq`, `arg1`, `arg2`, `arg3`).  For
+reads and writes `arg1` is the address, `arg2` the length in bytes and `arg3`
+the type of access.  Responses carry `cmd_rc` and `seq` only, followed by the
+data for reads.
+"""
+
+import select
+import socket
+import struct
+import time
+
+from . import sdp
+
+SCP_PORT = 17893
+BLOCK_SIZE = 256  # Largest number of bytes carried by a single request
+
+# Commands
+CMD_READ = 2
+CMD_WRITE = 3
+
+# Types of memory access
+TYPE_BYTE = 0
+TYPE_HALF = 1
+TYPE_WORD = 2
+
+# Response codes
+RC_OK = 0x80
+RC_TIMEOUT = 0x86
+RC_BUF = 0x8a
+RC_P2P_NOREPLY = 0x8b
+RC_P2P_REJECT = 0x8c
+RC_P2P_BUSY = 0x8d
+RC_P2P_TIMEOUT = 0x8e
+
+# Responses after which the request may succeed if retransmitted
+TRANSIENT_ERRORS = frozenset([RC_TIMEOUT, RC_BUF, RC_P2P_NOREPLY,
+                              RC_P2P_REJECT, RC_P2P_BUSY, RC_P2P_TIMEOUT])
+
+RESPONSE_HEADER = struct.Struct("<2H")
+
+
+class SCPError(IOError):
+    """Raised when a request fails or is not answered after retrying."""
+    pass
+
+
+def pack_request(x, y, p, cmd_rc, seq, args, data=""):
+    """Pack an SCP request into a datagram for transmission."""
+    packet = sdp.SDPPacket(
+        flags=0x87, tag=0xff, dest_port=0, dest_cpu=p, src_port=7,
+        src_cpu=31, dest_x=x, dest_y=y, src_x=0, src_y=0,
+        data=sdp.CMD_HEADER.pack(cmd_rc, seq, *args) + data)
+    return sdp.pack_sdp(packet)
+
+
+def unpack_response(data):
+    """Unpack a received datagram into an SCP response.
+
+    :returns: (cmd_rc, seq, data)
+    """
+    packet = sdp.unpack_sdp(data)
+    (cmd_rc, seq) = RESPONSE_HEADER.unpack_from(packet.data)
+    return cmd_rc, seq, packet.data[RESPONSE_HEADER.size:]
+
+
+def _access_type(address, length):
+    """Get the widest type of access suited to the address and length."""
+    if address % 4 == 0 and length % 4 == 0:
+        return TYPE_WORD
+    elif address % 2 == 0 and length % 2 == 0:
+        return TYPE_HALF
+    return TYPE_BYTE
+
+
+class SCPConnection(object):
+    """Connection to a SpiNNaker machine over which memory is transferred with
+    a sliding window of outstanding SCP requests.
+
+    :param hostname: Hostname of the machine (or a stand-in).
+    :param port: Port on which the machine receives SCP requests.
+    :param window: Largest number of requests outstanding at once.
+    :param timeout: Time (in seconds) after which unanswered requests are
+                    retransmitted.
+    :param n_retries: Number of times a request is retransmitted before the
+                      transfer fails.
+    """
+    def __init__(self, hostname, port=SCP_PORT, window=8, timeout=0.5,
+                 n_retries=5):
+        self.address = (hostname, port)
+        self.window = window
+        self.timeout = timeout
+        self.n_retries = n_retries
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(0)
+        self.seq = 0
+
+        # Counts of requests
+        self.n_sent = 0
+        self.n_retransmitted = 0
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, traceback):
+        self.close()
+
+    def read(self, x, y, address, length, p=0):
+        """Read a block of memory from the given chip.
+
+        :returns: A string of `length` bytes.
+        """
+        blocks = list()
+        for offset in range(0, length, BLOCK_SIZE):
+            n_bytes = min(BLOCK_SIZE, length - offset)
+            blocks.append((CMD_READ, (address + offset, n_bytes,
+                                      _access_type(address + offset,
+                                                   n_bytes)), ""))
+        return "".join(self._transfer(x, y, p, blocks))
+
+    def write(self, x, y, address, data, p=0):
+        """Write a block of memory on the given chip."""
+        blocks = list()
+        for offset in range(0, len(data), BLOCK_SIZE):
+            block = data[offset:offset + BLOCK_SIZE]
+            blocks.append((CMD_WRITE, (address + offset, len(block),
+                                       _access_type(address + offset,
+                                                    len(block))), block))
+        self._transfer(x, y, p, blocks)
+
+    def _next_seq(self):
+        self.seq = (self.seq + 1) & 0xffff
+        return self.seq
+
+    def _transfer(self, x, y, p, requests):
+        """Perform the given requests, keeping up to `window` outstanding.
+
+        :param requests: List of (cmd_rc, args, data).
+        :returns: List of the data of the response to each request.
+        """
+        results = [None] * len(requests)
+        tries = [0] * len(requests)
+        pending = range(len(requests))[::-1]  # Requests yet to be sent
+        outstanding = dict()  # Map seq --> (request index, deadline)
+        n_complete = 0
+
+        while n_complete < len(requests):
+            # Fill the window
+            while pending and len(outstanding) < self.window:
+                i = pending.pop()
+                if tries[i] > self.n_retries:
+                    raise SCPError("No response to SCP request to (%d, %d, "
+                                   "%d) after %d attempts." %
+                                   (x, y, p, tries[i]))
+                (cmd_rc, args, data) = requests[i]
+
+                # A fresh sequence number is used for every transmission so
+                # that late responses to earlier transmissions are ignored.
+                seq = self._next_seq()
+                self.sock.sendto(pack_request(x, y, p, cmd_rc, seq, args,
+                                              data), self.address)
+                outstanding[seq] = (i, time.time() + self.timeout)
+                self.n_sent += 1
+                if tries[i] > 0:
+                    self.n_retransmitted += 1
+                tries[i] += 1
+
+            # Wait for a response until the earliest deadline
+            now = time.time()
+            deadline = min(d for (_, d) in outstanding.values())
+            (ready, _, _) = select.select([self.sock], [], [],
+                                          max(0., deadline - now))
+
+            if ready:
+                try:
+                    (cmd_rc, seq, data) = unpack_response(self.sock.recv(512))
+                except (socket.error, ValueError, struct.error):
+                    continue
+
+                if seq not in outstanding:
+                    continue  # Late response to a retransmitted request
+                (i, _) = outstanding.pop(seq)
+
+                if cmd_rc == RC_OK:
+                    results[i] = data
+                    n_complete += 1
+                elif cmd_rc in TRANSIENT_ERRORS:
+                    pending.append(i)
+                else:
+                    raise SCPError("SCP request to (%d, %d, %d) failed with "
+                                   "response code 0x%02x." %
+                                   (x, y, p, cmd_rc))
+            else:
+                # Retransmit any requests which have timed out
+                now = time.time()
+                for (seq, (i, d)) in outstanding.items():
+                    if d <= now:
+                        del outstanding[seq]
+                        pending.append(i)
+
+        return results
@@ -0,0 +1,76 @@
+"""Packing and unpacking of SDP packets as carried in UDP datagrams.
+
+Each datagram consists of 2 bytes of padding, the 8 byte SDP header and the
+data.  For the packets exchanged with `nengo_rx` and `nengo_tx` the data
+starts with a 16 byte command header (`cmd_rc`, `seq`, `arg1`, `arg2`,
+`arg3`) followed by the values as s16.15 fixed point words.
+
+Values sent by `nengo_tx` carry a sequence number in `seq` and the tick at
+which they were sent in `arg1`.  Values sent to `nengo_rx` with `cmd_rc` of
+:py:data:`CMD_DATA_ACK` are acknowledged with a packet carrying no values
+which echoes `seq` and `arg1` and gives the tick at which the values were
+received in `arg2` and the tick at which they were forwarded in `arg3`.
+"""
+
+import collections
+import struct
+
+from . import fixpoint as fp
+
+
+SDP_HEADER = struct.Struct("<2x8B")
+CMD_HEADER = struct.Struct("<2H3I")
+
+# Command codes, see `nengo-common.h`
+CMD_DATA = 1  # Values
+CMD_ACK = 2  # Acknowledgement of timestamped values
+CMD_DATA_ACK = 3  # Values for which an acknowledgement is requested
+
+SDPPacket = collections.namedtuple(
+    'SDPPacket', ['flags', 'tag', 'dest_port', 'dest_cpu', 'src_port',
+                  'src_cpu', 'dest_x', 'dest_y', 'src_x', 'src_y', 'data'])
+
+
+def pack_sdp(packet):
+    """Pack an :py:class:`SDPPacket` into a string for transmission."""
+    return SDP_HEADER.pack(
+        packet.flags, packet.tag,
+        (packet.dest_port << 5) | packet.dest_cpu,
+        (packet.src_port << 5) | packet.src_cpu,
+        packet.dest_y, packet.dest_x, packet.src_y, packet.src_x
+    ) + packet.data
+
+
+def unpack_sdp(data):
+    """Unpack a received string into an :py:class:`SDPPacket`.
+
+    :raises: :py:exc:`ValueError` if the string is too short to be an SDP
+             packet.
+    """
+    if len(data) < SDP_HEADER.size:
+        raise ValueError("Packet too short (%d bytes)" % len(data))
+
+    (flags, tag, dest_port_cpu, src_port_cpu, dest_y, dest_x, src_y,
+     src_x) = SDP_HEADER.unpack_from(data)
+
+    return SDPPacket(flags, tag, dest_port_cpu >> 5, dest_port_cpu & 0x1f,
+                     src_port_cpu >> 5, src_port_cpu & 0x1f,
+                     dest_x, dest_y, src_x, src_y, data[SDP_HEADER.size:])
+
+
+def pack_values(values, cmd_rc=1, seq=0, args=(0, 0, 0)):
+    """Pack a command header and values into the data of an SDP packet."""
+    words = fp.bitsk(values)
+    return (CMD_HEADER.pack(cmd_rc, seq, *args) +
+            struct.pack("<%dI" % len(words), *words))
+
+
+def unpack_values(data):
+    """Unpack the data of an SDP packet into a command header and values.
+
+    :returns: (cmd_rc, seq, args, values)
+    """
+    (cmd_rc, seq, arg1, arg2, arg3) = CMD_HEADER.unpack_from(data)
+    n_words = (len(data) - CMD_HEADER.size) // 4
+    words = struct.unpack_from("<%dI" % n_words, data, CMD_HEADER.size)
+    return cmd_rc, seq, (arg1, arg2, arg3), fp.kbits(list(words))
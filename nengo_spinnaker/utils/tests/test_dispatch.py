@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from nengo_spinnaker.utils import dispatch, fixpoint as fp, keyspaces
+
+
+@pytest.fixture
+def keyspace():
+    return keyspaces.create_keyspace(
+        'TestKeySpace',
+        [('x', 1), ('o', 15), ('c', 7), ('i', 4), ('d', 5)], 'xoci', 'xoi'
+    )(x=0)
+
+
+def test_lookup(keyspace):
+    table = dispatch.KeyDispatchTable(keyspace.filter_mask, keyspace.mask_d)
+    table.add(keyspace(x=1, o=3).filter_key(), 'b', 2)
+    table.add(keyspace(x=1, o=1).filter_key(), 'a', 3)
+    assert table.size == 5
+    assert table.slices['b'] == slice(0, 2)
+    assert table.slices['a'] == slice(2, 5)
+
+    keys = [keyspace(x=1, o=1).key(d=2),
+            keyspace(x=1, o=3).key(d=0),
+            keyspace(x=1, o=2).key(d=0),  # Unknown target
+            keyspace(x=1, o=3).key(d=2),  # Dimension out of range
+            keyspace(x=1, o=1, c=5).key(d=0)]  # c is not a filter field
+    (slots, indices, valid) = table.lookup(keys)
+
+    assert list(valid) == [True, True, False, False, True]
+    assert list(slots) == [4, 0, 2]
+    assert [table.targets[i][1] for i in indices] == ['a', 'b', 'a']
+
+
+def test_input_frames(keyspace):
+    table = dispatch.KeyDispatchTable(keyspace.filter_mask, keyspace.mask_d)
+    table.add(keyspace(x=1, o=1).filter_key(), 'a', 3)
+    table.add(keyspace(x=1, o=2).filter_key(), 'b', 1)
+    frames = dispatch.InputFrames(table)
+
+    a_keys = [keyspace(x=1, o=1).key(d=d) for d in range(3)]
+    b_key = keyspace(x=1, o=2).key(d=0)
+
+    # No input until a frame is complete
+    assert frames.get('a') is None
+    assert frames.receive(a_keys[:2], fp.bitsk([0.5, 1.0])) == []
+    assert frames.get('a') is None
+
+    assert frames.receive([a_keys[2], b_key], fp.bitsk([-1.0, 2.0])) == \
+        ['a', 'b']
+    a = frames.get('a')
+    assert list(a) == [0.5, 1.0, -1.0]
+    assert list(frames.get('b')) == [2.0]
+
+    # The view is read-only
+    with pytest.raises(ValueError):
+        a[0] = 3.
+
+    # A partial frame does not disturb the previous complete frame
+    frames.receive(a_keys[:1], fp.bitsk([0.25]))
+    assert list(frames.get('a')) == [0.5, 1.0, -1.0]
+    assert list(a) == [0.5, 1.0, -1.0]
+
+    frames.receive(a_keys[1:], fp.bitsk([0.25, 0.25]))
+    assert list(frames.get('a')) == [0.25, 0.25, 0.25]
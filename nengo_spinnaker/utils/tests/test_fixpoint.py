@@ -2,6 +2,7 @@
 """
 
 import nengo
+import numpy as np
 import pytest
 from nengo_spinnaker.utils.fixpoint import *
 
@@ -153,8 +154,22 @@ def test_random():
         assert fixed_value == fixed_value2
 
 
+def test_bitsk_array():
+    values = [0.0, 1.0, -1.0, 0.5, -0.5, 2**16, -(2**16), 1.23456, -1.23456]
+    words = bitsk_array(values)
+    assert words.dtype == np.uint32
+    assert list(words) == bitsk(values)
 
 
+def test_kbits_array():
+    words = [0, 0x8000, 0x100000000 - 0x8000, 0x7FFFFFFF, 0x80000000, 0x1234]
+    values = kbits_array(words)
+    assert list(values) == kbits(words)
+
+    # Round trip
+    values = np.random.uniform(-100, 100, size=100)
+    assert np.all(np.abs(kbits_array(bitsk_array(values)) - values) < 2**-15)
+
 
 if __name__ == '__main__':
     nengo.log(debug=True)
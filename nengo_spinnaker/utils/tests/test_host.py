@@ -0,0 +1,159 @@
+import mock
+import numpy as np
+import pytest
+
+import nengo
+from nengo_spinnaker.config import Config
+from nengo_spinnaker.utils import host, nodes
+
+
+def _node_network():
+    """Create a network of Nodes with unfiltered, filtered, transformed and
+    function connections, a passthrough Node and a constant Node.
+    """
+    model = nengo.Network()
+    with model:
+        a = nengo.Node(lambda t: [np.sin(10*t), np.cos(10*t)])
+        b = nengo.Node(0.25)
+        c = nengo.Node(None, size_in=2)
+        d = nengo.Node(lambda t, x: x**2, size_in=2)
+        e = nengo.Node(lambda t, x: None, size_in=3)
+
+        nengo.Connection(a, c, synapse=None)
+        nengo.Connection(b, c, transform=[[1.], [-1.]], synapse=None)
+        nengo.Connection(c, d, synapse=0.01)
+        nengo.Connection(d, e, transform=[[1., 0.], [0., 1.], [1., 1.]],
+                         synapse=None)
+        nengo.Connection(a, e, function=lambda x: [x[0], x[1], 0.5],
+                         synapse=0.005)
+    return model, (a, b, c, d, e)
+
+
+def test_matches_reference_simulator():
+    model, (a, b, c, d, e) = _node_network()
+    with model:
+        probes = [nengo.Probe(n, synapse=None) for n in (c, d)]
+
+    # Simulate with the reference simulator
+    sim = nengo.Simulator(model, dt=0.001)
+    sim.run_steps(100)
+
+    # And with the host executor, recording the output of each Node
+    ex = host.HostExecutor(model, dt=0.001)
+    outputs = {c: list(), d: list()}
+    for _ in range(100):
+        ex.step()
+        for n in outputs:
+            outputs[n].append(ex.outputs[n].copy())
+
+    assert ex.n_steps == 100
+    assert np.allclose(ex.time, 0.1)
+    for (p, n) in zip(probes, (c, d)):
+        assert np.allclose(sim.data[p], np.array(outputs[n]))
+
+
+def test_node_order():
+    model, (a, b, c, d, e) = _node_network()
+    ex = host.HostExecutor(model)
+    order = [o[0] for o in ex.order]
+
+    # Nodes must follow those which feed them without filtering
+    assert order.index(a) < order.index(c)
+    assert order.index(b) < order.index(c)
+    assert order.index(d) < order.index(e)
+
+
+def test_unfiltered_cycle():
+    model = nengo.Network()
+    with model:
+        a = nengo.Node(None, size_in=1)
+        b = nengo.Node(lambda t, x: x, size_in=1)
+        nengo.Connection(a, b, synapse=None)
+        nengo.Connection(b, a, synapse=None)
+
+    with pytest.raises(ValueError):
+        host.HostExecutor(model)
+
+    # A filter breaks the cycle
+    model.connections[1].synapse = 0.01
+    host.HostExecutor(model).step()
+
+
+def test_host_network_io():
+    """Nodes connected to the board should exchange values with the IO."""
+    model = nengo.Network()
+    with model:
+        a = nengo.Node(lambda t: [t, -t])
+        b = nengo.Node(lambda t, x: None, size_in=2)
+        e = nengo.Ensemble(10, 2)
+        c1 = nengo.Connection(a, e)
+        c2 = nengo.Connection(e, b)
+
+    io = mock.Mock()
+    io.get_node_input.return_value = np.array([0.5, 0.25])
+
+    ex = host.HostExecutor(nodes.create_host_network([c1, c2], io), dt=0.001)
+    ex.step()
+
+    # The output of `a` should be sent to the board and `b` given input from
+    # the board.
+    (node, output) = io.set_node_output.call_args[0]
+    assert node is a
+    assert np.allclose(output, [0.001, -0.001])
+    assert np.allclose(ex.inputs[b], [0.5, 0.25])
+
+
+def test_node_period():
+    """Nodes with a period should be evaluated at that rate, with output held
+    and only transmitted when refreshed.
+    """
+    model = nengo.Network()
+    with model:
+        a = nengo.Node(mock.Mock(side_effect=lambda t: [t]), size_out=1)
+        b = nengo.Node(mock.Mock(return_value=None), size_in=1)
+        e = nengo.Ensemble(10, 1)
+        conns = [nengo.Connection(a, b, synapse=None),
+                 nengo.Connection(a, e)]
+
+    config = Config()
+    config[a].period = 0.005
+
+    io = mock.Mock()
+    ex = host.HostExecutor(nodes.create_host_network(conns, io, config),
+                           dt=0.001, config=config)
+    a.output.reset_mock()
+    b.output.reset_mock()
+    ex.run_steps(10)
+
+    # `a` is evaluated every 5 steps, `b` every step with the held output
+    assert [c[0][0] for c in a.output.call_args_list] == [0.001, 0.006]
+    assert b.output.call_count == 10
+    assert np.allclose(b.output.call_args[0][1], [0.006])
+
+    # Output is only transmitted when refreshed
+    assert io.set_node_output.call_count == 2
+
+
+def test_node_levels():
+    model, (a, b, c, d, e) = _node_network()
+    ex = host.HostExecutor(model)
+    levels = [set(o[0] for o in level) for level in ex.levels]
+
+    # `c` depends on `a` and `b` without filtering, as does `e` on `d`
+    assert levels == [set([a, b, d]), set([c, e])]
+
+
+def test_threads_deterministic():
+    model, (a, b, c, d, e) = _node_network()
+
+    outputs = list()
+    for threads in (None, 4):
+        ex = host.HostExecutor(model, dt=0.001, threads=threads)
+        ex.run_steps(50)
+        outputs.append(ex.outputs[d].copy())
+        ex.close()
+
+        # Every Node should have been timed at every step
+        assert all(t.count == 50 for t in ex.node_times.values())
+
+    assert np.all(outputs[0] == outputs[1])
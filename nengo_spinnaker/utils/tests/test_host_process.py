@@ -0,0 +1,100 @@
+import numpy as np
+import time
+
+import nengo
+from nengo_spinnaker.config import Config
+from nengo_spinnaker.utils import host, host_process, nodes
+
+
+def test_shared_ring():
+    ring = host_process.SharedRing(3, n_slots=4)
+    assert ring.get() is None
+
+    ring.put([1., 2., 3.])
+    assert np.all(ring.get() == [1., 2., 3.])
+    assert ring.get() is None  # Already read
+
+    # Only the most recent value is returned, even once the ring has wrapped
+    for i in range(10):
+        ring.put([i] * 3)
+    assert np.all(ring.get() == [9.] * 3)
+    assert ring.count == 11
+
+
+class DictIO(object):
+    def __init__(self):
+        self.inputs = dict()
+        self.outputs = dict()
+
+    def get_node_input(self, node):
+        return self.inputs.get(node)
+
+    def set_node_output(self, node, output):
+        self.outputs[node] = np.array(output)
+
+
+def _network(config):
+    model = nengo.Network()
+    with model:
+        # `a` and `b` are connected, so both will be simulated in the worker
+        # if `a` is.  `c` is independent.
+        a = nengo.Node(lambda t, x: 2*x, size_in=1)
+        b = nengo.Node(lambda t, x: x, size_in=1)
+        c = nengo.Node(lambda t: [0.5])
+        e = nengo.Ensemble(10, 1)
+
+        conns = [nengo.Connection(e, a),
+                 nengo.Connection(a, b, synapse=None),
+                 nengo.Connection(b, e),
+                 nengo.Connection(c, e)]
+    config[a].separate_process = True
+
+    io = DictIO()
+    network = nodes.create_host_network(conns, io, config)
+    return (a, b, c), io, network
+
+
+def test_split_host_network():
+    config = Config()
+    (a, b, c), io, network = _network(config)
+    (main, worker) = host_process.split_host_network(network, config)
+
+    # Every Node is simulated somewhere
+    assert len(main.nodes) + len(worker.nodes) == len(network.nodes)
+    assert a in worker.nodes and b in worker.nodes
+    assert c in main.nodes
+    assert all(c.pre_obj in worker.nodes and c.post_obj in worker.nodes
+               for c in worker.connections)
+    assert all(c.pre_obj in main.nodes and c.post_obj in main.nodes
+               for c in main.connections)
+
+    # Without configuration everything is simulated in the main process
+    (main, worker) = host_process.split_host_network(network)
+    assert len(worker.nodes) == 0
+
+
+def test_host_process():
+    config = Config()
+    (a, b, c), io, network = _network(config)
+    (main, worker) = host_process.split_host_network(network, config)
+
+    # Simulate the main network in process and the rest in a worker
+    proc = host_process.HostProcess(worker, io, dt=0.001)
+    executor = host.HostExecutor(main, dt=0.001)
+    executor.workers.append(proc)
+
+    io.inputs[a] = np.array([0.25])
+    proc.start()
+    try:
+        start = time.time()
+        while b not in io.outputs and time.time() - start < 5.:
+            executor.step()
+            time.sleep(0.001)
+    finally:
+        proc.stop()
+
+    # The output of `c` is computed in process, that of `b` by the worker
+    assert np.all(io.outputs[c] == [0.5])
+    assert np.allclose(io.outputs[b], [0.5])
+    assert proc.n_steps > 0
+    assert proc.step_times['count'] == proc.n_steps
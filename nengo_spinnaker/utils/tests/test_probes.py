@@ -3,6 +3,7 @@
 import mock
 import numpy as np
 import pytest
+import time
 import warnings
 
 import nengo
@@ -100,3 +101,699 @@ def test_passnode_modify():
     for obj in new_objs:
         if isinstance(obj, nengo.Probe) and obj.target == pn:
             assert(obj.conn_args.get('synapse', None) is None)
+
+
+def _spike_frames(spikes, n_atoms):
+    """Create recorded frames as the ensemble executable would, in which
+    neuron `n` sets bit `n & 0x1f` of word `n >> 5`.
+    """
+    frame_length = (n_atoms >> 5) + (1 if n_atoms & 0x1f else 0)
+    words = np.zeros((spikes.shape[0], frame_length), dtype=np.uint32)
+    for (f, n) in zip(*np.nonzero(spikes)):
+        words[f, n >> 5] |= 1 << (n & 0x1f)
+    return words.astype('<u4').tostring()
+
+
+def _spike_events(spikes):
+    """Create recorded events as the ensemble executable would, a header
+    for each frame with spikes followed by the index of each neuron.
+    """
+    words = list()
+    for (f, frame) in enumerate(spikes):
+        if np.any(frame):
+            words.append(0x80000000 | f)
+            words.extend(np.nonzero(frame)[0])
+    return np.array(words, dtype='<u4')
+
+
+def test_decode_spike_frames():
+    rng = np.random.RandomState(3)
+    spikes = rng.uniform(size=(20, 70)) < 0.1
+
+    (neurons, frames) = utils.probes.decode_spike_frames(
+        _spike_frames(spikes, 70), 70, 20)
+
+    # Spikes are ordered by frame and then by neuron
+    (expected_frames, expected_neurons) = np.nonzero(spikes)
+    assert np.all(neurons == expected_neurons)
+    assert np.all(frames == expected_frames)
+
+
+def test_decode_spike_events():
+    rng = np.random.RandomState(3)
+    spikes = rng.uniform(size=(20, 70)) < 0.02
+    words = _spike_events(spikes)
+
+    (neurons, frames) = utils.probes.decode_spike_events(words.tostring())
+    (expected_frames, expected_neurons) = np.nonzero(spikes)
+    assert np.all(neurons == expected_neurons)
+    assert np.all(frames == expected_frames)
+
+    # Events before the first header are ignored
+    (neurons, frames) = utils.probes.decode_spike_events(
+        words[np.nonzero(words & 0x80000000)[0][1] - 1:].tostring())
+    assert np.all(frames > expected_frames[0])
+    assert np.all(neurons == expected_neurons[-len(neurons):])
+
+
+def test_sparse_spikes():
+    spikes = utils.probes.SparseSpikes(
+        np.array([2, 0, 2]), np.array([1, 3, 4]), n_neurons=3, dt=0.001)
+    assert np.allclose(spikes.times, [0.001, 0.003, 0.004])
+
+    (indptr, ticks) = spikes.to_csr()
+    assert list(indptr) == [0, 1, 1, 3]
+    assert list(ticks) == [3, 1, 4]
+
+    assert spikes.to_lists() == [[0., 0.003], [0.], [0., 0.001, 0.004]]
+
+
+def _recording_region(frames, n_frames=None, offset=0):
+    """Create the contents of a recording region in which the given frames
+    have been written into a circular buffer of `n_frames` frames, after
+    `offset` words of other data.
+    """
+    frames = np.asarray(frames, dtype='<u4')
+    n_frames = frames.shape[0] if n_frames is None else n_frames
+    buf = np.zeros((n_frames, ) + frames.shape[1:], dtype='<u4')
+    for (i, f) in enumerate(frames):
+        buf[i % n_frames] = f
+    return (np.zeros(offset, dtype='<u4').tostring() +
+            np.array([frames.shape[0], n_frames], dtype='<u4').tostring() +
+            buf.tostring())
+
+
+def _retrieve_from(memory):
+    """Create a replacement for `retrieve_region_data` which reads from a
+    dictionary mapping (x, y, p, region_id) to region contents.
+    """
+    def retrieve_region_data(txrx, x, y, p, region_id, size, offset=0,
+                             address_cache=None):
+        data = memory[(x, y, p, region_id)]
+        return data[offset*4:(offset + size)*4]
+    return retrieve_region_data
+
+
+def test_recording_reader():
+    """Frames should be read as they are written, wrapping around the buffer
+    and skipping those which have been overwritten.
+    """
+    frames = np.arange(40, dtype=np.uint32).reshape(20, 2)
+    memory = dict()
+    reader = utils.probes.RecordingReader(0, 0, 1, 15, 2, 8)
+
+    with mock.patch.object(utils.vertices, 'retrieve_region_data',
+                           _retrieve_from(memory)):
+        memory[(0, 0, 1, 15)] = _recording_region(frames[:5], 8)
+        (first, data) = reader.read(mock.Mock())
+        assert first == 0
+        assert np.all(np.frombuffer(data, dtype='<u4') == frames[:5].flat)
+
+        # Wraps around the end of the buffer
+        memory[(0, 0, 1, 15)] = _recording_region(frames[:11], 8)
+        (first, data) = reader.read(mock.Mock())
+        assert first == 5
+        assert np.all(np.frombuffer(data, dtype='<u4') == frames[5:11].flat)
+
+        # Frames overwritten before being read are lost
+        memory[(0, 0, 1, 15)] = _recording_region(frames, 8)
+        (first, data) = reader.read(mock.Mock())
+        assert first == 13
+        assert np.all(np.frombuffer(data, dtype='<u4') == frames[13:].flat)
+        assert reader.n_read == 20
+        assert reader.n_lost == 2
+
+
+def test_recording_reader_wrapped():
+    """The oldest frame of a full buffer may be being overwritten and should
+    not be read.
+    """
+    frames = np.arange(40, dtype=np.uint32).reshape(20, 2)
+    memory = dict()
+
+    with mock.patch.object(utils.vertices, 'retrieve_region_data',
+                           _retrieve_from(memory)):
+        # The slot of frame 3 is being overwritten by frame 11
+        region = _recording_region(frames[:11], 8)
+        torn = np.frombuffer(region, dtype='<u4').copy()
+        torn[2 + 3*2] = 0xdeadbeef
+        memory[(0, 0, 1, 15)] = torn.tostring()
+
+        reader = utils.probes.RecordingReader(0, 0, 1, 15, 2, 8)
+        (first, data) = reader.read(mock.Mock())
+        assert first == 4
+        assert np.all(np.frombuffer(data, dtype='<u4') == frames[4:11].flat)
+        assert reader.n_lost == 4
+
+        # Once recording has finished the oldest frame may also be read
+        memory[(0, 0, 1, 15)] = region
+        reader = utils.probes.RecordingReader(0, 0, 1, 15, 2, 8)
+        (first, data) = reader.read(mock.Mock(), final=True)
+        assert first == 3
+        assert np.all(np.frombuffer(data, dtype='<u4') == frames[3:11].flat)
+
+        # Frames overwritten while being read are discarded
+        memory[(0, 0, 1, 15)] = _recording_region(frames[:14], 8)
+        reader = utils.probes.RecordingReader(0, 0, 1, 15, 2, 8)
+        with mock.patch.object(reader, '_read_count', side_effect=[13, 14]):
+            (first, data) = reader.read(mock.Mock())
+        assert first == 7
+        assert np.all(np.frombuffer(data, dtype='<u4') == frames[7:13].flat)
+        assert reader.n_read == 13
+
+
+def test_recording_reader_in_progress():
+    """Frames written over several slots before the count is updated may
+    overwrite that many of the oldest slots, none of which should be read.
+    """
+    frames = np.arange(20, dtype=np.uint32).reshape(20, 1)
+    memory = dict()
+
+    with mock.patch.object(utils.vertices, 'retrieve_region_data',
+                           _retrieve_from(memory)):
+        # The slots of words 3 to 5 are being overwritten by the next frame
+        region = _recording_region(frames[:11], 8)
+        torn = np.frombuffer(region, dtype='<u4').copy()
+        torn[2 + 3:2 + 6] = 0xdeadbeef
+        memory[(0, 0, 1, 15)] = torn.tostring()
+
+        reader = utils.probes.RecordingReader(0, 0, 1, 15, 1, 8,
+                                              in_progress=3)
+        (first, data) = reader.read(mock.Mock())
+        assert first == 6
+        assert np.all(np.frombuffer(data, dtype='<u4') == frames[6:11].flat)
+
+        # Once recording has finished every slot may be read
+        memory[(0, 0, 1, 15)] = region
+        reader = utils.probes.RecordingReader(0, 0, 1, 15, 1, 8,
+                                              in_progress=3)
+        (first, data) = reader.read(mock.Mock(), final=True)
+        assert first == 3
+        assert np.all(np.frombuffer(data, dtype='<u4') == frames[3:11].flat)
+
+
+def test_recording_region_max_frame_length():
+    """An event frame is a header and an event for every recorded atom."""
+    region = utils.vertices.BitfieldBasedRecordingRegion(10)
+    assert region.max_frame_length(0, 39) == 1
+
+    region = utils.vertices.EventBasedRecordingRegion(10, np.ones(60))
+    assert region.max_frame_length(0, 39) == 41
+    assert region.max_frame_length(40, 59) == 21
+
+
+@pytest.mark.parametrize("sample_ticks", [1, 3])
+def test_spike_probe_get_data(sample_ticks):
+    """Spikes should be combined from each subvertex, each frame is at the
+    end of a sampling period.
+    """
+    rng = np.random.RandomState(5)
+    spikes = [rng.uniform(size=(10, 40)) < 0.2,
+              rng.uniform(size=(10, 20)) < 0.2]
+
+    vertex = mock.Mock()
+    vertex.spikes_recording_region = 15
+    vertex.spikes_sample_ticks = sample_ticks
+    vertex.regions = [utils.vertices.BitfieldBasedRecordingRegion(10)] * 16
+    vertex.subvertices = [mock.Mock(lo_atom=0, hi_atom=39, n_atoms=40),
+                          mock.Mock(lo_atom=40, hi_atom=59, n_atoms=20)]
+    memory = dict()
+    for (i, (sv, s)) in enumerate(zip(vertex.subvertices, spikes)):
+        sv.placement.processor.get_coordinates.return_value = (0, 0, i + 1)
+        memory[(0, 0, i + 1, 15)] = _recording_region(
+            np.frombuffer(_spike_frames(s, s.shape[1]),
+                          dtype='<u4').reshape(10, -1), offset=sv.n_atoms + 1)
+    probe = mock.Mock()
+    probe.target.n_neurons = 60
+    vertex.n_neurons = 60
+    vertex.population_offsets = {probe.target: 0}
+
+    with mock.patch.object(utils.vertices, 'retrieve_region_data',
+                           _retrieve_from(memory)):
+        sparse = utils.probes.SpikeProbe(vertex, probe, 'sparse').get_data(
+            mock.Mock())
+        lists = utils.probes.SpikeProbe(vertex, probe).get_data(mock.Mock())
+
+    expected = np.hstack(spikes)
+    (frames, neurons) = np.nonzero(expected)
+    assert np.all(sparse.neurons == neurons)
+    assert np.all(sparse.ticks == (frames + 1) * sample_ticks - 1)
+
+    assert len(lists) == 60
+    for n in range(60):
+        frames = np.nonzero(expected[:, n])[0]
+        assert np.allclose(lists[n][1:],
+                           ((frames + 1) * sample_ticks - 1) * 0.001)
+
+    with pytest.raises(ValueError):
+        utils.probes.SpikeProbe(vertex, probe, 'bitarray')
+
+
+def test_spike_probe_events():
+    """Spikes recorded as events should be retrieved as if recorded as a
+    bitfield.
+    """
+    rng = np.random.RandomState(5)
+    spikes = [rng.uniform(size=(10, 40)) < 0.05,
+              rng.uniform(size=(10, 20)) < 0.05]
+    for s in spikes:
+        s[8:] = False  # The last frames are silent
+
+    vertex = mock.Mock()
+    vertex.spikes_recording_region = 15
+    vertex.spikes_sample_ticks = 2
+    vertex.regions = [utils.vertices.EventBasedRecordingRegion(
+        10, np.ones(60) * 0.05)] * 16
+    vertex.subvertices = [mock.Mock(lo_atom=0, hi_atom=39),
+                          mock.Mock(lo_atom=40, hi_atom=59)]
+    memory = dict()
+    for (i, (sv, s)) in enumerate(zip(vertex.subvertices, spikes)):
+        sv.placement.processor.get_coordinates.return_value = (0, 0, i + 1)
+        n_words = vertex.regions[0].buffer_length(sv.lo_atom, sv.hi_atom)
+        region = np.frombuffer(_recording_region(
+            _spike_events(s).reshape(-1, 1), n_words, s.shape[1] + 2),
+            dtype='<u4').copy()
+        region[s.shape[1] + 1] = 10  # Count of frames recorded
+        memory[(0, 0, i + 1, 15)] = region.tostring()
+    probe = mock.Mock()
+    probe.target.n_neurons = 60
+    vertex.n_neurons = 60
+    vertex.population_offsets = {probe.target: 0}
+
+    with mock.patch.object(utils.vertices, 'retrieve_region_data',
+                           _retrieve_from(memory)):
+        spike_probe = utils.probes.SpikeProbe(vertex, probe, 'sparse')
+        sparse = spike_probe.get_data(mock.Mock())
+    assert spike_probe.records_events
+    assert [r.in_progress for r in spike_probe.readers] == [41, 21]
+
+    (frames, neurons) = np.nonzero(np.hstack(spikes))
+    assert np.all(sparse.neurons == neurons)
+    assert np.all(sparse.ticks == (frames + 1) * 2 - 1)
+
+    # Silent frames are counted
+    assert frames.max() < 8
+    assert spike_probe.n_frames == 10
+    assert spike_probe.n_ticks == 20
+
+
+def test_spike_probe_neuron_subset():
+    """Only the neurons probed by some probe are recorded, the spikes of each
+    probe should be those of its own neurons.
+    """
+    with nengo.Network():
+        ens = nengo.Ensemble(80, 1)
+    probes = [mock.Mock(target=ens.neurons[10:50:2]),
+              mock.Mock(target=ens.neurons[45:48])]
+    atoms = np.union1d(np.arange(80)[10:50:2], np.arange(80)[45:48])
+
+    rng = np.random.RandomState(9)
+    spikes = rng.uniform(size=(10, 80)) < 0.2
+
+    vertex = mock.Mock()
+    vertex.n_neurons = 80
+    vertex.population_offsets = {ens: 0}
+    vertex.spikes_recording_region = 15
+    vertex.spikes_sample_ticks = 1
+    vertex.regions = [utils.vertices.BitfieldBasedRecordingRegion(
+        10, atoms)] * 16
+    vertex.subvertices = [mock.Mock(lo_atom=0, hi_atom=39),
+                          mock.Mock(lo_atom=40, hi_atom=59),
+                          mock.Mock(lo_atom=60, hi_atom=79)]
+
+    # Each subvertex records a compact bitfield of its recorded neurons
+    memory = dict()
+    for (i, sv) in enumerate(vertex.subvertices):
+        sv.placement.processor.get_coordinates.return_value = (0, 0, i + 1)
+        recorded = atoms[(atoms >= sv.lo_atom) & (atoms <= sv.hi_atom)]
+        if len(recorded) > 0:
+            memory[(0, 0, i + 1, 15)] = _recording_region(np.frombuffer(
+                _spike_frames(spikes[:, recorded], len(recorded)),
+                dtype='<u4').reshape(10, -1),
+                offset=sv.hi_atom - sv.lo_atom + 2)
+
+    with mock.patch.object(utils.vertices, 'retrieve_region_data',
+                           _retrieve_from(memory)):
+        for p in probes:
+            spike_probe = utils.probes.SpikeProbe(vertex, p, 'sparse')
+            data = spike_probe.get_data(mock.Mock())
+
+            # The last subvertex records nothing and is not read
+            assert len(spike_probe.readers) == 2
+
+            (ticks, neurons) = np.nonzero(spikes[:, p.target.slice])
+            assert data.n_neurons == len(np.arange(80)[p.target.slice])
+            assert np.all(data.neurons == neurons)
+            assert np.all(data.ticks == ticks)
+
+
+def test_spike_probe_packed():
+    """The spikes of an Ensemble packed with others should be those of its
+    own neurons.
+    """
+    with nengo.Network():
+        a = nengo.Ensemble(30, 1)
+        b = nengo.Ensemble(20, 1)
+
+    rng = np.random.RandomState(3)
+    spikes = rng.uniform(size=(10, 50)) < 0.2
+
+    vertex = mock.Mock()
+    vertex.n_neurons = 50
+    vertex.population_offsets = {a: 0, b: 30}
+    vertex.spikes_recording_region = 15
+    vertex.spikes_sample_ticks = 1
+    vertex.regions = [utils.vertices.BitfieldBasedRecordingRegion(10)] * 16
+    vertex.subvertices = [mock.Mock(lo_atom=0, hi_atom=49)]
+    vertex.subvertices[0].placement.processor.get_coordinates.return_value =\
+        (0, 0, 1)
+    memory = {(0, 0, 1, 15): _recording_region(
+        np.frombuffer(_spike_frames(spikes, 50), dtype='<u4').reshape(10, -1),
+        offset=51)}
+
+    with mock.patch.object(utils.vertices, 'retrieve_region_data',
+                           _retrieve_from(memory)):
+        for (ens, neurons) in ((a, slice(0, 30)), (b, slice(30, 50))):
+            data = utils.probes.SpikeProbe(
+                vertex, mock.Mock(target=ens), 'sparse').get_data(mock.Mock())
+
+            (ticks, n) = np.nonzero(spikes[:, neurons])
+            assert data.n_neurons == ens.n_neurons
+            assert np.all(data.neurons == n)
+            assert np.all(data.ticks == ticks)
+
+
+def _value_probe(n_frames):
+    """Create a DecodedValueProbe of the second channel of a value sink, the
+    first channel records 2 dimensions into a buffer of 10 frames.
+    """
+    probes = [mock.Mock(), mock.Mock()]
+    vertex = mock.Mock()
+    vertex.probes = probes
+    vertex.widths = [2, 3]
+    vertex.sample_ticks = [1, 1]
+    vertex.recording_region_index = 2
+    vertex.regions = [None, utils.vertices.StripedRecordingRegion(
+        [utils.vertices.FrameBasedRecordingRegion(2, 10),
+         utils.vertices.FrameBasedRecordingRegion(3, n_frames)])]
+    vertex.subvertices = [mock.Mock(lo_atom=0, hi_atom=0)]
+    vertex.subvertices[0].placement.processor.get_coordinates.return_value =\
+        (0, 0, 1)
+    return utils.probes.DecodedValueProbe(vertex, probes[1])
+
+
+def test_decoded_value_probe_get_data(tmpdir):
+    values = np.random.uniform(-10, 10, size=(50, 3))
+    memory = {(0, 0, 1, 2): _recording_region(utils.fp.bitsk_array(values),
+                                              offset=22)}
+    probe = _value_probe(50)
+
+    with mock.patch.object(utils.vertices, 'retrieve_region_data',
+                           _retrieve_from(memory)):
+        # As float64
+        data = probe.get_data(mock.Mock())
+        assert data.dtype == np.float64
+        assert np.all(np.abs(data - values) <= 2**-15)
+
+        # As float32, into a provided array
+        out = np.zeros((50, 3), dtype=np.float32)
+        assert probe.get_data(mock.Mock(), out=out) is out
+        assert np.allclose(out, data)
+
+        # Into a memory-mapped file
+        filename = str(tmpdir.join("p.npy"))
+        probe.get_data(mock.Mock(), out=filename, dtype=np.float32)
+        assert np.allclose(np.load(filename), data)
+
+        # Named by a unicode path
+        filename = unicode(tmpdir.join("q.npy"))
+        probe.get_data(mock.Mock(), out=filename, dtype=np.float32)
+        assert np.allclose(np.load(filename), data)
+
+
+def test_get_sample_ticks():
+    assert utils.probes.get_sample_ticks(None, 0.001) == 1
+    assert utils.probes.get_sample_ticks(0.01, 0.001) == 10
+    assert utils.probes.get_sample_ticks(0.0001, 0.001) == 1
+
+
+def test_decoded_value_probe_streamed():
+    """Values read during the run from a buffer shorter than the run should
+    be combined.
+    """
+    values = np.random.uniform(-10, 10, size=(50, 3))
+    words = utils.fp.bitsk_array(values)
+    memory = dict()
+    probe = _value_probe(20)
+
+    with mock.patch.object(utils.vertices, 'retrieve_region_data',
+                           _retrieve_from(memory)):
+        for n in (15, 30, 45, 50):
+            memory[(0, 0, 1, 2)] = _recording_region(words[:n], 20,
+                                                     offset=22)
+            probe.read(mock.Mock())
+
+        data = probe.get_data(mock.Mock())
+
+    assert probe.n_frames == 50
+    assert np.all(np.abs(data - values) <= 2**-15)
+
+
+def test_lowpass():
+    """Filtering should match that of a first-order lowpass filter applied a
+    tick at a time, across the boundaries of blocks.
+    """
+    values = np.random.uniform(-1, 1, size=(70, 2))
+    a = np.exp(-0.001 / 0.01)
+    expected = np.zeros_like(values)
+    y = np.zeros(2)
+    for (i, x) in enumerate(values):
+        y = expected[i] = a*y + (1 - a)*x
+
+    filtered = utils.probes.lowpass(values, 0.01, 0.001, block=16)
+    assert np.allclose(filtered, expected)
+    assert utils.probes.lowpass(values, None, 0.001) is values
+
+
+def _output_probe(values, synapse=None, sample_every=None, average=False):
+    """Create an EnsembleOutputProbe of the second of two recorded
+    connections of a vertex with a subvertex for each set of values.
+    """
+    conns = [mock.Mock(), mock.Mock()]
+    conns[0].post_obj.size_in = 1
+    conns[1].post_obj.size_in = values[0].shape[1]
+    conns[1].post_obj.probe.sample_every = sample_every
+    conns[1].synapse = synapse
+
+    vertex = mock.Mock()
+    vertex.output_recording_region = 2
+    vertex.recorded_connections = conns
+    vertex.regions = [None, utils.vertices.FrameBasedRecordingRegion(
+        1 + values[0].shape[1], values[0].shape[0])]
+    vertex.subvertices = list()
+    memory = dict()
+    for (p, v) in enumerate(values):
+        sv = mock.Mock(lo_atom=p, hi_atom=p)
+        sv.placement.processor.get_coordinates.return_value = (0, 0, p)
+        vertex.subvertices.append(sv)
+
+        # Each frame is preceded by the dimension of the other connection
+        frames = np.hstack((np.ones((v.shape[0], 1)), v))
+        memory[(0, 0, p, 2)] = _recording_region(
+            utils.fp.bitsk_array(frames))
+
+    probe = utils.probes.EnsembleOutputProbe(vertex, conns[1], 0.001,
+                                             average)
+    return probe, memory
+
+
+def test_ensemble_output_probe_sums_subvertices():
+    values = [np.random.uniform(-1, 1, size=(30, 2)) for _ in range(3)]
+    (probe, memory) = _output_probe(values)
+
+    with mock.patch.object(utils.vertices, 'retrieve_region_data',
+                           _retrieve_from(memory)):
+        data = probe.get_data(mock.Mock())
+
+    assert probe.n_ticks == 30
+    assert np.all(np.abs(data - sum(values)) <= 3 * 2**-15)
+
+
+@pytest.mark.parametrize("average", [False, True])
+def test_ensemble_output_probe_filtered_sampled(average):
+    values = [np.random.uniform(-1, 1, size=(32, 2)) for _ in range(2)]
+    (probe, memory) = _output_probe(values, nengo.synapses.Lowpass(0.005),
+                                    0.005, average)
+
+    with mock.patch.object(utils.vertices, 'retrieve_region_data',
+                           _retrieve_from(memory)):
+        data = probe.get_data(mock.Mock())
+
+    # Frames are sampled at the end of each complete period
+    filtered = utils.probes.lowpass(sum(values)[:30], 0.005, 0.001)
+    if average:
+        expected = filtered.reshape(6, 5, 2).mean(axis=1)
+    else:
+        expected = filtered[4::5]
+    assert probe.n_frames == 6
+    assert probe.n_ticks == 30
+    assert np.allclose(data, expected, atol=2**-13)
+
+
+def test_probe_retriever():
+    """Probes on many chips should be read with several connections and
+    their data combined as if read sequentially.
+    """
+    rng = np.random.RandomState(7)
+    spikes = [rng.uniform(size=(10, 20)) < 0.2 for _ in range(6)]
+
+    vertex = mock.Mock()
+    vertex.spikes_recording_region = 15
+    vertex.spikes_sample_ticks = 1
+    vertex.regions = [utils.vertices.BitfieldBasedRecordingRegion(10)] * 16
+    vertex.subvertices = [mock.Mock(lo_atom=20*i, hi_atom=20*i + 19,
+                                    n_atoms=20) for i in range(6)]
+    memory = dict()
+    for (i, (sv, s)) in enumerate(zip(vertex.subvertices, spikes)):
+        xyp = (i // 2, 0, i % 2 + 1)
+        sv.placement.processor.get_coordinates.return_value = xyp
+        memory[xyp + (15, )] = _recording_region(
+            np.frombuffer(_spike_frames(s, 20), dtype='<u4').reshape(10, -1),
+            offset=21)
+    probe = mock.Mock()
+    probe.target.n_neurons = 120
+    vertex.n_neurons = 120
+    vertex.population_offsets = {probe.target: 0}
+    probe = utils.probes.SpikeProbe(vertex, probe, 'sparse')
+
+    # Record the transceivers used to read each chip
+    chip_txrxs = dict()
+    retrieve = _retrieve_from(memory)
+
+    def retrieve_region_data(txrx, x, y, p, *args, **kwargs):
+        chip_txrxs.setdefault((x, y), set()).add(txrx)
+        return retrieve(txrx, x, y, p, *args, **kwargs)
+
+    connect = mock.Mock(side_effect=lambda: mock.Mock())
+    retriever = utils.probes.ProbeRetriever(mock.Mock(), 3, connect)
+    with mock.patch.object(utils.vertices, 'retrieve_region_data',
+                           retrieve_region_data):
+        retriever.read([probe], final=True)
+
+    # Two further connections were opened, each chip was read by one
+    assert connect.call_count == 2
+    assert len(retriever.txrxs) == 3
+    assert all(len(t) == 1 for t in chip_txrxs.values())
+
+    sparse = probe.get_data()
+    (ticks, neurons) = np.nonzero(np.hstack(spikes))
+    assert np.all(sparse.neurons == neurons)
+    assert np.all(sparse.ticks == ticks)
+
+
+def test_probe_retriever_error():
+    """Errors while reading should be raised by the calling thread."""
+    probe = mock.Mock()
+    probe.get_readers.return_value = [mock.Mock(x=0, y=0)]
+    probe.get_readers.return_value[0].read.side_effect = IOError
+
+    retriever = utils.probes.ProbeRetriever(mock.Mock())
+    with pytest.raises(IOError):
+        retriever.read([probe])
+
+
+def test_probe_retriever_connects_on_read():
+    """Connections should only be opened when reading, and reopened by reads
+    after being closed.
+    """
+    probe = mock.Mock()
+    probe.get_readers.return_value = [mock.Mock(x=0, y=0)]
+    probe.get_readers.return_value[0].read.return_value = (0, "")
+
+    connect = mock.Mock(side_effect=lambda: mock.Mock())
+    retriever = utils.probes.ProbeRetriever(None, 1, connect)
+    assert connect.call_count == 0
+
+    retriever.read([probe])
+    assert connect.call_count == 1
+    txrx = retriever.txrxs[0]
+
+    retriever.close()
+    assert txrx.close.call_count == 1
+    assert retriever.txrxs == []
+
+    retriever.read([probe])
+    assert connect.call_count == 2
+
+
+def test_probe_streamer():
+    probes = [mock.Mock(), mock.Mock()]
+    retriever = mock.Mock()
+    streamer = utils.probes.ProbeStreamer(probes, retriever, period=0.001)
+    streamer.start()
+    time.sleep(0.05)
+    streamer.stop()
+
+    assert not streamer.thread.is_alive()
+    assert retriever.read.call_count > 0
+    assert retriever.read.call_args[0][0] is probes
+
+
+def test_probe_streamer_error():
+    """Errors while streaming should be raised when the streamer is stopped.
+    """
+    retriever = mock.Mock()
+    retriever.read.side_effect = IOError
+    streamer = utils.probes.ProbeStreamer([mock.Mock()], retriever,
+                                          period=0.001)
+    streamer.start()
+    time.sleep(0.05)
+
+    assert not streamer.thread.is_alive()
+    assert retriever.read.call_count == 1
+    with pytest.raises(IOError):
+        streamer.stop()
+
+
+def test_probe_data_lazy():
+    """Data should only be retrieved when first accessed."""
+    value_probe = mock.Mock(spec=utils.probes.DecodedValueProbe)
+    value_probe.probe = mock.Mock()
+    spike_probe = mock.Mock(spec=utils.probes.SpikeProbe)
+    spike_probe.probe = mock.Mock()
+    retriever = mock.Mock()
+    config = mock.MagicMock()
+
+    data = utils.probes.ProbeData([value_probe, spike_probe], retriever,
+                                  config)
+    assert len(data) == 2
+    assert list(data) == [value_probe.probe, spike_probe.probe]
+    assert retriever.read.call_count == 0
+
+    # Retrieved once, on first access
+    assert data[value_probe.probe] is value_probe.get_data.return_value
+    assert data[value_probe.probe] is value_probe.get_data.return_value
+    assert retriever.read.call_args_list == [mock.call([value_probe],
+                                                       final=True)]
+    assert value_probe.get_data.call_count == 1
+    assert 'dtype' in value_probe.get_data.call_args[1]
+    assert spike_probe.get_data.call_count == 0
+
+    # The connections are closed after each retrieval
+    assert retriever.close.call_count == 1
+    assert data[spike_probe.probe] is spike_probe.get_data.return_value
+    assert retriever.close.call_count == 2
+
+
+def test_probe_data_prefetch():
+    probes = [mock.Mock(spec=utils.probes.SpikeProbe) for _ in range(3)]
+    for p in probes:
+        p.probe = mock.Mock()
+    retriever = mock.Mock()
+
+    data = utils.probes.ProbeData(probes, retriever, mock.Mock())
+    data.prefetch()
+    data.thread.join()
+
+    assert data.retrieved == [p.probe for p in probes]
+    assert retriever.close.call_count == 3
@@ -0,0 +1,32 @@
+import pytest
+
+from nengo_spinnaker.utils import sdp
+
+
+def test_pack_unpack_sdp():
+    packet = sdp.SDPPacket(flags=0x07, tag=3, dest_port=1, dest_cpu=17,
+                           src_port=7, src_cpu=31, dest_x=4, dest_y=8,
+                           src_x=0, src_y=1, data="hello")
+    data = sdp.pack_sdp(packet)
+
+    # 2 bytes of padding, 8 bytes of header, then the data
+    assert len(data) == 2 + 8 + 5
+    assert data[:2] == "\x00\x00"
+    assert data[4] == chr((1 << 5) | 17)
+    assert sdp.unpack_sdp(data) == packet
+
+
+def test_unpack_sdp_too_short():
+    with pytest.raises(ValueError):
+        sdp.unpack_sdp("\x00" * 5)
+
+
+def test_pack_unpack_values():
+    data = sdp.pack_values([0.5, -1.0, 2.25], seq=12)
+    assert len(data) == 16 + 3*4
+
+    (cmd_rc, seq, args, values) = sdp.unpack_values(data)
+    assert cmd_rc == 1
+    assert seq == 12
+    assert args == (0, 0, 0)
+    assert values == [0.5, -1.0, 2.25]
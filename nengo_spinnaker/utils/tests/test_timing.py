@@ -0,0 +1,78 @@
+"""Tests for timing utilities.
+"""
+import numpy as np
+
+from nengo_spinnaker.utils import timing
+
+
+def test_latency_recorder_summary():
+    r = timing.LatencyRecorder()
+
+    # No samples, just a count
+    assert r.summary() == dict(count=0)
+    assert r.percentile(50) is None
+
+    for v in np.linspace(0., 1., 101):
+        r.record(v)
+
+    s = r.summary()
+    assert s['count'] == 101
+    assert np.allclose(s['mean'], 0.5)
+    assert np.allclose(s['p50'], 0.5)
+    assert s['min'] == 0. and s['max'] == 1.
+
+
+def test_latency_recorder_max_samples():
+    r = timing.LatencyRecorder(max_samples=10)
+
+    for v in range(100):
+        r.record(v)
+
+    # Only the last 10 samples are retained, but all are counted
+    assert r.count == 100
+    assert len(r) == 10
+    assert np.all(r.as_array() == np.arange(90, 100))
+
+    counts, edges = r.histogram(bins=5)
+    assert np.sum(counts) == 10
+
+
+def test_rate_meter():
+    m = timing.RateMeter()
+    assert m.rate is None
+
+    # Record events at 100Hz
+    for t in np.arange(0., 1., 0.01):
+        m.record(t)
+
+    assert m.count == 100
+    assert np.allclose(m.rate, 100.)
+    assert np.allclose(m.intervals.summary()['mean'], 0.01)
+
+
+def test_link_latency():
+    l = timing.LinkLatency(tick_period=0.001)
+
+    # Nothing can be said about board->host latency until the clocks have
+    # been related.
+    l.received(10, 1.0)
+    assert l.board_to_host.count == 0
+
+    # Values sent at 1.000 are received at tick 20 and acknowledged at 1.004,
+    # so tick 0 is estimated to be at 0.982.
+    l.acknowledged(1.000, 20, 1.004)
+    assert np.allclose(l.offset, 0.982)
+    assert np.allclose(l.round_trip.as_array(), [0.004])
+    assert np.allclose(l.host_to_board.as_array(), [0.002])
+
+    # A slower acknowledgement does not change the estimated offset
+    l.acknowledged(2.000, 1019, 2.010)
+    assert np.allclose(l.offset, 0.982)
+    assert np.allclose(l.host_to_board.as_array(), [0.002, 0.001])
+
+    # Values transmitted at tick 1100 and received at 2.085
+    l.received(1100, 2.085)
+    assert np.allclose(l.board_to_host.as_array(), [0.003])
+
+    s = l.summary()
+    assert s['round_trip']['count'] == 2
@@ -220,3 +220,112 @@ class TestMakeFilterRegions(object):
 
         assert(filters.data == expected_filters)
         assert(routings.data == expected_routings)
+
+
+class TestRecordingRegions(object):
+    def test_bitfield_sizeof(self):
+        r = utils.vertices.BitfieldBasedRecordingRegion(100)
+        assert r.frame_length(0, 39) == 2
+        assert r.sizeof(0, 39) == 41 + 2 + 2*100
+
+    def test_bitfield_atoms(self):
+        """Only the selected atoms should be recorded, subvertices without
+        any have no buffer.
+        """
+        r = utils.vertices.BitfieldBasedRecordingRegion(
+            100, [3, 5, 40, 41, 42])
+        assert list(r.recorded_atoms(0, 39)) == [3, 5]
+        assert r.frame_length(0, 39) == 1
+        assert r.sizeof(40, 79) == 41 + 2 + 1*100
+        assert r.sizeof(80, 119) == 41
+
+    def test_event_sizeof(self):
+        """Event buffers should be sized from the expected rates of the
+        recorded atoms.
+        """
+        r = utils.vertices.EventBasedRecordingRegion(
+            100, np.ones(80) * 0.125, atoms=range(8))
+        assert r.frame_length(0, 39) == 1
+        assert r.buffer_length(0, 39) == 2 * 100 * (1 + 1)
+        assert r.header_offset(0, 39) == 42
+        assert r.sizeof(0, 39) == 42 + 2 + 400
+        assert r.sizeof(40, 79) == 42
+
+        # The buffer holds at least one frame of spikes from every atom
+        r = utils.vertices.EventBasedRecordingRegion(1, np.zeros(80))
+        assert r.buffer_length(0, 79) == 81
+
+    def test_bitfield_atom_indices(self):
+        """The header should be preceded by the number of recorded atoms and
+        the index of the bit recording each atom.
+        """
+        r = utils.vertices.BitfieldBasedRecordingRegion(100, [3, 5, 40])
+        spec = mock.Mock()
+        r.write_out(2, 6, spec)
+
+        nr = utils.vertices.BitfieldBasedRecordingRegion.NOT_RECORDED
+        assert r.header_offset(2, 6) == 6
+        assert (list(spec.write_array.call_args[0][0]) ==
+                [2, nr, 0, nr, 1, nr])
+        assert ([c[1]['data'] for c in spec.write.call_args_list] ==
+                [0, 100])
+
+    def test_event_frame_count(self):
+        """The atom map of an event region should be followed by the count
+        of frames recorded, and then by the header.
+        """
+        r = utils.vertices.EventBasedRecordingRegion(100, np.ones(8) * 0.5)
+        spec = mock.Mock()
+        r.write_out(2, 6, spec)
+
+        assert r.header_offset(2, 6) == 7
+        assert len(spec.write_array.call_args[0][0]) == 6
+        assert ([c[1]['data'] for c in spec.write.call_args_list] ==
+                [0, 0, r.buffer_length(2, 6)])
+
+    def test_frame_sizeof(self):
+        r = utils.vertices.FrameBasedRecordingRegion(3, 100)
+        assert r.sizeof(0, 0) == 2 + 3*100
+
+    def test_write_header(self):
+        """Only the count of frames written (0) and the length of the buffer
+        should be written.
+        """
+        r = utils.vertices.FrameBasedRecordingRegion(3, 100)
+        spec = mock.Mock()
+        r.write_out(0, 0, spec)
+
+        assert not r.unfilled
+        assert ([c[1]['data'] for c in spec.write.call_args_list] ==
+                [0, 100])
+
+    def test_striped(self):
+        """Stripes should follow one another, their headers are written by
+        the executable.
+        """
+        r = utils.vertices.StripedRecordingRegion(
+            [utils.vertices.FrameBasedRecordingRegion(3, 100),
+             utils.vertices.FrameBasedRecordingRegion(1, 50)])
+        assert r.unfilled
+        assert r.stripe_offset(0, 0, 0) == 0
+        assert r.stripe_offset(1, 0, 0) == 2 + 3*100
+        assert r.sizeof(0, 0) == 2 + 3*100 + 2 + 50
+
+
+def test_retrieve_region_data_address_cache():
+    """The address of a region should only be looked up once if a cache is
+    provided.
+    """
+    txrx = mock.Mock()
+    cache = dict()
+    with mock.patch.object(utils.vertices, 'get_region_address') as g:
+        g.return_value = 0x60001000
+        utils.vertices.retrieve_region_data(txrx, 1, 2, 3, 15, 4,
+                                            address_cache=cache)
+        utils.vertices.retrieve_region_data(txrx, 1, 2, 3, 15, 4, offset=2,
+                                            address_cache=cache)
+
+    assert g.call_count == 1
+    assert cache == {(1, 2, 3, 15): 0x60001000}
+    assert txrx.memory_calls.read_mem.call_args[0][0] == 0x60001008
+    assert txrx.memory_calls.read_mem.call_args[0][2] == 16
@@ -0,0 +1,146 @@
+"""Tools for recording and summarising timings on the host.
+"""
+
+import collections
+import numpy as np
+import threading
+
+
+class LatencyRecorder(object):
+    """Records latency samples (in seconds) and summarises them.
+
+    Only the most recent `max_samples` samples are retained, the total number
+    of samples recorded is available as `count`.
+    """
+    def __init__(self, max_samples=100000):
+        self.samples = collections.deque(maxlen=max_samples)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency):
+        """Record a new latency sample."""
+        with self._lock:
+            self.samples.append(latency)
+            self.count += 1
+
+    def __len__(self):
+        return len(self.samples)
+
+    def as_array(self):
+        """Return the retained samples as a Numpy array."""
+        with self._lock:
+            return np.array(self.samples, dtype=np.float64)
+
+    def percentile(self, q):
+        """Get the q-th percentile of the retained samples, or None if no
+        samples have been recorded.
+        """
+        samples = self.as_array()
+        if samples.size == 0:
+            return None
+        return np.percentile(samples, q)
+
+    def histogram(self, bins=50, range=None):
+        """Get a histogram of the retained samples.
+
+        :returns: (counts, bin_edges) as returned by :py:func:`numpy.histogram`
+        """
+        return np.histogram(self.as_array(), bins=bins, range=range)
+
+    def summary(self):
+        """Get a dictionary summarising the retained samples."""
+        samples = self.as_array()
+        if samples.size == 0:
+            return dict(count=self.count)
+
+        return dict(count=self.count,
+                    mean=np.mean(samples),
+                    min=np.min(samples),
+                    p50=np.percentile(samples, 50),
+                    p90=np.percentile(samples, 90),
+                    p99=np.percentile(samples, 99),
+                    max=np.max(samples))
+
+
+class RateMeter(object):
+    """Counts events and records the intervals between them.
+    """
+    def __init__(self, max_samples=10000):
+        self.count = 0
+        self.first = None
+        self.last = None
+        self.intervals = LatencyRecorder(max_samples)
+
+    def record(self, now):
+        """Record an event occurring at the given time."""
+        if self.last is not None:
+            self.intervals.record(now - self.last)
+        else:
+            self.first = now
+
+        self.last = now
+        self.count += 1
+
+    @property
+    def rate(self):
+        """The mean rate of events (in events per second), or None if fewer
+        than two events have been recorded.
+        """
+        if self.count < 2 or self.last == self.first:
+            return None
+        return (self.count - 1) / (self.last - self.first)
+
+
+class LinkLatency(object):
+    """Estimates the latency of communication with the board from
+    timestamped packets.
+
+    Round-trip times are measured from acknowledgements which echo a host
+    timestamp and report the board tick at which the values were received.
+    The offset between the host clock and board ticks is estimated from the
+    acknowledgement with the smallest round-trip time, assuming that the
+    outward and return journeys took equally long.  One-way latencies are
+    then computed against the estimated offset and so are only as accurate
+    as the tick period.
+
+    :param tick_period: Duration of a board tick in seconds.
+    """
+    def __init__(self, tick_period=0.001):
+        self.tick_period = tick_period
+        self.round_trip = LatencyRecorder()
+        self.host_to_board = LatencyRecorder()
+        self.board_to_host = LatencyRecorder()
+
+        # Host time of board tick 0 and the round-trip time of the
+        # acknowledgement from which it was estimated.
+        self.offset = None
+        self.offset_rtt = None
+
+    def acknowledged(self, sent, tick, now):
+        """Record an acknowledgement of values sent at host time `sent` which
+        were received by the board at the given tick.
+        """
+        rtt = now - sent
+        self.round_trip.record(rtt)
+
+        if self.offset_rtt is None or rtt <= self.offset_rtt:
+            self.offset = sent + rtt/2. - tick*self.tick_period
+            self.offset_rtt = rtt
+        self.host_to_board.record(self.board_time(tick) - sent)
+
+    def received(self, tick, now):
+        """Record the receipt of values transmitted by the board at the given
+        tick.
+        """
+        if self.offset is not None:
+            self.board_to_host.record(now - self.board_time(tick))
+
+    def board_time(self, tick):
+        """Convert a board tick into host time."""
+        return self.offset + tick*self.tick_period
+
+    def summary(self):
+        """Get a dictionary of summaries of each latency."""
+        return dict(round_trip=self.round_trip.summary(),
+                    host_to_board=self.host_to_board.summary(),
+                    board_to_host=self.board_to_host.summary())
@@ -5,7 +5,7 @@ from pacman103.lib import graph, data_spec_gen, lib_map
 from pacman103.core.utilities import memory_utils
 from pacman103.core.spinnman.scp import scamp
 
-from . import connections, fp
+from . import connections, fp, scp
 
 try:
     from pkg_resources import resource_filename
@@ -111,32 +111,59 @@ class NengoVertex(graph.Vertex):
                 subedge.edge.keyspace.routing_mask)
 
 
-def retrieve_region_data(txrx, x, y, p, region_id, region_size):
-    """Get the data from the given processor and region.
+def read_memory(txrx, x, y, address, length):
+    """Read memory from the given chip.
 
-    :param txrx: transceiver to use when communicating with the board
-    :param region_id: id of the region to retrieve
-    :param region_size: size of the region (in words)
-    :returns: a string containing data from the region
+    :param txrx: transceiver, or :py:class:`~.scp.SCPConnection`, to use when
+                 communicating with the board
+    :param length: number of bytes to read
     """
-    # Get the application pointer table to get the address for the region
+    if isinstance(txrx, scp.SCPConnection):
+        return txrx.read(x, y, address, length)
+
     txrx.select(x, y)
+    return txrx.memory_calls.read_mem(address, scamp.TYPE_WORD, length)
+
+
+def get_region_address(txrx, x, y, p, region_id):
+    """Get the address of the given region of the given processor."""
+    # Get the application pointer table to get the address for the region
     app_data_base_offset = memory_utils.getAppDataBaseAddressOffset(p)
-    _app_data_table = txrx.memory_calls.read_mem(app_data_base_offset,
-                                                 scamp.TYPE_WORD, 4)
+    _app_data_table = read_memory(txrx, x, y, app_data_base_offset, 4)
     app_data_table = struct.unpack('<I', _app_data_table)[0]
 
     # Get the position of the desired region
     region_base_offset = memory_utils.getRegionBaseAddressOffset(
         app_data_table, region_id)
-    _region_base = txrx.memory_calls.read_mem(region_base_offset,
-                                              scamp.TYPE_WORD, 4)
-    region_address = struct.unpack('<I', _region_base)[0] + app_data_table
+    _region_base = read_memory(txrx, x, y, region_base_offset, 4)
+    return struct.unpack('<I', _region_base)[0] + app_data_table
+
+
+def retrieve_region_data(txrx, x, y, p, region_id, region_size, offset=0,
+                         address_cache=None):
+    """Get the data from the given processor and region.
+
+    :param txrx: transceiver, or :py:class:`~.scp.SCPConnection`, to use
+                 when communicating with the board
+    :param region_id: id of the region to retrieve
+    :param region_size: size of the data to retrieve (in words)
+    :param offset: offset (in words) of the data from the start of the region
+    :param address_cache: dictionary in which to cache the addresses of
+                          regions, keyed by (x, y, p, region_id), to avoid
+                          looking them up for every read
+    :returns: a string containing data from the region
+    """
+    key = (x, y, p, region_id)
+    if address_cache is not None and key in address_cache:
+        region_address = address_cache[key]
+    else:
+        region_address = get_region_address(txrx, x, y, p, region_id)
+        if address_cache is not None:
+            address_cache[key] = region_address
 
     # Read the region
-    data = txrx.memory_calls.read_mem(region_address, scamp.TYPE_WORD,
-                                      region_size * 4)
-    return data
+    return read_memory(txrx, x, y, region_address + offset * 4,
+                       region_size * 4)
 
 
 def make_filter_regions(conns, dt):
@@ -286,29 +313,183 @@ class UnpartitionedListRegion(object):
                 spec.write(data=data, sizeof=self.dtype)
 
 
-class BitfieldBasedRecordingRegion(object):
-    """A region representing a recorded region.
+# Words at the start of each recording region: the number of frames written
+# and the length of the buffer in frames.
+RECORDING_HEADER_WORDS = 2
+
+
+class _RecordingRegion(object):
+    """A region into which frames are recorded as a circular buffer.
+
+    The region starts with a count of the frames written, which is updated by
+    the executable after each frame, and the length of the buffer in frames.
+    Frame `n` is written to slot `n % n_frames` of the buffer.  This header
+    may be preceded by `header_offset` words of other data.
     """
-    def __init__(self, n_ticks):
-        self.n_ticks = n_ticks
-        self.in_dtcm = False
-        self.unfilled = True
+    in_dtcm = False
+    unfilled = False
+
+    def __init__(self, n_frames):
+        self.n_frames = n_frames
+
+    def frame_length(self, lo_atom, hi_atom):
+        raise NotImplementedError
+
+    def buffer_length(self, lo_atom, hi_atom):
+        """Get the length of the circular buffer (in frames)."""
+        return self.n_frames
+
+    def header_offset(self, lo_atom, hi_atom):
+        """Get the number of words preceding the header."""
+        return 0
+
+    def max_frame_length(self, lo_atom, hi_atom):
+        """Get the most frames of the buffer written for a single recorded
+        frame, all of which are written before the count is updated.
+        """
+        return 1
 
     def sizeof(self, lo_atom, hi_atom):
-        n_atoms = hi_atom - lo_atom + 1
-        frame_size = (n_atoms >> 5) + (1 if n_atoms & 0x1f else 0)
-        return frame_size * self.n_ticks
+        # Subvertices which record nothing have no header or buffer
+        size = self.header_offset(lo_atom, hi_atom)
+        frame_length = self.frame_length(lo_atom, hi_atom)
+        if frame_length > 0:
+            size += (RECORDING_HEADER_WORDS +
+                     frame_length * self.buffer_length(lo_atom, hi_atom))
+        return size
+
+    def write_out(self, lo_atom, hi_atom, spec):
+        # Only the header is written, the buffer is left unfilled
+        if self.frame_length(lo_atom, hi_atom) > 0:
+            spec.write(data=0)
+            spec.write(data=self.buffer_length(lo_atom, hi_atom))
+
+
+class BitfieldBasedRecordingRegion(_RecordingRegion):
+    """A region representing a recorded region.
 
+    Each frame is a bitfield with a bit for each recorded atom of the
+    subvertex.  The header is preceded by the number of recorded atoms and
+    the index of the bit recording each atom of the subvertex, or
+    `NOT_RECORDED`.
 
-class FrameBasedRecordingRegion(object):
+    :param atoms: Sorted indices of the atoms to record, or None to record
+                  every atom.
+    """
+    NOT_RECORDED = 0xffffffff
+
+    def __init__(self, n_frames, atoms=None):
+        super(BitfieldBasedRecordingRegion, self).__init__(n_frames)
+        self.atoms = None if atoms is None else np.asarray(atoms, dtype=int)
+
+    def recorded_atoms(self, lo_atom, hi_atom):
+        """Get the indices of the recorded atoms of a subvertex, the `i`th of
+        which is recorded by bit `i` of each frame.
+        """
+        if self.atoms is None:
+            return np.arange(lo_atom, hi_atom + 1)
+        return self.atoms[(self.atoms >= lo_atom) & (self.atoms <= hi_atom)]
+
+    def frame_length(self, lo_atom, hi_atom):
+        n_atoms = len(self.recorded_atoms(lo_atom, hi_atom))
+        return (n_atoms >> 5) + (1 if n_atoms & 0x1f else 0)
+
+    def header_offset(self, lo_atom, hi_atom):
+        return 1 + hi_atom - lo_atom + 1
+
+    def _write_atom_map(self, lo_atom, hi_atom, spec):
+        atoms = self.recorded_atoms(lo_atom, hi_atom)
+        data = np.empty(hi_atom - lo_atom + 2, dtype=np.uint32)
+        data[0] = len(atoms)
+        data[1:] = self.NOT_RECORDED
+        data[atoms - lo_atom + 1] = np.arange(len(atoms))
+        spec.write_array(data)
+
+    def write_out(self, lo_atom, hi_atom, spec):
+        self._write_atom_map(lo_atom, hi_atom, spec)
+        super(BitfieldBasedRecordingRegion, self).write_out(lo_atom, hi_atom,
+                                                            spec)
+
+
+class EventBasedRecordingRegion(BitfieldBasedRecordingRegion):
+    """A region into which spikes are recorded as a list of events.
+
+    Each frame in which any recorded atom spiked is recorded as a header
+    word, with the top bit set and the index of the frame in the remaining
+    bits, followed by a word giving the bit index (as for
+    :py:class:`BitfieldBasedRecordingRegion`) of each atom which spiked.
+    The circular buffer is measured in words and sized to hold `n_frames`
+    frames at twice the expected rate of spikes.  As frames without spikes
+    are not written, the header is preceded by a count of every frame
+    recorded, which is updated by the executable after each frame.
+
+    :param rates: Expected number of spikes of each atom in each frame.
+    """
+    EVENT_HEADER = 0x80000000
+    margin = 2.
+
+    def __init__(self, n_frames, rates, atoms=None):
+        super(EventBasedRecordingRegion, self).__init__(n_frames, atoms)
+        self.rates = np.asarray(rates)
+
+    def frame_length(self, lo_atom, hi_atom):
+        # The buffer is one of words
+        return 1 if len(self.recorded_atoms(lo_atom, hi_atom)) > 0 else 0
+
+    def header_offset(self, lo_atom, hi_atom):
+        # The atom map is followed by the count of frames recorded
+        return super(EventBasedRecordingRegion, self).header_offset(
+            lo_atom, hi_atom) + 1
+
+    def write_out(self, lo_atom, hi_atom, spec):
+        self._write_atom_map(lo_atom, hi_atom, spec)
+        spec.write(data=0)
+        _RecordingRegion.write_out(self, lo_atom, hi_atom, spec)
+
+    def max_frame_length(self, lo_atom, hi_atom):
+        # A header followed by an event for every recorded atom
+        return 1 + len(self.recorded_atoms(lo_atom, hi_atom))
+
+    def buffer_length(self, lo_atom, hi_atom):
+        atoms = self.recorded_atoms(lo_atom, hi_atom)
+
+        # Atoms spike at most once in each frame, and a header is only
+        # written for frames in which some atom spiked.
+        n_spikes = np.sum(np.minimum(self.rates[atoms], 1.))
+        n_words = self.n_frames * (min(n_spikes, 1.) + n_spikes)
+
+        # The buffer must hold at least one complete frame
+        return max(int(np.ceil(n_words * self.margin)), 1 + len(atoms))
+
+
+class FrameBasedRecordingRegion(_RecordingRegion):
+    def __init__(self, width, n_frames):
+        super(FrameBasedRecordingRegion, self).__init__(n_frames)
+        self.width = width
+
+    def frame_length(self, lo_atom, hi_atom):
+        return self.width
+
+
+class StripedRecordingRegion(object):
+    """A region holding several recording regions ("stripes") one after
+    another, each with its own header and circular buffer.
+
+    The headers are written by the executable, which lays out the stripes
+    given the length of the buffer of each.
+    """
     in_dtcm = False
     unfilled = True
 
-    def __init__(self, width, n_ticks):
-        self.size = width*n_ticks
+    def __init__(self, stripes):
+        self.stripes = list(stripes)
+
+    def stripe_offset(self, index, lo_atom, hi_atom):
+        """Get the offset (in words) of the header of the given stripe."""
+        return sum(s.sizeof(lo_atom, hi_atom) for s in self.stripes[:index])
 
     def sizeof(self, lo_atom, hi_atom):
-        return self.size
+        return sum(s.sizeof(lo_atom, hi_atom) for s in self.stripes)
 
 
 class UnpartitionedMatrixRegion(object):
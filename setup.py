@@ -37,8 +37,5 @@ setup(
         "nengo (>=2.0.0)",
         "numpy",
     ],
-    extras_require={
-        'Spike probing': ['bitarray'],
-    },
     test_suite='nengo_spinnaker.test',
 )
@@ -39,4 +39,10 @@ do { \
 #define MALLOC_FAIL_FALSE(VAR, SIZE) \
   __MALLOC_FAIL(VAR, SIZE, false)
 
+/* SDP command codes used between the host and the nengo_rx/nengo_tx cores.
+ */
+#define NENGO_SDP_DATA      1  //!< Values
+#define NENGO_SDP_ACK       2  //!< Acknowledgement of timestamped values
+#define NENGO_SDP_DATA_ACK  3  //!< Values for which an ack is requested
+
 #endif
@@ -49,6 +49,9 @@ typedef struct region_system
   value_t dt_over_t_rc;
   bool record_spikes;
   uint n_inhibitory_dimensions;
+  uint spikes_sample_ticks;
+  uint spikes_format;
+  uint n_recorded_dimensions;
 } region_system_t;
 
 /** \brief Persistent neuron variables.
@@ -75,6 +78,7 @@ typedef struct ensemble_parameters {
 
   value_t *encoders;        //!< Encoder values \f$N \times D_{in}\f$ (including gains)
   value_t *decoders;        //!< Decoder values \f$N \times\sum D_{outs}\f$
+                            //!< followed by those of recorded dimensions
 
   value_t *input;           //!< Input buffer
   value_t *output;          //!< Output buffer
@@ -87,6 +91,7 @@ extern ensemble_parameters_t g_ensemble;  //!< Global parameters
 extern uint g_output_period;       //!< Delay in transmitting decoded output
 
 extern uint g_n_output_dimensions;
+extern uint g_n_decoded_dimensions;
 
 extern input_filter_t g_input;     //!< Input filters and buffers
 extern input_filter_t g_input_inhibitory;     //!< Input filters and buffers
@@ -119,11 +124,11 @@ static inline value_t neuron_encoder( uint n, uint d )
   { return g_ensemble.encoders[ n * g_input.n_dimensions + d ]; };
 
 static inline value_t neuron_decoder( uint n, uint d )
-  { return g_ensemble.decoders[ n * g_n_output_dimensions + d ]; };
+  { return g_ensemble.decoders[ n * g_n_decoded_dimensions + d ]; };
 
 static inline value_t *neuron_decoder_vector(uint n)
 {
-  return &g_ensemble.decoders[n * g_n_output_dimensions];
+  return &g_ensemble.decoders[n * g_n_decoded_dimensions];
 }
 
 // -- Voltages and refractory periods
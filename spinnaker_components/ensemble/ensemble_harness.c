@@ -44,6 +44,8 @@ bool initialise_ensemble(region_system_t *pars) {
   g_ensemble.t_ref = pars->t_ref;
   g_ensemble.dt_over_t_rc = pars->dt_over_t_rc;
   g_ensemble.recd.record = pars->record_spikes;
+  g_ensemble.recd.sample_ticks = pars->spikes_sample_ticks;
+  g_ensemble.recd.format = pars->spikes_format;
 
   io_printf(IO_BUF, "[Ensemble] INITIALISE_ENSEMBLE n_neurons = %d," \
             "timestep = %d, t_ref = %d, dt_over_t_rc = 0x%08x\n",
@@ -72,7 +74,8 @@ bool initialise_ensemble(region_system_t *pars) {
                       sizeof(value_t));
 
   MALLOC_FAIL_FALSE(g_ensemble.decoders,
-                    g_ensemble.n_neurons * pars->n_output_dimensions *
+                    g_ensemble.n_neurons * (pars->n_output_dimensions +
+                                            pars->n_recorded_dimensions) *
                       sizeof(value_t));
 
   // Setup subcomponents
@@ -91,7 +94,7 @@ bool initialise_ensemble(region_system_t *pars) {
   io_printf(IO_BUF, "@\n");
 
   g_ensemble.output = initialise_output(pars);
-  if (g_ensemble.output == NULL && g_n_output_dimensions > 0)
+  if (g_ensemble.output == NULL && g_n_decoded_dimensions > 0)
     return false;
 
   // Register the update function
@@ -1,5 +1,6 @@
 #include "ensemble.h"
 #include "ensemble_data.h"
+#include "ensemble_output.h"
 #include "ensemble_pes.h"
 
 void c_main(void) {
@@ -14,7 +15,7 @@ void c_main(void) {
   // Get data
   data_get_bias(region_start(2, address), g_ensemble.n_neurons);
   data_get_encoders(region_start(3, address), g_ensemble.n_neurons, g_input.n_dimensions);
-  data_get_decoders(region_start(4, address), g_ensemble.n_neurons, g_n_output_dimensions);
+  data_get_decoders(region_start(4, address), g_ensemble.n_neurons, g_n_decoded_dimensions);
   data_get_keys(region_start(5, address), g_n_output_dimensions);
 
   // Get the inhibitory gains
@@ -48,8 +49,9 @@ void c_main(void) {
   }
 
   // Set up recording
-  if (!record_buffer_initialise(&g_ensemble.recd, region_start(15, address),
-                                simulation_ticks, g_ensemble.n_neurons)) {
+  if (!record_output_initialise(region_start(14, address)) ||
+      !record_buffer_initialise(&g_ensemble.recd, region_start(15, address),
+                                g_ensemble.n_neurons)) {
     io_printf(IO_BUF, "[Ensemble] Failed to start.\n");
     return;
   }
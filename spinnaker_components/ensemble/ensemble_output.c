@@ -17,22 +17,29 @@
 
 #include "ensemble_output.h"
 
-uint g_n_output_dimensions, *gp_output_keys;
+uint g_n_output_dimensions, g_n_recorded_dimensions, g_n_decoded_dimensions;
+uint *gp_output_keys;
 value_t * gp_output_values;
 
+uint g_recorded_n_frames, g_recorded_frame;
+uint *gp_recorded_count;
+value_t *gp_recorded_start;
+
 // Initialise everything necessary for the output system
 value_t* initialise_output( region_system_t *pars ){
   io_printf( IO_BUF, "[Ensemble] INITIALISE_OUTPUT.\n" );
   // Store globals, initialise arrays
   g_n_output_dimensions = pars->n_output_dimensions;
+  g_n_recorded_dimensions = pars->n_recorded_dimensions;
+  g_n_decoded_dimensions = g_n_output_dimensions + g_n_recorded_dimensions;
 
-  if (g_n_output_dimensions > 0) {
+  if (g_n_decoded_dimensions > 0) {
     MALLOC_FAIL_NULL(gp_output_values,
-                     pars->n_output_dimensions * sizeof(value_t));
+                     g_n_decoded_dimensions * sizeof(value_t));
     MALLOC_FAIL_NULL(gp_output_keys,
-                     pars->n_output_dimensions * sizeof(uint));
+                     g_n_decoded_dimensions * sizeof(uint));
 
-    for (uint n = 0; n < g_n_output_dimensions; n++) {
+    for (uint n = 0; n < g_n_decoded_dimensions; n++) {
       gp_output_values[n] = 0;
     }
   }
@@ -44,3 +51,39 @@ value_t* initialise_output( region_system_t *pars ){
   // Return the output buffer
   return gp_output_values;
 }
+
+bool record_output_initialise( address_t region ){
+  g_recorded_frame = 0;
+  g_recorded_n_frames = 0;
+  if (g_n_recorded_dimensions == 0) {
+    return true;
+  }
+
+  g_recorded_n_frames = region[1];
+  gp_recorded_count = (uint *) region;
+  gp_recorded_start = (value_t *) &region[2];
+  gp_recorded_count[0] = 0;
+  return true;
+}
+
+void record_output( void ){
+  if (g_n_recorded_dimensions == 0) {
+    return;
+  }
+
+  // Copy the recorded dimensions into the next frame and update the count
+  // of frames written.
+  if (g_recorded_n_frames > 0) {
+    spin1_memcpy(
+      &gp_recorded_start[(g_recorded_frame % g_recorded_n_frames) *
+                         g_n_recorded_dimensions],
+      &gp_output_values[g_n_output_dimensions],
+      g_n_recorded_dimensions * sizeof(value_t));
+    g_recorded_frame++;
+    gp_recorded_count[0] = g_recorded_frame;
+  }
+
+  for (uint d = g_n_output_dimensions; d < g_n_decoded_dimensions; d++) {
+    gp_output_values[d] = 0;
+  }
+}
@@ -24,8 +24,11 @@
 
 /* Buffers and parameters ****************************************************/
 extern uint g_n_output_dimensions; //!< Number of output dimensions \f$D_{out}\f$
+extern uint g_n_recorded_dimensions; //!< Number of recorded dimensions
+extern uint g_n_decoded_dimensions; //!< Output and recorded dimensions
 extern uint * gp_output_keys;      //!< Output dimension keys \f$1 \times D_{out}\f$
 extern value_t * gp_output_values; //!< Output buffers \f$1 \times D_{out}\f$
+                                   //!< followed by recorded dimensions
 
 /* Functions *****************************************************************/
 /**
@@ -47,6 +50,24 @@ value_t* initialise_output( region_system_t *pars );
  */
 void outgoing_dimension_callback( uint index, uint arg1 );
 
+/**
+ * \brief Initialise recording of the decoded values of recorded dimensions.
+ * \param region Recording region, which starts with the count of frames
+ *        written and the length of the circular buffer in frames.  Only
+ *        present if there are recorded dimensions.
+ *
+ * Recorded dimensions are decoded like output dimensions but recorded every
+ * tick rather than transmitted, so that filtering and any transform may be
+ * applied by the host.
+ */
+bool record_output_initialise( address_t region );
+
+/**
+ * \brief Record the decoded values of the recorded dimensions for this tick
+ *        into the next frame of the circular buffer and reset them.
+ */
+void record_output( void );
+
 #endif
 
 /** @} */
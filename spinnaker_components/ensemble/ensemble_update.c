@@ -22,9 +22,6 @@ void ensemble_update(uint ticks, uint arg1) {
     spin1_exit(0);
   }
 
-  // Prepare the recorder
-  record_buffer_prepare(&g_ensemble.recd);
-
   // Values used below
   current_t i_membrane;
   voltage_t v_delta, v_voltage;
@@ -89,7 +86,7 @@ void ensemble_update(uint ticks, uint arg1) {
       lfsr = ((lfsr >> 1) ^ (~lfsr & 0xB400));
 
       // Update the output values
-      for( uint d = 0; d < g_n_output_dimensions; d++ ) {
+      for( uint d = 0; d < g_n_decoded_dimensions; d++ ) {
         /* io_printf( IO_STD, "[%d] = %.3k (0x%08x)",
           d, neuron_decoder(n,d), neuron_decoder(n,d) ); */
         g_ensemble.output[d] += neuron_decoder( n, d );
@@ -117,6 +114,9 @@ void ensemble_update(uint ticks, uint arg1) {
     spin1_delay_us(1);
   }
 
+  // Record the decoded values of any recorded dimensions
+  record_output();
+
   // Flush the recording buffer
   record_buffer_flush(&g_ensemble.recd);
 }
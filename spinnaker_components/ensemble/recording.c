@@ -1,14 +1,39 @@
 #include "recording.h"
 
 bool record_buffer_initialise(recording_buffer_t *buffer, address_t region,
-                              uint n_frames, uint n_neurons) {
-  // Generate and store buffer parameters
-  buffer->frame_length = (n_neurons >> 5) + (n_neurons & 0x1f ? 1 : 0);
-  buffer->n_frames = n_frames;
-  buffer->_sdram_start = (uint *) region;
-  buffer->_sdram_current = (uint *) region;
+                              uint n_neurons) {
+  // Copy the index of the bit recording each neuron
+  uint n_recorded = region[0];
+  MALLOC_FAIL_FALSE(buffer->indices, n_neurons * sizeof(uint));
+  spin1_memcpy(buffer->indices, &region[1], n_neurons * sizeof(uint));
+  region = &region[1 + n_neurons];
 
-  buffer->current_frame = UINT32_MAX;  // To cause overflow on first tick
+  // When recording events the indices are followed by the count of frames
+  if (buffer->format == RECORDING_EVENTS) {
+    buffer->_sdram_frames = (uint *) region;
+    buffer->_sdram_frames[0] = 0;
+    region = &region[1];
+  }
+
+  buffer->frame_length = (n_recorded >> 5) + (n_recorded & 0x1f ? 1 : 0);
+  buffer->current_frame = 0;
+  buffer->n_words = 0;
+  buffer->write_index = 0;
+  buffer->ticks_since_sample = 0;
+
+  // There is no buffer if no neurons are recorded
+  if (n_recorded == 0) {
+    buffer->record = false;
+    buffer->n_frames = 0;
+    return true;
+  }
+
+  // Generate and store buffer parameters, the region starts with the count of
+  // frames written and the length of the buffer in frames.
+  buffer->n_frames = region[1];
+  buffer->_sdram_count = (uint *) region;
+  buffer->_sdram_start = (uint *) &region[2];
+  buffer->_sdram_count[0] = 0;
 
   // Create the local buffer
   MALLOC_FAIL_FALSE(buffer->buffer, buffer->frame_length * sizeof(uint));
@@ -20,3 +45,38 @@ bool record_buffer_initialise(recording_buffer_t *buffer, address_t region,
 
   return true;
 }
+
+static inline void record_buffer_write_word(recording_buffer_t *buffer,
+                                            uint word) {
+  buffer->_sdram_start[buffer->write_index] = word;
+  if (++buffer->write_index == buffer->n_frames) {
+    buffer->write_index = 0;
+  }
+  buffer->n_words++;
+}
+
+void record_buffer_write_events(recording_buffer_t *buffer) {
+  // Nothing is written for frames in which no neuron spiked
+  uint i;
+  for (i = 0; i < buffer->frame_length && buffer->buffer[i] == 0; i++) {
+  }
+  if (i == buffer->frame_length) {
+    return;
+  }
+
+  // Write the header followed by the index of each neuron which spiked
+  record_buffer_write_word(buffer,
+                           RECORDING_EVENT_HEADER | buffer->current_frame);
+  for (; i < buffer->frame_length; i++) {
+    uint word = buffer->buffer[i];
+    while (word) {
+      uint bit = __builtin_ctz(word);
+      record_buffer_write_word(buffer, (i << 5) | bit);
+      word &= word - 1;
+    }
+  }
+
+  // Update the count of words written once the frame is complete, the host
+  // holds back as many of the oldest words as a frame may overwrite.
+  buffer->_sdram_count[0] = buffer->n_words;
+}
@@ -16,45 +16,91 @@
 #include "common-typedefs.h"
 #include "nengo-common.h"
 
+#define RECORDING_NOT_RECORDED 0xffffffff
+#define RECORDING_EVENT_HEADER 0x80000000
+
+/*!\brief Formats in which spikes may be recorded.
+ */
+typedef enum _recording_format_t {
+  RECORDING_BITFIELD = 0,  //!< A bitfield of the neurons for every frame
+  RECORDING_EVENTS = 1,    //!< A list of the neurons which spiked
+} recording_format_t;
+
 typedef struct _recording_buffer_t {
   uint *buffer;         //!< The buffer to write to
+  uint *indices;        //!< Index of the bit recording each neuron
   uint frame_length;    //!< Size of 1 frame of the buffer (in words)
-  uint n_frames;        //!< Length of the buffer in frames (= n_ticks)
+  uint n_frames;        //!< Length of the circular buffer in frames (words
+                        //!< for events)
 
   bool record;          //!< Whether or not to record the data in the buffer
+  recording_format_t format;  //!< Format in which to record spikes
+  uint sample_ticks;    //!< Ticks between recorded frames
+  uint ticks_since_sample; //!< Ticks since the last frame was recorded
 
-  uint current_frame;   //!< Current frame number
+  uint current_frame;   //!< Number of frames written
+  uint n_words;         //!< Number of words of events written
+  uint write_index;     //!< Index in the circular buffer of the next event
 
-  uint *_sdram_start;   //!< Start of the buffer in SDRAM
-  uint *_sdram_current; //!< Current location in the SDRAM buffer
+  uint *_sdram_count;   //!< Count of frames written, read by the host
+  uint *_sdram_frames;  //!< Count of frames recorded when recording events
+  uint *_sdram_start;   //!< Start of the circular buffer in SDRAM
 } recording_buffer_t;
 
 /*!\brief Initialise a new recording buffer.
+ *
+ * The region starts with the number of neurons to record followed by the
+ * index of the bit recording each neuron in a frame, or
+ * RECORDING_NOT_RECORDED.  If any neurons are recorded this is followed by
+ * the count of frames written and the length of the circular buffer in
+ * frames, and then by the buffer itself.  If recording events the buffer is
+ * measured in words rather than frames, and the indices are followed by the
+ * count of every frame recorded (including those in which no neuron spiked).
  */
 bool record_buffer_initialise(recording_buffer_t *buffer, address_t region,
-                              uint n_frames, uint n_neurons);
+                              uint n_neurons);
 
-/*!\brief Prepare buffer for writing.
+/*!\brief Write the events of the current frame to the circular buffer.
  *
- * If recording is in use the pointer to the current address in SDRAM will be
- * advanced by one recording frame.
+ * If any neuron spiked a header word, with the top bit set and the index of
+ * the frame in the remaining bits, is written followed by the index of the
+ * bit recording each neuron which spiked.  The count of words written is
+ * updated after all the events of the frame.
  */
-static inline void record_buffer_prepare(recording_buffer_t *buffer) {
-  if (buffer->record) {
-    buffer->_sdram_current += buffer->frame_length;
-  }
-}
+void record_buffer_write_events(recording_buffer_t *buffer);
 
 /*!\brief Flush the current buffer.
  *
- * The contents of the buffer will be appended to the recording region in
- * SDRAM, but only if recording is in use.
+ * At the end of every sampling period the contents of the buffer will be
+ * written to the next frame of the circular buffer in SDRAM, overwriting the
+ * oldest frame once the buffer is full, but only if recording is in use.  The
+ * count of frames written is updated after the frame so that the host may
+ * read complete frames during the simulation.  Spikes accumulate in the
+ * buffer over each sampling period.
+ *
+ * If recording events then only the neurons which spiked are written, see
+ * record_buffer_write_events.
  */
 static inline void record_buffer_flush(recording_buffer_t *buffer) {
+  if (++buffer->ticks_since_sample < buffer->sample_ticks) {
+    return;
+  }
+  buffer->ticks_since_sample = 0;
+
   // Copy the current buffer into SDRAM
-  if (buffer->record) {
-    spin1_memcpy(buffer->_sdram_current, buffer->buffer,
-                 buffer->frame_length * sizeof(uint));
+  if (buffer->record && buffer->n_frames > 0) {
+    if (buffer->format == RECORDING_EVENTS) {
+      record_buffer_write_events(buffer);
+      buffer->current_frame++;
+      buffer->_sdram_frames[0] = buffer->current_frame;
+    } else {
+      spin1_memcpy(
+        &buffer->_sdram_start[(buffer->current_frame % buffer->n_frames) *
+                              buffer->frame_length],
+        buffer->buffer, buffer->frame_length * sizeof(uint));
+      buffer->current_frame++;
+      buffer->_sdram_count[0] = buffer->current_frame;
+    }
   }
 
   // Empty the buffer
@@ -67,9 +113,10 @@ static inline void record_buffer_flush(recording_buffer_t *buffer) {
  */
 static inline void record_spike(recording_buffer_t *buffer, uint n_neuron) {
   // Get the offset within the current buffer, and the specific bit to set
-  // We write to the buffer regardless of whether recording is desired or not
-  // in order to reduce branching.
-  buffer->buffer[n_neuron >> 5] |= 1 << (n_neuron & 0x1f);
+  uint index = buffer->indices[n_neuron];
+  if (index != RECORDING_NOT_RECORDED) {
+    buffer->buffer[index >> 5] |= 1 << (index & 0x1f);
+  }
 }
 
 #endif
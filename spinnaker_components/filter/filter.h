@@ -26,6 +26,7 @@ typedef struct filter_parameters {
   uint transmission_delay; //!< Number of ticks between output transmissions
 
   uint interpacket_pause;  //!< Delay in usecs between transmitting packets
+  value_t threshold;       //!< Change in value which causes early transmission
 
   uint size_in, size_out;  //!< The size of data to expect, to output
 
@@ -33,6 +34,7 @@ typedef struct filter_parameters {
 
   value_t *input;          //!< Input buffer
   value_t *output;         //!< Output buffer
+  value_t *last_output;    //!< Last transmitted output
   uint *keys;              //!< Output keys
 } filter_parameters_t;
 extern filter_parameters_t g_filter; //!< Global parameters
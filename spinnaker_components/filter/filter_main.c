@@ -23,13 +23,24 @@ void filter_update(uint ticks, uint arg1) {
     }
   }
 
+  // Transmit early if the output has moved by more than the threshold
+  bool changed = false;
+  for (uint d = 0; d < g_filter.size_out; d++) {
+    value_t diff = g_filter.output[d] - g_filter.last_output[d];
+    if (diff > g_filter.threshold || -diff > g_filter.threshold) {
+      changed = true;
+      break;
+    }
+  }
+
   // Increment the counter and transmit if necessary
   delay_remaining--;
-  if(delay_remaining == 0) {
+  if(delay_remaining == 0 || changed) {
     delay_remaining = g_filter.transmission_delay;
 
     uint val = 0x0000;
     for(uint d = 0; d < g_filter.size_out; d++) {
+      g_filter.last_output[d] = g_filter.output[d];
       val = bitsk(g_filter.output[d]);
       spin1_send_mc_packet(g_filter.keys[d], val, WITH_PAYLOAD);
       spin1_delay_us(g_filter.interpacket_pause);
@@ -43,14 +54,23 @@ bool data_system(address_t addr) {
   g_filter.machine_timestep = addr[2];
   g_filter.transmission_delay = addr[3];
   g_filter.interpacket_pause = addr[4];
+  g_filter.threshold = kbits(addr[5]);
 
   delay_remaining = g_filter.transmission_delay;
   io_printf(IO_BUF, "[Filter] transmission delay = %d\n", delay_remaining);
+  io_printf(IO_BUF, "[Filter] threshold = %k\n", g_filter.threshold);
 
   g_filter.input = input_filter_initialise(&g_input, g_filter.size_in);
 
   if (g_filter.input == NULL)
     return false;
+
+  MALLOC_FAIL_FALSE(g_filter.output, g_filter.size_out * sizeof(value_t));
+  MALLOC_FAIL_FALSE(g_filter.last_output, g_filter.size_out * sizeof(value_t));
+  for (uint d = 0; d < g_filter.size_out; d++) {
+    g_filter.output[d] = 0.0k;
+    g_filter.last_output[d] = 0.0k;
+  }
   return true;
 }
 
@@ -10,6 +10,8 @@ void sdp_rx_tick(uint ticks, uint arg1) {
     spin1_exit(0);
   }
 
+  g_sdp_rx.current_tick = ticks;
+
   for (uint d = 0; d < g_sdp_rx.n_dimensions; d++) {
     if (g_sdp_rx.fresh[d]) {
       spin1_send_mc_packet(g_sdp_rx.keys[d],
@@ -20,6 +22,28 @@ void sdp_rx_tick(uint ticks, uint arg1) {
       spin1_delay_us(1);
     }
   }
+
+  // Acknowledge timestamped values now that they have been transmitted
+  if (g_sdp_rx.ack_pending) {
+    g_sdp_rx.ack_pending = false;
+
+    sdp_msg_t message;
+    message.dest_addr = g_sdp_rx.dest_addr;  // Ethernet connected chip
+    message.dest_port = 0xff;
+    message.srce_addr = sv->p2p_addr;
+    message.srce_port = spin1_get_id();
+    message.flags = 0x07;
+    message.tag = g_sdp_rx.tag;
+
+    message.cmd_rc = NENGO_SDP_ACK;
+    message.seq = g_sdp_rx.ack_seq;
+    message.arg1 = g_sdp_rx.ack_timestamp;  // Echo the host timestamp
+    message.arg2 = g_sdp_rx.ack_tick;       // Tick of receipt
+    message.arg3 = ticks;                   // Tick of transmission
+    message.length = sizeof(sdp_hdr_t) + sizeof(cmd_hdr_t);
+
+    spin1_send_sdp_msg(&message, 100);
+  }
 }
 
 /** \brief Receive packed data packed in SDP message
@@ -35,6 +59,14 @@ void sdp_received(uint mailbox, uint port) {
     g_sdp_rx.output[d] = data[d];
     g_sdp_rx.fresh[d] = true;
   }
+
+  // Record the details necessary to acknowledge the values if requested
+  if (message->cmd_rc == NENGO_SDP_DATA_ACK) {
+    g_sdp_rx.ack_seq = message->seq;
+    g_sdp_rx.ack_timestamp = message->arg1;
+    g_sdp_rx.ack_tick = g_sdp_rx.current_tick;
+    g_sdp_rx.ack_pending = true;
+  }
   spin1_msg_free(message);
 }
 
@@ -43,6 +75,8 @@ void sdp_received(uint mailbox, uint port) {
 bool data_system(address_t addr) {
   g_sdp_rx.transmission_period = addr[0];
   g_sdp_rx.n_dimensions = addr[1];
+  g_sdp_rx.tag = addr[2];
+  g_sdp_rx.dest_addr = addr[3];
 
   io_printf(IO_BUF, "[SDP Rx] Transmission period: %d\n",
             g_sdp_rx.transmission_period);
@@ -77,6 +111,8 @@ void c_main(void) {
   data_get_keys(region_start(2, address));
 
   g_sdp_rx.current_dimension = 0;
+  g_sdp_rx.current_tick = 0;
+  g_sdp_rx.ack_pending = false;
 
   for (uint d = 0; d < g_sdp_rx.n_dimensions; d++) {
     g_sdp_rx.output[d] = 0x00000000;
@@ -27,6 +27,15 @@ typedef struct sdp_rx_parameters {
   uint n_dimensions;        //!< Number of dimensions represented
   uint current_dimension;   //!< Index of the currently selected dimension
 
+  uint tag;                 //!< IP tag via which to acknowledge the host
+  uint dest_addr;           //!< P2P address of the Ethernet connected chip
+  uint current_tick;        //!< Most recent timer tick
+
+  bool ack_pending;         //!< Acknowledgement requested by the host
+  ushort ack_seq;           //!< Sequence number to acknowledge
+  uint ack_timestamp;       //!< Host timestamp to echo
+  uint ack_tick;            //!< Tick at which the values were received
+
   value_t *output;          //!< Currently cached output value
   bool *fresh;              //!< Freshness of output
   uint *keys;               //!< Output keys
@@ -17,16 +17,22 @@
 #include "input_filter.h"
 
 #include "common-impl.h"
+#include "nengo-common.h"
 
 /** \brief Shared Tx parameters.
   */
 typedef struct sdp_tx_parameters {
   uint machine_timestep;   //!< Machine time step / useconds
   uint transmission_delay; //!< Number of ticks between output transmissions
+  value_t threshold;       //!< Change in value which causes early transmission
+  uint tag;                //!< IP tag via which to transmit to the host
+  uint dest_addr;          //!< P2P address of the Ethernet connected chip
+  ushort seq;              //!< Sequence number of the next transmission
 
   uint n_dimensions;       //!< Number of dimensions to represent
 
   value_t *input;          //!< Input buffer
+  value_t *last_output;    //!< Last transmitted value
   uint *keys;              //!< Output keys
 } sdp_tx_parameters_t;
 extern sdp_tx_parameters_t g_sdp_tx; //!< Global parameters
@@ -13,21 +13,37 @@ void sdp_tx_update(uint ticks, uint arg1) {
   // Update the filters
   input_filter_step(&g_input, true);
 
+  // Transmit early if the input has moved by more than the threshold
+  bool changed = false;
+  for (uint d = 0; d < g_sdp_tx.n_dimensions; d++) {
+    value_t diff = g_sdp_tx.input[d] - g_sdp_tx.last_output[d];
+    if (diff > g_sdp_tx.threshold || -diff > g_sdp_tx.threshold) {
+      changed = true;
+      break;
+    }
+  }
+
   // Increment the counter and transmit if necessary
   delay_remaining--;
-  if(delay_remaining == 0) {
+  if(delay_remaining == 0 || changed) {
     delay_remaining = g_sdp_tx.transmission_delay;
+    spin1_memcpy(g_sdp_tx.last_output, g_sdp_tx.input,
+                 g_sdp_tx.n_dimensions * sizeof(value_t));
 
     // Construct and transmit the SDP Message
     sdp_msg_t message;
-    message.dest_addr = 0x0000;        // (0, 0)
+    message.dest_addr = g_sdp_tx.dest_addr;  // Ethernet connected chip
     message.dest_port = 0xff;
     message.srce_addr = sv->p2p_addr;  // Sender P2P address
     message.srce_port = spin1_get_id();
     message.flags = 0x07;              // No reply expected
-    message.tag = 1;                   // Send to IPtag 1
+    message.tag = g_sdp_tx.tag;        // Send to assigned IPtag
 
-    message.cmd_rc = 1;
+    // Include a sequence number and the current tick so that the host may
+    // measure latency.
+    message.cmd_rc = NENGO_SDP_DATA;
+    message.seq = g_sdp_tx.seq++;
+    message.arg1 = ticks;
     spin1_memcpy(
       message.data, g_sdp_tx.input, g_sdp_tx.n_dimensions * sizeof(value_t));
 
@@ -42,16 +58,28 @@ bool data_system(address_t addr) {
   g_sdp_tx.n_dimensions = addr[0];
   g_sdp_tx.machine_timestep = addr[1];
   g_sdp_tx.transmission_delay = addr[2];
+  g_sdp_tx.threshold = kbits(addr[3]);
+  g_sdp_tx.tag = addr[4];
+  g_sdp_tx.dest_addr = addr[5];
 
   delay_remaining = g_sdp_tx.transmission_delay;
   io_printf(IO_BUF, "[SDP Tx] Tick period = %d microseconds\n",
             g_sdp_tx.machine_timestep);
   io_printf(IO_BUF, "[SDP Tx] transmission delay = %d\n", delay_remaining);
+  io_printf(IO_BUF, "[SDP Tx] threshold = %k\n", g_sdp_tx.threshold);
+  io_printf(IO_BUF, "[SDP Tx] IP tag = %d, via (%d, %d)\n", g_sdp_tx.tag,
+            g_sdp_tx.dest_addr >> 8, g_sdp_tx.dest_addr & 0xff);
 
   g_sdp_tx.input = input_filter_initialise(&g_input, g_sdp_tx.n_dimensions);
 
   if (g_sdp_tx.input == NULL)
     return false;
+
+  MALLOC_FAIL_FALSE(g_sdp_tx.last_output,
+                    g_sdp_tx.n_dimensions * sizeof(value_t));
+  for (uint d = 0; d < g_sdp_tx.n_dimensions; d++) {
+    g_sdp_tx.last_output[d] = 0.0k;
+  }
   return true;
 }
 
@@ -1,10 +1,50 @@
 #include "value_sink.h"
 
-address_t rec_start, rec_curr;
-uint n_dimensions;
-value_t *input;
+uint n_channels;
+channel_t *channels;
 
-input_filter_t g_input;
+void channel_update(channel_t *channel) {
+  channel_parameters_t *pars = &channel->pars;
+
+  // Filter inputs, accumulating them if they are to be averaged
+  input_filter_step(&channel->input, true);
+  if (pars->average) {
+    for (uint d = 0; d < pars->n_dimensions; d++) {
+      channel->accumulator[d] += channel->input.input[d];
+    }
+  }
+
+  // Only record at the end of each sampling period
+  if (++channel->ticks_since_sample < pars->sample_ticks) {
+    return;
+  }
+  channel->ticks_since_sample = 0;
+
+  value_t *frame = channel->input.input;
+  if (pars->average) {
+    for (uint d = 0; d < pars->n_dimensions; d++) {
+      channel->accumulator[d] *= pars->sample_scale;
+    }
+    frame = channel->accumulator;
+  }
+
+  // Write the frame to the next slot of the circular buffer in SDRAM and
+  // then update the count of frames written so that the host may read
+  // complete frames during the simulation.
+  if (pars->n_frames > 0) {
+    spin1_memcpy(&channel->rec_start[(channel->n_frames_written %
+                                      pars->n_frames) * pars->n_dimensions],
+                 frame, pars->n_dimensions * sizeof(value_t));
+    channel->n_frames_written++;
+    channel->rec_count[0] = channel->n_frames_written;
+  }
+
+  if (pars->average) {
+    for (uint d = 0; d < pars->n_dimensions; d++) {
+      channel->accumulator[d] = 0;
+    }
+  }
+}
 
 void sink_update(uint ticks, uint arg1) {
   use(arg1);
@@ -12,14 +52,55 @@ void sink_update(uint ticks, uint arg1) {
     spin1_exit(0);
   }
 
-  // Filter inputs, write the latest value to SRAM
-  input_filter_step(&g_input, true);
-  spin1_memcpy(rec_curr, input, n_dimensions * sizeof(value_t));
-  rec_curr = &rec_curr[n_dimensions];
+  for (uint c = 0; c < n_channels; c++) {
+    channel_update(&channels[c]);
+  }
 }
 
 void mcpl_callback(uint key, uint payload) {
-  input_filter_mcpl_rx(&g_input, key, payload);
+  // Probes of the same object may receive the same keys, so each packet is
+  // given to the filters of every channel whose routes match it.
+  for (uint c = 0; c < n_channels; c++) {
+    input_filter_mcpl_rx(&channels[c].input, key, payload);
+  }
+}
+
+bool channel_initialise(channel_t *channel, address_t *filters,
+                        address_t *routes, address_t *recording) {
+  channel_parameters_t *pars = &channel->pars;
+  if (input_filter_initialise(&channel->input, pars->n_dimensions) == NULL) {
+    return false;
+  }
+
+  // Sampling parameters
+  channel->ticks_since_sample = 0;
+  if (pars->average) {
+    MALLOC_FAIL_FALSE(channel->accumulator,
+                      pars->n_dimensions * sizeof(value_t));
+    for (uint d = 0; d < pars->n_dimensions; d++) {
+      channel->accumulator[d] = 0;
+    }
+  }
+
+  // The filters and routes of each channel follow those of the previous
+  // channel, each starting with their number.
+  if (!input_filter_get_filters(&channel->input, *filters) ||
+      !input_filter_get_filter_routes(&channel->input, *routes)) {
+    return false;
+  }
+  *filters += 1 + (*filters)[0] * sizeof(input_filter_data_t) / sizeof(uint);
+  *routes += 1 + (*routes)[0] * sizeof(input_filter_key_t) / sizeof(uint);
+
+  // The stripe of the recording region for each channel starts with the
+  // count of frames written and the length of the circular buffer in frames,
+  // followed by the buffer.
+  channel->rec_count = *recording;
+  channel->rec_start = &channel->rec_count[2];
+  channel->n_frames_written = channel->rec_count[0] = 0;
+  channel->rec_count[1] = pars->n_frames;
+  *recording += 2 + pars->n_frames * pars->n_dimensions;
+
+  return true;
 }
 
 void c_main(void)
@@ -30,22 +111,26 @@ void c_main(void)
     system_lead_app_configured();
   }
 
-  // Load parameters and filters
+  // Load parameters and filters of each channel
   region_system_t *pars = (region_system_t *) region_start(1, address);
-  n_dimensions = pars->n_dimensions;
-  input = input_filter_initialise(&g_input, n_dimensions);
-
-  if (input == NULL) {
+  n_channels = pars->n_channels;
+  channels = spin1_malloc(n_channels * sizeof(channel_t));
+  if (channels == NULL) {
+    io_printf(IO_BUF, "[Value Sink] Failed to start.\n");
     return;
   }
 
-  if (!input_filter_get_filters(&g_input, region_start(2, address)) ||
-      !input_filter_get_filter_routes(&g_input, region_start(3, address))
-  ) {
-    io_printf(IO_BUF, "[Value Sink] Failed to start.\n");
-    return;
+  channel_parameters_t *channel_pars = (channel_parameters_t *) &pars[1];
+  address_t filters = region_start(2, address);
+  address_t routes = region_start(3, address);
+  address_t recording = region_start(15, address);
+  for (uint c = 0; c < n_channels; c++) {
+    channels[c].pars = channel_pars[c];
+    if (!channel_initialise(&channels[c], &filters, &routes, &recording)) {
+      io_printf(IO_BUF, "[Value Sink] Failed to start.\n");
+      return;
+    }
   }
-  rec_start = rec_curr = region_start(15, address);
 
   // Set up callbacks, start
   spin1_set_timer_tick(pars->timestep);
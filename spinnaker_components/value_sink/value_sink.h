@@ -6,9 +6,30 @@
 
 #include "input_filter.h"
 
+/* A value sink records the values received by each of several channels,
+ * each of which has its own filters and a stripe of the recording region.
+ */
 typedef struct _region_system_t {
   uint timestep;
-  uint n_dimensions;
+  uint n_channels;
 } region_system_t;
 
+// Parameters of each channel, following the system region
+typedef struct _channel_parameters_t {
+  uint n_dimensions;
+  uint sample_ticks;    // Ticks between recorded frames
+  uint average;         // Record the mean of the input over each period
+  value_t sample_scale; // 1 / sample_ticks
+  uint n_frames;        // Length of the recording buffer in frames
+} channel_parameters_t;
+
+typedef struct _channel_t {
+  channel_parameters_t pars;
+  input_filter_t input;
+  value_t *accumulator;
+  uint ticks_since_sample;
+  uint n_frames_written;
+  address_t rec_count, rec_start;
+} channel_t;
+
 #endif